@@ -0,0 +1,203 @@
+import collections
+import math
+
+from Sources.Tensors import MatrixView, Tensors
+
+NUMPY_ACTIVATIONS = {
+    'identity': lambda x: x,
+    'relu': lambda x: Tensors.numpy().maximum(x, 0.0),
+    'sigmoid': lambda x: 1.0 / (1.0 + Tensors.numpy().exp(-x)),
+    'tanh': lambda x: Tensors.numpy().tanh(x),
+    'softmax': lambda x: (lambda e: e / e.sum(axis=1, keepdims=True))(
+        Tensors.numpy().exp(x - x.max(axis=1, keepdims=True))),
+}
+"""dict: Activation functions by name, applied to a (batch, neurons) NumPy array."""
+
+PYTHON_ACTIVATIONS = {
+    'identity': lambda row: row,
+    'relu': lambda row: [max(value, 0.0) for value in row],
+    'sigmoid': lambda row: [1.0 / (1.0 + math.exp(-value)) if value > -700 else 0.0 for value in row],
+    'tanh': lambda row: [math.tanh(value) for value in row],
+    'softmax': lambda row: (lambda e: [value / sum(e) for value in e])([math.exp(value - max(row)) for value in row]),
+}
+"""dict: Activation functions by name, applied to the list of neuron values of one sample."""
+
+
+class ActivationView:
+    """Colors the circles of a network by how it responds to a batch of inputs.
+
+    The batch is run through the weight matrices and biases of the `RenderPlan`
+    (with any BatchNorm-like `norm` layers applied from their running statistics),
+    vectorized with NumPy when it is installed. Every column of circles is then
+    colored by the mean activation over the batch, or by the activation for one
+    `sample`. Only fully connected networks can be run this way.
+
+    The activations of every column are cached per (snapshot version, batch), so
+    switching between samples, or drawing the same snapshot again, does not run
+    the forward pass again.
+
+    Attributes:
+        inputs: The batch of inputs; one row per sample.
+        sample (int): The sample to show, or None to show the mean over the batch.
+        activations: The activation function of every layer. See `__init__`.
+    """
+
+    CACHE_SIZE: int = 4
+    """int: The number of forward passes to keep."""
+
+    NORM_EPSILON: float = 1e-5
+    """float: The epsilon added to the running variance of normalization layers."""
+
+    def __init__(self, inputs, sample: int = None, activations=None):
+        """Initializes a new activation view.
+
+        Args:
+            inputs: The batch of inputs, as a (batch, inputs) NumPy array or nested list,
+                or a single sample.
+            sample (int): The sample to show, or None to show the mean over the batch.
+            activations: The activation function of every layer: a name from
+                `NUMPY_ACTIVATIONS` (or a function of a NumPy array) for all layers,
+                or a list with one for every layer. Defaults to 'relu' for the hidden
+                layers and 'identity' for the output layer.
+        """
+        numpy = Tensors.numpy()
+        if numpy is not None:
+            inputs = numpy.asarray(inputs, dtype=numpy.float64)
+            if inputs.ndim == 1:
+                inputs = inputs[numpy.newaxis, :]
+        else:
+            inputs = [list(map(float, row)) for row in inputs] if hasattr(inputs[0], '__len__') \
+                else [list(map(float, inputs))]
+        self.inputs = inputs
+        self.sample = sample
+        self.activations = activations
+        self._cache = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def activationFor(self, layer: int, layerCount: int):
+        """Returns the activation function (or its name) of `layer`."""
+        if isinstance(self.activations, (list, tuple)):
+            return self.activations[layer]
+        if self.activations is not None:
+            return self.activations
+        return 'identity' if layer == layerCount - 1 else 'relu'
+
+    def forward(self, state_dict: dict, plan, version) -> list:
+        """Returns the activations of every column of circles, starting with the inputs.
+
+        Args:
+            state_dict (dict): The viewed state dictionary to run.
+            plan (RenderPlan): The plan of `state_dict`.
+            version: Anything that changes whenever `state_dict` does, to key the cache.
+
+        Returns:
+            list: A (batch, neurons) array (or list of rows without NumPy) for every column.
+
+        Raises:
+            ValueError: If a layer does not take the outputs of the previous one as inputs,
+                such as a convolution.
+        """
+        columns = self._cache.get(version)
+        if columns is not None:
+            self._cache.move_to_end(version)
+            return columns
+
+        for layer in plan.layers:
+            if layer.inputs != plan.counts[layer.index]:
+                raise ValueError(f"Activations can only be computed for fully connected layers, "
+                                 f"but {layer.weightKey} has {layer.inputs} inputs for {plan.counts[layer.index]} "
+                                 f"outputs of the previous layer.")
+        if len(self.inputs[0]) != plan.counts[0]:
+            raise ValueError(f"The inputs have {len(self.inputs[0])} features, but the network takes {plan.counts[0]}.")
+
+        columns = self._forwardVectorized(state_dict, plan) if Tensors.numpy() is not None \
+            else self._forwardPython(state_dict, plan)
+        self._cache[version] = columns
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return columns
+
+    def nodeValues(self, columns: list) -> (list, list):
+        """Returns the values to color every column of circles by, and the largest magnitude of every column.
+
+        The largest magnitude is taken over the whole batch, so the colors of
+        different samples can be compared.
+        """
+        numpy = Tensors.numpy()
+        values = []
+        limits = []
+        for column in columns:
+            if numpy is not None:
+                values.append((column.mean(axis=0) if self.sample is None else column[self.sample]).tolist())
+                limits.append(float(numpy.abs(column).max()) if column.size else 0.0)
+            else:
+                if self.sample is None:
+                    values.append([math.fsum(neuron) / len(column) for neuron in zip(*column)])
+                else:
+                    values.append(list(column[self.sample]))
+                limits.append(max((abs(value) for row in column for value in row), default=0.0))
+        return values, limits
+
+    @staticmethod
+    def _matrix(value):
+        numpy = Tensors.numpy()
+        flat = value.flat if isinstance(value, MatrixView) else value
+        matrix = numpy.asarray(flat, dtype=numpy.float64)
+        return matrix.reshape(len(value), -1) if matrix.ndim == 1 else matrix
+
+    def _normalize(self, state_dict: dict, norm: dict, x):
+        """Applies a normalization layer from its running statistics (or only its scale and shift)."""
+        numpy = Tensors.numpy()
+        get = lambda name: numpy.asarray(state_dict[norm[name]], dtype=numpy.float64) if name in norm else None
+        mean, var, weight, bias = get('running_mean'), get('running_var'), get('weight'), get('bias')
+        if mean is not None and var is not None:
+            x = (x - mean) / numpy.sqrt(var + self.NORM_EPSILON)
+        if weight is not None:
+            x = x * weight
+        if bias is not None:
+            x = x + bias
+        return x
+
+    def _forwardVectorized(self, state_dict: dict, plan) -> list:
+        numpy = Tensors.numpy()
+        x = self.inputs
+        columns = [x]
+        for layer in plan.layers:
+            x = x @ ActivationView._matrix(state_dict[layer.weightKey]).T
+            if layer.biasKey is not None:
+                x = x + numpy.asarray(state_dict[layer.biasKey], dtype=numpy.float64)
+            if layer.norm:
+                x = self._normalize(state_dict, layer.norm, x)
+            activation = self.activationFor(layer.index, len(plan.layers))
+            x = NUMPY_ACTIVATIONS[activation](x) if isinstance(activation, str) else activation(x)
+            columns.append(x)
+        return columns
+
+    def _forwardPython(self, state_dict: dict, plan) -> list:
+        x = self.inputs
+        columns = [x]
+        for layer in plan.layers:
+            weights = list(state_dict[layer.weightKey])
+            biases = state_dict[layer.biasKey] if layer.biasKey is not None else [0.0] * layer.outputs
+            norm = {name: state_dict[key] for name, key in layer.norm.items()}
+            activation = self.activationFor(layer.index, len(plan.layers))
+            if not isinstance(activation, str):
+                raise ValueError("Custom activation functions need NumPy.")
+            function = PYTHON_ACTIVATIONS[activation]
+            rows = []
+            for sample in x:
+                row = [math.fsum(w * value for w, value in zip(neuron, sample)) + bias
+                       for neuron, bias in zip(weights, biases)]
+                if 'running_mean' in norm and 'running_var' in norm:
+                    row = [(value - mean) / math.sqrt(var + self.NORM_EPSILON)
+                           for value, mean, var in zip(row, norm['running_mean'], norm['running_var'])]
+                if 'weight' in norm:
+                    row = [value * scale for value, scale in zip(row, norm['weight'])]
+                if 'bias' in norm:
+                    row = [value + shift for value, shift in zip(row, norm['bias'])]
+                rows.append(function(row))
+            x = rows
+            columns.append(x)
+        return columns
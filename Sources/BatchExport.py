@@ -0,0 +1,102 @@
+import collections
+import json
+import multiprocessing
+import os
+
+from Sources.Layout import Layout
+from Sources.NetworkDrawer import NetworkDrawer
+from Sources.Renderers import RasterRenderer
+from Sources.RenderPlan import RenderPlan
+from Sources.Tensors import Tensors
+
+_drawer = None
+"""NetworkDrawer: The drawer each worker process reuses for all of its frames."""
+
+
+def _startWorker(width: int, height: int, item_budget: int, layout: Layout):
+    global _drawer
+    _drawer = NetworkDrawer(state_dict={}, renderer=RasterRenderer(width, height), item_budget=item_budget)
+    _drawer.currentLayout = layout
+
+
+def _renderFrame(task) -> str:
+    path, state_dict = task
+    _drawer.setStateDict(state_dict)
+    _drawer.renderer.savePNG(path)
+    return path
+
+
+class BatchExport:
+    """Renders a sequence of state dictionaries, such as one per epoch, to PNG frames.
+
+    Frames are drawn with `RasterRenderer` across a pool of worker processes,
+    so no display is needed. The layout is computed once from the first state
+    dictionary and handed to every worker. At most a few frames per worker are
+    in flight at a time, so memory stays bounded for runs with thousands of epochs.
+    State dictionaries read from a `SnapshotReader` or the fixtures hold memoryviews,
+    which are copied into arrays before they are sent to a worker.
+    """
+
+    @staticmethod
+    def exportFrames(state_dicts, directory: str, width: int = 800, height: int = 600,
+                     processes: int = None, item_budget: int = 50000, prefix: str = 'frame') -> list:
+        """Renders every state dictionary in `state_dicts` to `directory/prefix_00000.png`, etc.
+
+        Args:
+            state_dicts: An iterable of state dictionaries. It is read lazily, so it may be a generator.
+            directory (str): The directory to write the frames to. Created if needed.
+            width (int): The width of every frame in pixels.
+            height (int): The height of every frame in pixels.
+            processes (int): The number of worker processes. Defaults to the number of CPUs.
+            item_budget (int): The maximum number of items drawn per frame.
+            prefix (str): The start of every frame's file name.
+
+        Returns:
+            list: The paths of the written frames, in order.
+        """
+        os.makedirs(directory, exist_ok=True)
+        processes = processes or os.cpu_count() or 1
+        state_dicts = iter(state_dicts)
+        first = next(state_dicts, None)
+        if first is None:
+            return []
+
+        # Every worker gets the same layout; it is only recomputed if the architecture changes.
+        layout = Layout(width, height, RenderPlan.of(Tensors.stateDictView(first)))
+
+        paths = []
+        pending = collections.deque()
+        with multiprocessing.Pool(processes, initializer=_startWorker,
+                                  initargs=(width, height, item_budget, layout)) as pool:
+            for index, state_dict in enumerate(BatchExport._chain(first, state_dicts)):
+                path = os.path.join(directory, f"{prefix}_{index:05d}.png")
+                pending.append(pool.apply_async(_renderFrame, ((path, Tensors.picklable(state_dict)),)))
+                if len(pending) >= 2 * processes:
+                    paths.append(pending.popleft().get())
+            while pending:
+                paths.append(pending.popleft().get())
+        return paths
+
+    @staticmethod
+    def _chain(first, rest):
+        yield first
+        yield from rest
+
+    @staticmethod
+    def load(path: str) -> dict:
+        """Loads a state dictionary from a `.json`, `.npz`, or `.pt` file.
+
+        `.npz` files need NumPy and `.pt` files need torch; neither is required otherwise.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.json':
+            with open(path) as file:
+                return json.load(file)
+        if extension == '.npz':
+            import numpy
+            with numpy.load(path) as arrays:
+                return {key: arrays[key] for key in arrays.files}
+        if extension in ('.pt', '.pth'):
+            import torch
+            return torch.load(path, map_location='cpu')
+        raise ValueError(f"Unsupported state dictionary file: {path}")
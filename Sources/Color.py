@@ -1,3 +1,6 @@
+import copy
+
+from Sources.Tensors import MatrixView, Tensors
 
 
 class Color:
@@ -56,5 +59,111 @@ class Color:
         return int(max(smallest, min(n, largest)))
 
 
+class ColorPalette:
+    """A precomputed table of hex colors between two endpoint colors.
+
+    Mapping a value to a color only requires a bucket lookup, so whole rows
+    or matrices of weights can be converted without going through
+    `Color.interpolateColor` and `Color.rgbToHex` for every element.
+
+    Attributes:
+        initialColor (int, int, int): The RGB color used for `minimum` and below.
+        finalColor (int, int, int): The RGB color used for `maximum` and above.
+        buckets (int): The number of precomputed colors.
+        minimum (float): The value mapped to the first bucket.
+        maximum (float): The value mapped to the last bucket.
+        colors (list): The hex colors (#RRGGBB) for every bucket.
+    """
+
+    VECTORIZE_SIZE: int = 32
+    """int: The fewest values of a buffer for `bucketsFor` to convert them with NumPy."""
+
+    def __init__(self, initialColor, finalColor, buckets: int = 1024,
+                 minimum: float = -1.0, maximum: float = 1.0):
+        """Initializes a new palette.
+
+        Args:
+            initialColor (int, int, int): The RGB color for negative values.
+            finalColor (int, int, int): The RGB color for positive values.
+            buckets (int): The number of colors to precompute. Must be at least 2.
+            minimum (float): The value mapped to `initialColor`.
+            maximum (float): The value mapped to `finalColor`.
+        """
+        if buckets < 2:
+            raise ValueError(f"A palette needs at least 2 buckets, got {buckets}.")
+        self.initialColor = initialColor
+        self.finalColor = finalColor
+        self.buckets = buckets
+        self.minimum = minimum
+        self.maximum = maximum
+        self.colors = [Color.colorToHex(Color.interpolateColor(initialColor, finalColor, i / (buckets - 1)))
+                       for i in range(buckets)]
+        # bucket = value * _scale + _offset, where the extra 0.5 rounds to the nearest bucket.
+        self._scale = (buckets - 1) / (maximum - minimum)
+        self._offset = 0.5 - minimum * self._scale
+
+    def withRange(self, minimum: float, maximum: float) -> 'ColorPalette':
+        """Returns a palette with the same colors that spreads them between `minimum` and `maximum` instead.
+
+        The color table is shared, so this is cheap enough to do for every layer.
+        """
+        palette = copy.copy(self)
+        palette.minimum = minimum
+        palette.maximum = maximum
+        palette._scale = (self.buckets - 1) / (maximum - minimum)
+        palette._offset = 0.5 - minimum * palette._scale
+        return palette
+
+    def bucket(self, num: float) -> int:
+        """Returns the index of the bucket that `num` falls into.
+
+        Values outside of `minimum` and `maximum` are clamped to the end buckets.
+        """
+        return int(max(0.0, min(num * self._scale + self._offset, self.buckets - 1)))
+
+    def color(self, num: float) -> str:
+        """Returns the hex color (#RRGGBB) for a single value."""
+        return self.colors[self.bucket(num)]
+
+    def bucketsFor(self, values) -> list:
+        """Returns the bucket index for every value in `values`.
+
+        Buffers (such as arrays, memoryviews, and `MatrixView`s over them) with at least
+        `VECTORIZE_SIZE` values are converted with NumPy if it is installed.
+
+        Args:
+            values: Any iterable of numbers, such as a list, array, or memoryview,
+                or a `MatrixView`, whose values are taken row by row.
+
+        Returns:
+            list: The bucket indices, in the same order as `values`.
+        """
+        scale, offset, last = self._scale, self._offset, self.buckets - 1
+        flat = values.flat if isinstance(values, MatrixView) else values
+        numpy = Tensors.numpy()
+        if numpy is not None and not isinstance(flat, (list, tuple)) and len(flat) >= self.VECTORIZE_SIZE:
+            with numpy.errstate(over='ignore', invalid='ignore'):
+                buckets = numpy.asarray(flat, dtype=numpy.float64).reshape(-1) * scale + offset
+            # NaN falls into the first bucket, like it does for `max` and `min` below.
+            return numpy.clip(numpy.nan_to_num(buckets, nan=0.0), 0, last).astype(numpy.int64).tolist()
+        return [int(max(0.0, min(value * scale + offset, last))) for value in flat]
+
+    def colorsFor(self, values) -> list:
+        """Returns the hex color (#RRGGBB) for every value in `values`.
+
+        Args:
+            values: Any iterable of numbers, such as a list, array, or memoryview.
+
+        Returns:
+            list: The hex colors, in the same order as `values`.
+        """
+        colors = self.colors
+        return [colors[bucket] for bucket in self.bucketsFor(values)]
+
+    def colorMatrix(self, matrix) -> list:
+        """Returns the hex colors for a two-dimensional matrix of values, row by row."""
+        return [self.colorsFor(row) for row in matrix]
+
+
 if __name__ == '__main__':
     print(Color.interpolateColor((255, 12, 0), (0, 255, 255), progress=0.0))
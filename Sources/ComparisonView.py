@@ -0,0 +1,284 @@
+import array
+import concurrent.futures
+import math
+import operator
+import os
+import tkinter as tk
+
+from Sources.Color import ColorPalette
+from Sources.Layout import Layout
+from Sources.NetworkDrawer import NetworkDrawer
+from Sources.Normalization import Normalizer
+from Sources.Renderers import CanvasRenderer
+from Sources.RenderPlan import RenderPlan
+from Sources.StateDictionaries import StateDictionaries
+from Sources.Tensors import MatrixView, Tensors
+
+
+class SharedPaletteDrawer(NetworkDrawer):
+    """A `NetworkDrawer` whose `palettes` are shared with, and chosen by, a `ComparisonView`.
+
+    Attributes:
+        changedPalettes (set): The keys whose shared palette changed since the drawer last drew.
+    """
+
+    def __init__(self, state_dict: dict, renderer, item_budget: int = 50000):
+        super().__init__(state_dict, renderer, item_budget=item_budget)
+        self.changedPalettes = set()
+
+    def updatePalettes(self, plan: RenderPlan) -> set:
+        changed, self.changedPalettes = self.changedPalettes, set()
+        return changed
+
+
+class ComparisonView(tk.Frame):
+    """Compares state dictionaries of the same architecture, such as checkpoints or ablation runs, in one window.
+
+    In `SMALL_MULTIPLES` mode every model is drawn in a panel of its own, and in
+    `DIFFERENCE` mode a single panel shows the first model minus the second.
+    The panels share one `Layout` and one `ColorPalette`: the layout is computed once
+    for the panel size, and every weight matrix and bias vector is colored over the
+    same range in every panel (the union of the ranges `normalization` picks for each
+    model), so equal colors mean equal values across models.
+
+    Converting every model into views, planning it, and sampling its values for the
+    normalization runs in a pool of worker threads, as does subtracting the models
+    (one entry at a time) for the difference. Conversion reads tensors in place and
+    NumPy releases the GIL while it subtracts, so more models mostly add work to the
+    pool rather than to the window.
+
+    Attributes:
+        mode (str): `SMALL_MULTIPLES` or `DIFFERENCE`.
+        names (list): The title of every model.
+        palette (ColorPalette): The palette every panel draws with.
+        palettes (dict): The palette of every key, spread over the shared range of its values.
+        layout (Layout): The layout every panel draws with.
+        drawers (list): The `SharedPaletteDrawer` of every panel.
+    """
+
+    SMALL_MULTIPLES = 'multiples'
+    """str: Every model is drawn in a panel of its own."""
+    DIFFERENCE = 'difference'
+    """str: The first model minus the second is drawn in a single panel."""
+
+    RESIZE_DELAY: int = 100
+    """int: How long (in ms) the panel size must stay the same before the panels are laid out again."""
+
+    def __init__(self, state_dicts, mode: str = SMALL_MULTIPLES, names=None, master=None, columns: int = None,
+                 panel_width: int = 400, panel_height: int = 300, normalization: str = None,
+                 normalization_scope: str = Normalizer.LAYER, item_budget: int = 50000, workers: int = None):
+        """Initializes a new comparison view.
+
+        Args:
+            state_dicts: The state dictionaries to compare; exactly two in `DIFFERENCE` mode.
+            mode (str): `SMALL_MULTIPLES` or `DIFFERENCE`.
+            names: The title of every model. Defaults to 'Model 1', 'Model 2', etc.
+            master: The TK root to use. One will be created if left empty.
+            columns (int): The number of panels per row. Defaults to a roughly square grid.
+            panel_width (int): The initial width of every panel.
+            panel_height (int): The initial height of every panel.
+            normalization (str): The range the colors are spread over; see `Normalizer`.
+                Defaults to `Normalizer.FIXED` for small multiples and `Normalizer.ABS_MAX`
+                for differences, which are usually much smaller than the weights.
+            normalization_scope (str): `Normalizer.LAYER` or `Normalizer.GLOBAL`.
+            item_budget (int): The maximum number of canvas items, shared by all panels.
+            workers (int): The number of worker threads. Defaults to one per model, up to the number of CPUs.
+
+        Raises:
+            ValueError: If `mode` is unknown, the models do not all have the same keys and
+                shapes, or `DIFFERENCE` mode is not given exactly two models.
+        """
+        if mode not in (ComparisonView.SMALL_MULTIPLES, ComparisonView.DIFFERENCE):
+            raise ValueError(f"Unknown comparison mode {mode!r}, expected "
+                             f"{ComparisonView.SMALL_MULTIPLES!r} or {ComparisonView.DIFFERENCE!r}.")
+        state_dicts = list(state_dicts)
+        if mode == ComparisonView.DIFFERENCE and len(state_dicts) != 2:
+            raise ValueError(f"A difference needs exactly 2 state dictionaries, got {len(state_dicts)}.")
+        if normalization is None:
+            normalization = Normalizer.ABS_MAX if mode == ComparisonView.DIFFERENCE else Normalizer.FIXED
+        if master is None:
+            self.master = tk.Tk()
+            self.master.title("Neural Net Comparison")
+        else:
+            self.master = master
+        super().__init__(master)
+
+        self.mode = mode
+        names = list(names) if names is not None else [f"Model {index + 1}" for index in range(len(state_dicts))]
+        self.names = [f"{names[0]} − {names[1]}"] if mode == ComparisonView.DIFFERENCE else names
+        self.normalizer = Normalizer(normalization, scope=normalization_scope)
+        self.workers = workers or min(len(state_dicts), os.cpu_count() or 1)
+        self.palette = ColorPalette((255, 0, 0), (0, 0, 255))
+        self.palettes = {}
+        self.layout = None
+        self.drawers = []
+        self.resizeJob = None
+        self.pendingSize = None
+
+        views, plan, changed = self.prepare(state_dicts)
+        panelCount = len(views)
+        columns = columns or math.ceil(math.sqrt(panelCount))
+        for index, (view, name) in enumerate(zip(views, self.names)):
+            panel = tk.Frame(master=self)
+            panel.grid(row=index // columns, column=index % columns, sticky=tk.NSEW)
+            self.grid_rowconfigure(index // columns, weight=1)
+            self.grid_columnconfigure(index % columns, weight=1)
+            tk.Label(master=panel, text=name).pack(side=tk.TOP)
+            canvas = tk.Canvas(master=panel, width=panel_width, height=panel_height, highlightthickness=0)
+            canvas.pack(fill=tk.BOTH, expand=True)
+            canvas.bind("<Configure>", self.rebuild)
+            self.drawers.append(self.makeDrawer(view, CanvasRenderer(canvas), item_budget // panelCount))
+        self.pack(fill=tk.BOTH, expand=True)
+        self.drawAll(plan)
+
+    @staticmethod
+    def prepareModel(state_dict: dict, normalizer: Normalizer) -> (dict, RenderPlan, dict):
+        """Converts a state dictionary into views, plans it, and picks the range of every entry.
+
+        Runs on a worker thread, so it must not touch Tk.
+
+        Returns:
+            (dict, RenderPlan, dict): The views, the plan, and the (minimum, maximum) of every key.
+        """
+        view = Tensors.stateDictView(state_dict)
+        plan = RenderPlan.of(view)
+        keys = [key for layer in plan.layers for key in (layer.weightKey, layer.biasKey) if key is not None]
+        # Every model gets a fresh normalizer with the same settings, so they can run in parallel.
+        normalizer = Normalizer(normalizer.mode, scope=normalizer.scope, percentile=normalizer.percentile,
+                                sample_size=normalizer.sample_size, capacity=normalizer.capacity)
+        normalizer.update(view, keys)
+        return view, plan, {key: normalizer.rangeFor(key) for key in keys}
+
+    @staticmethod
+    def difference(first, second):
+        """Returns the elementwise difference of two viewed values with the same shape, as a view."""
+        a, b = Normalizer.flatValues(first), Normalizer.flatValues(second)
+        numpy = Tensors.numpy()
+        if numpy is not None:
+            flat = memoryview(numpy.subtract(numpy.asarray(a, dtype=numpy.float64),
+                                             numpy.asarray(b, dtype=numpy.float64)))
+        else:
+            flat = memoryview(array.array('d', map(operator.sub, a, b)))
+        shape = Tensors.shape(first)
+        return MatrixView(flat, *shape) if len(shape) == 2 else flat
+
+    def prepare(self, state_dicts: list) -> (list, RenderPlan, set):
+        """Prepares the state dictionaries on the worker pool and updates the shared palettes.
+
+        Returns:
+            (list, RenderPlan, set): The viewed state dictionary of every panel, their plan,
+                and the keys whose palette changed.
+
+        Raises:
+            ValueError: If the models do not all have the same keys and shapes.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            prepared = list(pool.map(lambda state_dict: self.prepareModel(state_dict, self.normalizer),
+                                     state_dicts))
+            plan = prepared[0][1]
+            for index, (_, other, _) in enumerate(prepared[1:], start=1):
+                if other.signature != plan.signature:
+                    raise ValueError(f"Model {index + 1} does not have the same keys and shapes as model 1, "
+                                     f"so they cannot be compared.")
+            views = [view for view, _, _ in prepared]
+            rangeList = [ranges for _, _, ranges in prepared]
+            if self.mode == ComparisonView.DIFFERENCE:
+                first, second = views
+                keys = list(first)
+                differences = pool.map(lambda key: self.difference(first[key], second[key]), keys)
+                views = [dict(zip(keys, differences))]
+                rangeList = [self.prepareModel(views[0], self.normalizer)[2]]
+
+        changed = set()
+        if self.normalizer.mode == Normalizer.FIXED:
+            return views, plan, changed
+        for key in rangeList[0]:
+            low = min(ranges[key][0] for ranges in rangeList)
+            high = max(ranges[key][1] for ranges in rangeList)
+            palette = self.palettes.get(key)
+            if palette is None or (palette.minimum, palette.maximum) != (low, high):
+                self.palettes[key] = self.palette.withRange(low, high)
+                changed.add(key)
+        return views, plan, changed
+
+    def makeDrawer(self, state_dict: dict, renderer, item_budget: int) -> SharedPaletteDrawer:
+        """Creates the drawer of a panel, sharing the palettes and color tags of the view."""
+        drawer = SharedPaletteDrawer(state_dict, renderer, item_budget=item_budget)
+        drawer.palette = self.palette
+        drawer.palettes = self.palettes
+        return drawer
+
+    def drawAll(self, plan: RenderPlan):
+        """Draws every panel from scratch with the shared layout."""
+        drawer = self.drawers[0]
+        self.layout = Layout(drawer.width(), drawer.height(), plan)
+        for drawer in self.drawers:
+            drawer.currentLayout = self.layout
+            drawer.redraw()
+
+    def setStateDicts(self, state_dicts):
+        """Compares another set of state dictionaries, such as newer checkpoints of the same runs.
+
+        The panels are recolored in place if the architecture did not change.
+
+        Raises:
+            ValueError: If the number of models differs from the ones shown, or they cannot be compared.
+        """
+        state_dicts = list(state_dicts)
+        expected = 2 if self.mode == ComparisonView.DIFFERENCE else len(self.drawers)
+        if len(state_dicts) != expected:
+            raise ValueError(f"Expected {expected} state dictionaries, got {len(state_dicts)}.")
+        views, plan, changed = self.prepare(state_dicts)
+        if plan is not self.drawers[0].drawnPlan:
+            for drawer, view in zip(self.drawers, views):
+                drawer.state_dict = view
+            self.drawAll(plan)
+            return
+        for drawer, view in zip(self.drawers, views):
+            drawer.changedPalettes = set(changed)
+            drawer.setStateDict(view, plan=plan)
+
+    def setColors(self, negativeColor, positiveColor):
+        """Changes the two endpoint colors of every panel, recoloring the color tags of each in place."""
+        self.palette = ColorPalette(negativeColor, positiveColor, buckets=self.palette.buckets)
+        for key, palette in self.palettes.items():
+            self.palettes[key] = self.palette.withRange(palette.minimum, palette.maximum)
+        for drawer in self.drawers:
+            drawer.negativeColor, drawer.positiveColor = negativeColor, positiveColor
+            drawer.palette = self.palette
+            drawer.recolor()
+
+    def rebuild(self, event=None):
+        """Lays the panels out again once their size stopped changing for `RESIZE_DELAY` ms."""
+        if event is not None:
+            self.pendingSize = (event.width, event.height)
+        if self.resizeJob is not None:
+            self.after_cancel(self.resizeJob)
+        self.resizeJob = self.after(self.RESIZE_DELAY, self.applyResize)
+
+    def applyResize(self):
+        self.resizeJob = None
+        if self.pendingSize is None:
+            return
+        width, height = self.pendingSize
+        if self.layout is not None and self.layout.key[:2] == (width, height):
+            return
+        plan = self.drawers[0].drawnPlan or RenderPlan.of(self.drawers[0].state_dict)
+        self.layout = Layout(width, height, plan)
+        for drawer in self.drawers:
+            drawer.renderer.resize(width, height)
+            drawer.currentLayout = self.layout
+            drawer.relayout()
+
+    def show(self):
+        """Opens the comparison on screen. Blocks the thread until the window is closed."""
+        self.mainloop()
+
+
+def main():
+    ComparisonView([StateDictionaries.default_state_dict(), StateDictionaries.snake_state_dict()],
+                   names=["default", "snake"]).show()
+
+
+if __name__ == '__main__':
+    main()
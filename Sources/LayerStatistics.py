@@ -0,0 +1,140 @@
+import collections
+import itertools
+import math
+
+from Sources.Tensors import MatrixView, Tensors
+
+
+class LayerStatistics:
+    """A summary of the values of one state dictionary entry.
+
+    Attributes:
+        key (str): The state dictionary key.
+        count (int): The number of values.
+        mean (float): The mean of the values.
+        std (float): The standard deviation of the values.
+        minimum (float): The smallest value.
+        maximum (float): The largest value.
+        sparsity (float): The fraction of values whose magnitude is below the zero tolerance.
+        l1 (float): The L1 norm (sum of magnitudes) of the values.
+        l2 (float): The L2 (Euclidean) norm of the values.
+        histogram (list): The number of values in each of the equally wide bins
+            between -`limit` and `limit`. Values outside are counted in the outer bins.
+        limit (float): The magnitude covered by the histogram.
+    """
+
+    def __init__(self, key: str, count: int, mean: float, std: float, minimum: float, maximum: float,
+                 sparsity: float, l1: float, l2: float, histogram: list, limit: float):
+        self.key = key
+        self.count = count
+        self.mean = mean
+        self.std = std
+        self.minimum = minimum
+        self.maximum = maximum
+        self.sparsity = sparsity
+        self.l1 = l1
+        self.l2 = l2
+        self.histogram = histogram
+        self.limit = limit
+
+    def __repr__(self):
+        return (f"LayerStatistics({self.key!r}, count={self.count}, mean={self.mean:.4g}, std={self.std:.4g}, "
+                f"sparsity={self.sparsity:.1%}, l2={self.l2:.4g})")
+
+
+class StatisticsEngine:
+    """Computes `LayerStatistics` for every entry of a state dictionary on every update.
+
+    The work is vectorized with NumPy when it is installed, and done in plain
+    Python otherwise. Every entry keeps the same histogram range from one update
+    to the next, so histograms can be compared across snapshots; the range only
+    doubles when values grow past it. The mean and standard deviation of every
+    entry are kept for the last `history` updates.
+
+    Attributes:
+        layers (dict): The `LayerStatistics` of the last update, by key.
+        history (dict): The (mean, std) of the last updates, by key, oldest first.
+    """
+
+    def __init__(self, bins: int = 32, zero_tolerance: float = 1e-3, history: int = 100):
+        """Initializes a new engine.
+
+        Args:
+            bins (int): The number of histogram bins.
+            zero_tolerance (float): The magnitude below which a value counts as zero for `sparsity`.
+            history (int): The number of updates to keep the mean and standard deviation of.
+        """
+        self.bins = bins
+        self.zero_tolerance = zero_tolerance
+        self.layers = {}
+        self.history = collections.defaultdict(lambda: collections.deque(maxlen=history))
+        self._limits = {}
+
+    def update(self, state_dict: dict, keys=None) -> dict:
+        """Computes the statistics of a (viewed) state dictionary.
+
+        Args:
+            state_dict (dict): The state dictionary, with values from `Tensors.stateDictView`.
+            keys: The keys to summarize. Defaults to every key.
+
+        Returns:
+            dict: The `LayerStatistics` of every summarized key.
+        """
+        for key in (keys if keys is not None else state_dict):
+            statistics = self.compute(key, state_dict[key])
+            self.layers[key] = statistics
+            self.history[key].append((statistics.mean, statistics.std))
+        return self.layers
+
+    def limitFor(self, key: str, largest: float) -> float:
+        """Returns the histogram range of `key`, growing it if `largest` no longer fits."""
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = largest if largest > 0 else 1.0
+        while largest > limit:
+            limit *= 2
+        self._limits[key] = limit
+        return limit
+
+    def compute(self, key: str, value) -> LayerStatistics:
+        """Computes the statistics of one viewed value."""
+        flat = value.flat if isinstance(value, MatrixView) else value
+        if len(flat) > 0 and hasattr(flat[0], '__len__'):
+            flat = list(itertools.chain.from_iterable(flat))
+        if len(flat) == 0:
+            return LayerStatistics(key, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, [0] * self.bins, 1.0)
+        if Tensors.numpy() is not None:
+            return self._computeVectorized(key, flat)
+        return self._computePython(key, flat)
+
+    def _computeVectorized(self, key: str, flat) -> LayerStatistics:
+        numpy = Tensors.numpy()
+        values = numpy.asarray(flat, dtype=numpy.float64)
+        magnitudes = numpy.abs(values)
+        minimum, maximum = float(values.min()), float(values.max())
+        limit = self.limitFor(key, max(-minimum, maximum))
+        histogram, _ = numpy.histogram(numpy.clip(values, -limit, limit), bins=self.bins, range=(-limit, limit))
+        return LayerStatistics(key, len(values), float(values.mean()), float(values.std()), minimum, maximum,
+                               float(numpy.count_nonzero(magnitudes < self.zero_tolerance)) / len(values),
+                               float(magnitudes.sum()), float(numpy.sqrt(numpy.dot(values, values))),
+                               histogram.tolist(), limit)
+
+    def _computePython(self, key: str, flat) -> LayerStatistics:
+        count = len(flat)
+        mean = math.fsum(flat) / count
+        squares = math.fsum(x * x for x in flat)
+        minimum, maximum = min(flat), max(flat)
+        limit = self.limitFor(key, max(-minimum, maximum))
+        bins = self.bins
+        scale = bins / (2 * limit)
+        histogram = [0] * bins
+        zeros = 0
+        l1 = 0.0
+        for x in flat:
+            histogram[min(bins - 1, max(0, int((x + limit) * scale)))] += 1
+            magnitude = abs(x)
+            l1 += magnitude
+            if magnitude < self.zero_tolerance:
+                zeros += 1
+        return LayerStatistics(key, count, mean, math.sqrt(max(0.0, squares / count - mean * mean)),
+                               minimum, maximum, zeros / count, l1, math.sqrt(squares), histogram, limit)
@@ -0,0 +1,73 @@
+class Layout:
+    """The geometry of a neural net drawn at one size.
+
+    Everything here depends only on the size of the view and the `RenderPlan` of
+    the state dictionary, so a layout can be computed once and reused for every
+    snapshot (or shared with other processes) until either of those changes.
+
+    Attributes:
+        key (tuple): The (width, height, plan signature) the layout was computed for.
+        increment (int): The horizontal distance between two columns of circles.
+        columns (list): The x position of every column, starting with the inputs.
+        counts (list): The number of circles in every column.
+        yPositions (list): The y positions of the circles in every column.
+        radii (list): The circle radius of every column.
+        inputPositions (list): For every layer, the y position each column of its weight
+            matrix leads to. When a layer has more inputs than the previous layer has
+            outputs (such as a linear layer after a flattened convolution), neighboring
+            inputs share the position of the output they were flattened from.
+    """
+
+    def __init__(self, width: int, height: int, plan):
+        """Computes the layout for a view of `width` x `height` pixels.
+
+        Args:
+            width (int): The width of the view.
+            height (int): The height of the view.
+            plan (RenderPlan): The structure of the state dictionary.
+        """
+        self.key = (width, height, plan.signature)
+        self.increment = Layout.incrementAmount(width, len(plan.layers))
+        xStart = self.increment // 2
+        self.counts = list(plan.counts)
+        self.columns = [xStart + self.increment * column for column in range(len(self.counts))]
+        self.yPositions = [Layout.yPositions(height, count) for count in self.counts]
+        self.radii = [Layout.radius(height, count) for count in self.counts]
+        self.inputPositions = []
+        for layer in plan.layers:
+            positions = self.yPositions[layer.index]
+            if layer.inputs != len(positions):
+                positions = [positions[col * len(positions) // layer.inputs] for col in range(layer.inputs)]
+            self.inputPositions.append(positions)
+
+    @property
+    def width(self) -> int:
+        return self.key[0]
+
+    @property
+    def height(self) -> int:
+        return self.key[1]
+
+    @staticmethod
+    def incrementAmount(width: int, horizontalCount: int) -> int:
+        """The horizontal distance between columns when `horizontalCount` layers share `width` pixels."""
+        return width // (horizontalCount + 1)
+
+    @staticmethod
+    def radius(height: int, count: int) -> int:
+        """The circle radius when `count` circles are stacked in `height` pixels."""
+        return max(10, int(height / (5 * count)))
+
+    @staticmethod
+    def yPositions(height: int, count: int) -> list:
+        """Generates a list of y positions with the given number of separators.
+
+        Args:
+            height (int): The total height of the window.
+            count (int): The number of positions to have in the generated list.
+
+        Returns:
+            list: Y-coordinates to place `count` items centered on the window.
+        """
+        separators = height / (count + 1)
+        return [separators * i for i in range(1, count + 1)]
@@ -0,0 +1,136 @@
+import heapq
+
+
+class LevelOfDetail:
+    """Decides how much of a weight matrix is worth drawing on screen.
+
+    Drawing every edge of a wide layer creates more canvas items than there
+    are pixels to show them, so wide layers are reduced to either the
+    strongest edges of every neuron or a downsampled heatmap strip.
+
+    Attributes:
+        mode (str): One of `FULL`, `TOP_K`, or `HEATMAP`.
+        count (int): The number of edges drawn per output neuron in `TOP_K` mode.
+        rows (int): The number of heatmap rows in `HEATMAP` mode.
+        cols (int): The number of heatmap columns in `HEATMAP` mode.
+        ranges (list): The (row, start, stop) ranges of inputs drawn for every row
+            in `VISIBLE` mode, or searched for the strongest edges in `TOP_K` mode.
+            None if the whole matrix is drawn or searched.
+    """
+
+    FULL = 'full'
+    """str: Every edge is drawn."""
+    TOP_K = 'top-k'
+    """str: Only the `count` edges with the largest |weight| are drawn for each output neuron."""
+    HEATMAP = 'heatmap'
+    """str: The weight matrix is averaged into a grid of `rows` x `cols` rectangles."""
+    VISIBLE = 'visible'
+    """str: Every edge inside the viewport (given by `ranges`) is drawn, and no others."""
+
+    PIXELS_PER_EDGE: int = 4
+    """int: The area (in pixels) an edge needs to be distinguishable from its neighbors."""
+
+    def __init__(self, mode: str, count: int = None, rows: int = None, cols: int = None, ranges: list = None):
+        self.mode = mode
+        self.count = count
+        self.rows = rows
+        self.cols = cols
+        self.ranges = ranges
+
+    def __repr__(self):
+        ranges = None if self.ranges is None else f"<{len(self.ranges)} rows>"
+        return (f"LevelOfDetail(mode={self.mode!r}, count={self.count}, rows={self.rows}, cols={self.cols}, "
+                f"ranges={ranges})")
+
+    @staticmethod
+    def choose(inputCount: int, outputCount: int, width: int, height: int, budget: int) -> 'LevelOfDetail':
+        """Chooses the level of detail for a weight matrix drawn in a `width` x `height` strip.
+
+        Args:
+            inputCount (int): The number of input neurons (columns of the weight matrix).
+            outputCount (int): The number of output neurons (rows of the weight matrix).
+            width (int): The horizontal distance (in pixels) between the two layers.
+            height (int): The height (in pixels) of the canvas.
+            budget (int): The maximum number of canvas items to create for this matrix.
+
+        Returns:
+            LevelOfDetail: The level of detail to draw the matrix with.
+        """
+        limit = max(1, min(budget, width * height // LevelOfDetail.PIXELS_PER_EDGE))
+        if inputCount * outputCount <= limit:
+            return LevelOfDetail(LevelOfDetail.FULL)
+
+        count = limit // max(1, outputCount)
+        if count >= 1 and outputCount <= height:
+            return LevelOfDetail(LevelOfDetail.TOP_K, count=count)
+
+        # Shrink the grid until it fits both the screen and the budget.
+        rows = max(1, min(outputCount, height // 2))
+        cols = max(1, min(inputCount, width // 2))
+        while rows * cols > limit and (rows > 1 or cols > 1):
+            if rows >= cols:
+                rows = max(1, rows // 2)
+            else:
+                cols = max(1, cols // 2)
+        return LevelOfDetail(LevelOfDetail.HEATMAP, rows=rows, cols=cols)
+
+    @staticmethod
+    def chooseVisible(ranges: list, width: int, height: int, budget: int) -> 'LevelOfDetail':
+        """Chooses the level of detail for the part of a weight matrix inside the viewport.
+
+        Args:
+            ranges (list): The (row, start, stop) ranges of inputs inside the viewport,
+                from `SpatialIndex.edgesIn`.
+            width (int): The horizontal distance (in pixels) between the two layers.
+            height (int): The height (in pixels) of the layer.
+            budget (int): The maximum number of canvas items to create for this matrix.
+
+        Returns:
+            LevelOfDetail: `VISIBLE` if every edge in the viewport fits the budget, otherwise
+                `TOP_K` over the visible ranges, or `HEATMAP` for the whole matrix.
+        """
+        visible = sum(stop - start for _, start, stop in ranges)
+        if visible <= budget:
+            return LevelOfDetail(LevelOfDetail.VISIBLE, ranges=ranges)
+        detail = LevelOfDetail.choose(max(stop - start for _, start, stop in ranges), len(ranges),
+                                      width=width, height=height, budget=budget)
+        if detail.mode == LevelOfDetail.TOP_K:
+            detail.ranges = ranges
+        return detail
+
+    @staticmethod
+    def topK(weights, count: int) -> list:
+        """Returns the indices of the `count` weights with the largest magnitude, in index order."""
+        if count >= len(weights):
+            return list(range(len(weights)))
+        return sorted(heapq.nlargest(count, range(len(weights)), key=lambda index: abs(weights[index])))
+
+    @staticmethod
+    def bounds(length: int, bins: int) -> list:
+        """Splits `range(length)` into `bins` nearly equal (start, stop) pairs."""
+        return [(length * i // bins, length * (i + 1) // bins) for i in range(bins)]
+
+    @staticmethod
+    def downsample(matrix, rows: int, cols: int) -> list:
+        """Averages a two-dimensional matrix into a `rows` x `cols` grid.
+
+        Args:
+            matrix: The weight matrix; a sequence of equally sized rows.
+            rows (int): The number of rows in the result.
+            cols (int): The number of columns in the result.
+
+        Returns:
+            list: A `rows` x `cols` list of lists with the mean of every block.
+        """
+        rowBounds = LevelOfDetail.bounds(len(matrix), rows)
+        colBounds = LevelOfDetail.bounds(len(matrix[0]), cols)
+        grid = []
+        for rowStart, rowStop in rowBounds:
+            sums = [0.0] * cols
+            for row in range(rowStart, rowStop):
+                values = matrix[row]
+                for col, (colStart, colStop) in enumerate(colBounds):
+                    sums[col] += sum(values[colStart:colStop])
+            grid.append([total / max(1, (rowStop - rowStart) * (colStop - colStart))
+                         for total, (colStart, colStop) in zip(sums, colBounds)])
+        return grid
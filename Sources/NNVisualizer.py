@@ -1,10 +1,21 @@
+import time
 import tkinter as tk
 from Sources.Toolbar import Toolbar
+from Sources.Activations import ActivationView
+from Sources.LayerStatistics import StatisticsEngine
 from Sources.StateDictionaries import StateDictionaries
-from Sources.Color import Color
-
-
-class NNVisualizer(tk.Frame):
+from Sources.NetworkDrawer import NetworkDrawer
+from Sources.Normalization import Normalizer
+from Sources.Renderers import CanvasRenderer
+from Sources.RenderPlan import RenderPlan
+from Sources.SnapshotFeed import SnapshotSubscriber
+from Sources.SnapshotFetcher import SnapshotFetcher
+from Sources.SnapshotLog import SnapshotReader
+from Sources.StatisticsPanel import StatisticsPanel
+from Sources.UpdateScheduler import UpdateScheduler
+
+
+class NNVisualizer(tk.Frame, NetworkDrawer):
     """Visualizes the state dictionary of a neural net.
 
     Live updates during training are supported through extra threads.
@@ -12,23 +23,111 @@ class NNVisualizer(tk.Frame):
         - Instantiate your ML model.
         - Inject the ML state dictionary into the NNVisualizer
           and update periodically using `update_state_dict`
-          and `update_interval`.
+          and `update_interval`. `update_state_dict` is called on a
+          background thread, so it may take a while without freezing the window.
         - Begin training your model on a separate thread
         - Show the NNVisualizer using `show()` or `mainloop()`.
 
+    `update_interval` is the shortest time between two updates. How often updates
+    are actually drawn adapts to how long fetching and drawing take (see
+    `UpdateScheduler`), up to `target_fps`, and snapshots that did not change since
+    the last one are not drawn at all.
+
+    To keep drawing from taking any time away from training, train in another
+    process instead and publish snapshots with a `SnapshotPublisher`. Pass the
+    same path as `snapshot_feed` here; the newest published snapshot is drawn
+    and older ones are skipped, so the trainer never waits for the window.
+
     If you only want to display the fully-trained model, then just pass
     in the final model into the initializer and show the visualizer.
+
+    State dictionary values may be nested lists, NumPy arrays, torch tensors,
+    or anything supporting the buffer protocol; there is no need to call `tolist()`.
+
+    To replay a training run recorded with `SnapshotWriter`, pass the path of
+    the log as `snapshot_log` and use the timeline below the network to scrub
+    through the recorded snapshots.
+
+    To find out where the time of a slow visualization goes, call `enableProfiling()`.
+    The timings of every frame are passed to the callback and kept in `profiler`,
+    and the frame time and FPS are shown in the corner of the canvas.
+
+    For networks too large to draw in full, pass `virtualize=True`. Only the items
+    in the visible part of the canvas are created then, and zooming in draws the
+    edges there in more detail once the mouse wheel comes to rest.
+
+    Pass `show_statistics=True` to show a histogram, the mean, standard deviation,
+    norm, and sparsity of every weight matrix and bias vector next to the network.
+
+    Weights that stay well within -1.0 and 1.0, or grow far beyond it, all end up
+    in a few colors. Pass a `normalization` mode such as `Normalizer.PERCENTILE`
+    to spread the colors over the values of every layer instead.
+
+    Drawing a large network from scratch can take seconds. Pass `progressive=True`
+    to draw it in slices of `RENDER_SLICE` ms instead, so the window stays responsive:
+    the circles and the strongest edges appear first, and the rest fill in after.
+    A resize starts the drawing over. Zooming meanwhile zooms the rest of the drawing to
+    match, and of the snapshots that arrive meanwhile, only the newest one is drawn
+    once the drawing is done (unless its keys or shapes differ, which starts it over).
+
+    To see how the network responds to real inputs, pass a batch of them as
+    `activation_inputs`; the circles are then colored by their mean activation.
+    Call `setActivationSample` to show the activations for a single sample instead.
+
+    Hovering over a circle or edge shows the state dictionary key, index, and value
+    behind it in a tooltip.
     """
 
-    def __init__(self, state_dict: dict, update_state_dict=None, update_interval: int = -1, master=None):
+    RESIZE_DELAY: int = 100
+    """int: How long (in ms) the window size must stay the same before the network is laid out again."""
+    VIEW_DELAY: int = 150
+    """int: How long (in ms) zooming and panning must stop before the viewport is drawn again."""
+    VIEWPORT_MARGIN: float = 0.25
+    """float: How far (as a fraction of the canvas size) items are drawn beyond the visible area."""
+    FEED_INTERVAL: int = 50
+    """int: How often (in ms) to check `snapshot_feed` if no `update_interval` is given."""
+    RENDER_SLICE: int = 30
+    """int: How long (in ms) progressive drawing may run before handing control back to Tk."""
+    HOVER_TOLERANCE: float = 3.0
+    """float: How far (in pixels) the mouse may be from an edge to inspect it."""
+    ZOOMED_TAG: str = "zoomed"
+    """str: The tag of the items zoomed while drawing progressively."""
+
+    def __init__(self, state_dict: dict, update_state_dict=None, update_interval: int = -1, master=None,
+                 update_tolerance: float = 0.001, item_budget: int = 50000, snapshot_log: str = None,
+                 virtualize: bool = False, snapshot_feed: str = None, show_statistics: bool = False,
+                 normalization: str = Normalizer.FIXED, normalization_scope: str = Normalizer.LAYER,
+                 progressive: bool = False, target_fps: float = 30.0, update_version=None,
+                 skip_unchanged: bool = True, activation_inputs=None):
         """Initializes a new Neural Net Visualizer.
 
         Args:
             state_dict (dict): The state dictionary to visualize.
             update_state_dict: A function that returns an updated version of the state dictionary.
-            update_interval (int): How often (in ms) to check for updated state dictionaries.
+            update_interval (int): The shortest time (in ms) between checks for updated state dictionaries.
                 Does not update the state dictionary of the frequency is less than 0.
             master: The TK root to use. One will be created if left empty.
+            update_tolerance (float): The smallest change in a weight or bias that will
+                cause its line or circle to be recolored during updates.
+            item_budget (int): The maximum number of canvas items to draw. Wide layers
+                are drawn with fewer edges or as heatmaps to stay within the budget.
+            snapshot_log (str): The path of a snapshot log to replay. If `state_dict` is None,
+                the last snapshot in the log is shown first, once there is one.
+            virtualize (bool): Whether to only draw the items in the visible part of the canvas.
+            snapshot_feed (str): The path a `SnapshotPublisher` in another process publishes
+                snapshots to. If `state_dict` is None, the first snapshot is waited for.
+            show_statistics (bool): Whether to show per-layer statistics next to the network.
+            normalization (str): The range the colors are spread over; see `NetworkDrawer.setNormalization`.
+            normalization_scope (str): `Normalizer.LAYER` or `Normalizer.GLOBAL`.
+            progressive (bool): Whether to draw the network a slice at a time, without blocking the window.
+            target_fps (float): The most updates to draw per second, or None for no limit.
+            update_version: An optional function returning a value (such as the training step)
+                that changes whenever the state dictionary does. `update_state_dict` is only
+                called when it changes.
+            skip_unchanged (bool): Whether to compare a checksum of every fetched state
+                dictionary with the last one, and skip drawing it if it did not change.
+            activation_inputs: A batch of inputs to color the circles by the activations of;
+                see `NetworkDrawer.setActivationInputs`.
         """
         if master is None:
             self.master = tk.Tk()
@@ -38,204 +137,431 @@ class NNVisualizer(tk.Frame):
             self.master = master
         super().__init__(master)
 
-        self.state_dict = state_dict
         self.update_state_dict = update_state_dict
         self.update_interval = update_interval
+        self.drawnSnapshots = 0
+        self.snapshotLog = None
+        self.requestedSnapshot = None
+        self.showOverlay = False
+        self.resizeJob = None
+        self.pendingSize = None
+        self.virtualize = virtualize
+        self.viewJob = None
+        self.tooltipItems = None
+        self.progressive = progressive
+        self.renderSteps = None
+        self.renderJob = None
+        self.renderPlan = None
+        self.pendingSnapshot = None
+        # The time spent on progressive drawing since the scheduler last heard of it.
+        self.renderSeconds = 0.0
+        if snapshot_log is not None:
+            self.snapshotLog = SnapshotReader(snapshot_log)
+            if state_dict is None:
+                state_dict = self.snapshotLog.read(self.snapshotLog.wait() - 1)
+        self.feed = None
+        if snapshot_feed is not None:
+            self.feed = SnapshotSubscriber(snapshot_feed)
+            if state_dict is None:
+                state_dict = self.feed.wait()
         self.canvas = tk.Canvas(master=self.master, width=500, height=400, highlightthickness=0)
+        NetworkDrawer.__init__(self, state_dict, renderer=CanvasRenderer(self.canvas),
+                               update_tolerance=update_tolerance, item_budget=item_budget)
+        self.normalizer = Normalizer(normalization, scope=normalization_scope)
+        if activation_inputs is not None:
+            self.activationView = ActivationView(activation_inputs)
         self.canvas.bind("<Configure>", self.rebuild)
 
         self.canvas.bind("<MouseWheel>", self.zoom)
         self.canvas.bind('<ButtonPress-1>', lambda event: self.canvas.scan_mark(event.x, event.y))
         self.canvas.bind("<B1-Motion>", lambda event: self.canvas.scan_dragto(event.x, event.y, gain=1))
-
-        self.toolbar = Toolbar(master=self.master, frame=self, update_func=self.updateColors)
-        self.negativeColor = (255, 0, 0)  # Red
-        self.positiveColor = (0, 0, 255)  # Blue
+        self.canvas.bind("<Motion>", self.hover)
+        self.canvas.bind("<Leave>", lambda event: self.hideTooltip())
+        if virtualize:
+            # Scroll one pixel at a time, so zooming can keep the view exactly in place.
+            self.canvas.config(xscrollincrement=1, yscrollincrement=1)
+            self.canvas.bind("<ButtonRelease-1>", lambda event: self.scheduleViewUpdate())
+            self.viewport = self.visibleRect()
+
+        self.statistics = StatisticsEngine() if show_statistics else None
+        self.statisticsPanel = StatisticsPanel(master=self.master) if show_statistics else None
+        self.toolbar = Toolbar(master=self.master, frame=self, update_func=self.updateColors,
+                               timeline_func=self.scrubTo if self.snapshotLog is not None else None)
         self.create_widgets()
-        if update_state_dict is not None and update_interval >= 0:
-            self.after(update_interval, lambda: self.updateStateDict(new_state_dict=update_state_dict()))
+        if self.snapshotLog is not None:
+            self.refreshTimeline()
 
-    def zoom(self, event):
-        factor = 1.01 ** event.delta
-        self.canvas.scale(tk.ALL, event.x, event.y, factor, factor)
+        self.fetcher = None
+        self.scheduler = UpdateScheduler(minimum_interval=self.feedInterval(), target_fps=target_fps)
+        if update_state_dict is not None and update_interval >= 0:
+            self.fetcher = SnapshotFetcher(update_state_dict, update_interval, preprocess=self.prepareSnapshot,
+                                           checksum=self.snapshotChecksum if skip_unchanged else None,
+                                           version=update_version)
+            self.fetcher.start()
+            self.after(update_interval, self.pollSnapshots)
+        if self.feed is not None:
+            self.after(self.feedInterval(), self.pollFeed)
+
+    def destroy(self):
+        self.cancelRender()
+        if self.fetcher is not None:
+            self.fetcher.stop()
+        if self.snapshotLog is not None:
+            self.snapshotLog.close()
+        if self.feed is not None:
+            self.feed.close()
+        super().destroy()
+
+    def pollSnapshots(self):
+        """Draws the newest snapshot from the fetcher, if there is one, and checks again later."""
+        snapshot = self.fetcher.take()
+        if snapshot is None:
+            interval = self.scheduler.idle()
+        else:
+            new_state_dict, plan = snapshot
+            self.profiler.add('fetch', self.fetcher.fetchSeconds)
+            self.profiler.add('prepare', self.fetcher.preprocessSeconds)
+            start = time.perf_counter()
+            self.updateStateDict(new_state_dict, plan=plan)
+            interval = self.scheduler.drawn(self.drawSeconds(start),
+                                            self.fetcher.fetchSeconds + self.fetcher.preprocessSeconds)
+        # Fetching faster than snapshots are drawn would only drop them.
+        self.fetcher.interval = interval
+        self.after(interval, self.pollSnapshots)
+
+    def feedInterval(self) -> int:
+        return self.update_interval if self.update_interval >= 0 else self.FEED_INTERVAL
+
+    def pollFeed(self):
+        """Draws the newest snapshot from `snapshot_feed`, if there is one, and checks again later."""
+        state_dict = self.feed.poll()
+        if state_dict is None:
+            interval = self.scheduler.idle()
+        else:
+            self.profiler.add('fetch', self.feed.readSeconds)
+            start = time.perf_counter()
+            self.updateStateDict(state_dict)
+            interval = self.scheduler.drawn(self.drawSeconds(start), self.feed.readSeconds)
+        self.after(interval, self.pollFeed)
 
-    def rebuild(self, event=None):
-        originalHeight = self.height()
-        originalWidth = self.width()
-        self.canvas.config(width=event.width, height=event.height)
-        if originalHeight != self.canvas.winfo_reqheight() or originalWidth != self.canvas.winfo_reqwidth():
-            self.canvas.delete(tk.ALL)
-            self.drawNN()
+    def drawSeconds(self, start: float) -> float:
+        """Returns the time spent drawing since `start`, plus any progressive drawing since the last call.
 
-    def updateStateDict(self, new_state_dict):
-        """Updates the local state dictionary and redraws the screen."""
+        A progressive drawing started by a snapshot goes on after `updateStateDict`
+        returns, so its slices are counted towards the next snapshot instead.
+        """
+        seconds = time.perf_counter() - start + self.renderSeconds
+        self.renderSeconds = 0.0
+        return seconds
 
-        # Refresh the state dictionary and redraw the screen
-        self.state_dict = new_state_dict
-        self.canvas.delete(tk.ALL)
-        self.drawNN()
-        self.update()
+    def scrubTo(self, index: int):
+        """Shows snapshot `index` of the snapshot log.
 
-        # Call this function again if applicable and continue checking for updates
-        if self.update_state_dict is not None and self.update_interval >= 0:
-            self.after(self.update_interval, lambda: self.updateStateDict(self.update_state_dict()))
+        The slider can move much faster than snapshots can be drawn, so only the
+        latest requested snapshot is drawn once Tk is idle.
+        """
+        if self.requestedSnapshot is None:
+            self.after_idle(self.showRequestedSnapshot)
+        self.requestedSnapshot = index
+
+    def showRequestedSnapshot(self):
+        index = self.requestedSnapshot
+        self.requestedSnapshot = None
+        self.toolbar.setTimelineLabel(f"Step {self.snapshotLog.steps[index]}")
+        self.updateStateDict(self.snapshotLog.read(index))
+
+    def refreshTimeline(self):
+        """Extends the timeline with snapshots appended to the log, and checks again later."""
+        self.toolbar.setTimelineLength(self.snapshotLog.refresh())
+        self.after(1000, self.refreshTimeline)
+
+    def snapshotStats(self) -> dict:
+        """Returns how many snapshots were fetched, drawn, dropped, and found unchanged, and how many fetches failed.
+
+        Snapshots are dropped when a newer one arrives before the previous one was drawn.
+        Failed fetches are logged by the fetcher; `fetcher.lastError` is the last exception.
+        """
+        fetched = self.fetcher.fetchedCount if self.fetcher is not None else 0
+        dropped = self.fetcher.droppedCount if self.fetcher is not None else 0
+        unchanged = self.fetcher.unchangedCount if self.fetcher is not None else 0
+        errors = self.fetcher.errorCount if self.fetcher is not None else 0
+        if self.feed is not None:
+            fetched += self.feed.receivedCount
+            dropped += self.feed.droppedCount
+        return {'fetched': fetched, 'drawn': self.drawnSnapshots, 'dropped': dropped, 'unchanged': unchanged,
+                'errors': errors}
 
-    def xStart(self, count: int = None) -> int:
-        """Returns the starting x position to use."""
-        if count is None:
-            return 50
+    def zoom(self, event):
+        factor = 1.01 ** event.delta
+        self.hideTooltip()
+        if not self.virtualize:
+            x, y = event.x, event.y
         else:
-            return self.incrementAmount(count) // 2
+            x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        self.zoomItems(x, y, factor)
+        if self.renderSteps is not None:
+            # The rest of a progressive drawing is zoomed to match, see `zoomNewItems`.
+            self.canvas.addtag_all(self.ZOOMED_TAG)
+        if self.virtualize:
+            # Only the items in the viewport exist, so scaling them is cheap. They are
+            # drawn again at the new zoom (without any rounding drift) once zooming stops.
+            self.scheduleViewUpdate()
+
+    def scheduleViewUpdate(self):
+        """Draws the viewport again once no zooming or panning happened for `VIEW_DELAY` ms."""
+        if self.viewJob is not None:
+            self.after_cancel(self.viewJob)
+        self.viewJob = self.after(self.VIEW_DELAY, self.updateViewport)
+
+    def updateViewport(self):
+        """Draws the items in the visible part of the canvas, at the current zoom."""
+        self.viewJob = None
+        scale, (shiftX, shiftY) = self.pendingScale, self.pendingShift
+        self.pendingScale, self.pendingShift = 1.0, (0.0, 0.0)
+        # The scaled items are at `scale * c + shift`, but drawn at the new zoom they
+        # land at `scale * c`, so scroll by the shift to keep them in place on screen.
+        self.canvas.xview_scroll(-round(shiftX), 'units')
+        self.canvas.yview_scroll(-round(shiftY), 'units')
+        self.setViewport(self.visibleRect(), zoom=self.zoomLevel * scale)
+
+    def visibleRect(self) -> tuple:
+        """Returns the visible part of the canvas, plus `VIEWPORT_MARGIN` on every side."""
+        x, y = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        width, height = self.width(), self.height()
+        marginX, marginY = width * self.VIEWPORT_MARGIN, height * self.VIEWPORT_MARGIN
+        return x - marginX, y - marginY, x + width + marginX, y + height + marginY
 
-    def incrementAmount(self, horizontalCount: int = None) -> int:
-        """The amount to increment horizontally across the screen.
-
-        Args:
-            horizontalCount (int): The number of layers in the neural net.
+    def rebuild(self, event=None):
+        """Lays the neural net out again for the new size of the canvas.
 
-        Returns:
-            int: The amount to increase the current X position while drawing.
+        Dragging the edge of the window sends many `<Configure>` events, so they are
+        coalesced: only the last size is applied, once no event arrived for `RESIZE_DELAY` ms.
         """
-        if horizontalCount is None:
-            return 100
+        if event is not None:
+            self.pendingSize = (event.width, event.height)
+        if self.resizeJob is not None:
+            self.after_cancel(self.resizeJob)
+        self.resizeJob = self.after(self.RESIZE_DELAY, self.applyResize)
+
+    def applyResize(self):
+        self.resizeJob = None
+        if self.pendingSize is None:
+            return
+        width, height = self.pendingSize
+        if width != self.width() or height != self.height():
+            self.renderer.resize(width, height)
+            if self.virtualize:
+                self.viewport = self.visibleRect()
+            self.relayout()
+
+    def relayout(self):
+        self.hideTooltip()
+        NetworkDrawer.relayout(self)
+
+    def layoutPoint(self, x: int, y: int) -> (float, float):
+        """Converts a point of the canvas widget (such as an event position) to the coordinates of the layout."""
+        x, y = self.canvas.canvasx(x), self.canvas.canvasy(y)
+        scale, (shiftX, shiftY) = self.pendingScale, self.pendingShift
+        return (x - shiftX) / scale, (y - shiftY) / scale
+
+    def hover(self, event):
+        """Shows a tooltip with the value of the circle or edge under the mouse."""
+        x, y = self.layoutPoint(event.x, event.y)
+        hit = self.inspect(x, y, tolerance=self.HOVER_TOLERANCE / self.pendingScale)
+        if hit is None:
+            self.hideTooltip()
+            return
+        self.showTooltip(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y), self.describe(hit))
+
+    @staticmethod
+    def describe(hit: dict) -> str:
+        """Returns the text of the tooltip for a hit from `inspect`."""
+        kind, index = hit['kind'], hit['index']
+        if kind == 'input':
+            text = f"input {index[0]}"
+        elif kind == 'block':
+            (rowStart, rowStop), (colStart, colStop) = index
+            text = f"{hit['key']}[{rowStart}:{rowStop}, {colStart}:{colStop}]\nmean = {hit['value']:+.6g}"
+        elif hit['key'] is None:
+            text = f"{hit['layer'] or 'layer'} neuron {index[0]} (no bias)"
         else:
-            width = self.width() // (horizontalCount + 1)
-            return width
+            text = f"{hit['key']}[{', '.join(map(str, index))}] = {hit['value']:+.6g}"
+        if 'activation' in hit:
+            text += f"\nactivation = {hit['activation']:+.6g}"
+        return text
+
+    def showTooltip(self, x: float, y: float, text: str):
+        """Shows `text` in a box next to the point (x, y) of the canvas, above every other item."""
+        if self.tooltipItems is None:
+            self.tooltipItems = (
+                self.canvas.create_rectangle(0, 0, 0, 0, fill="#FFFFE0", outline="grey", tags=("tooltip",)),
+                self.canvas.create_text(0, 0, anchor=tk.NW, font=("TkFixedFont", 9), tags=("tooltip",)))
+        box, label = self.tooltipItems
+        self.canvas.itemconfig(label, text=text)
+        self.canvas.coords(label, x + 12, y + 12)
+        x1, y1, x2, y2 = self.canvas.bbox(label)
+        self.canvas.coords(box, x1 - 3, y1 - 2, x2 + 3, y2 + 2)
+        self.canvas.itemconfig("tooltip", state=tk.NORMAL)
+        self.canvas.tag_raise(box)
+        self.canvas.tag_raise(label)
+
+    def hideTooltip(self):
+        if self.tooltipItems is not None:
+            self.canvas.itemconfig("tooltip", state=tk.HIDDEN)
 
-    def radius(self, count: int = None) -> int:
-        """Returns the radius to use for the circles.
+    def drawNN(self):
+        """Draws the neural net, a slice at a time if `progressive` is set.
 
-        Args:
-            count (int): The number of elements being placed vertically.
-                More circles will mean a smaller radius.
-        Returns:
-            int: The radius to use for all circles.
+        A progressive drawing that is still going on is stopped first, since
+        whatever it was drawing has been cleared.
         """
-        if count is None:
-            return 20
-        else:
-            return max(10, int(self.height() / (5 * count)))
+        self.pendingScale, self.pendingShift = 1.0, (0.0, 0.0)
+        self.tooltipItems = None
+        if not self.progressive:
+            NetworkDrawer.drawNN(self)
+            return
+        self.cancelRender()
+        self.renderPlan = RenderPlan.of(self.state_dict)
+        self.renderSteps = self.drawSteps()
+        self.renderJob = self.after_idle(self.renderSlice)
+
+    def renderSlice(self):
+        """Draws the next pieces of a progressive drawing for up to `RENDER_SLICE` ms."""
+        self.renderJob = None
+        start = time.perf_counter()
+        deadline = start + self.RENDER_SLICE / 1000
+        with self.profiler.frame():
+            for _ in self.renderSteps:
+                if time.perf_counter() >= deadline:
+                    break
+            else:
+                self.renderSteps = None
+            self.renderer.lower("edges")
+            self.zoomNewItems()
+        if self.renderSteps is None:
+            self.canvas.dtag(tk.ALL, self.ZOOMED_TAG)
+            if self.pendingSnapshot is not None:
+                new_state_dict, plan = self.pendingSnapshot
+                self.pendingSnapshot = None
+                self.updateStateDict(new_state_dict, plan=plan)
+        self.renderSeconds += time.perf_counter() - start
+        if self.renderSteps is not None:
+            self.renderJob = self.after(1, self.renderSlice)
+
+    def zoomNewItems(self):
+        """Zooms the items a progressive drawing added since the last zoom to match the others.
+
+        New items are drawn at the coordinates of the layout, while the ones already
+        on the canvas were zoomed, which tagged them with `ZOOMED_TAG`.
+        """
+        if self.pendingScale == 1.0 and self.pendingShift == (0.0, 0.0):
+            return
+        self.matchZoom(f"!{self.ZOOMED_TAG} && !tooltip")
+        self.canvas.addtag_all(self.ZOOMED_TAG)
 
-    def height(self) -> int:
-        """The height of the view, or a default value of 400."""
-        height = self.canvas.winfo_reqheight()
-        return height if height != 1 else 400
+    def cancelRender(self):
+        """Stops a progressive drawing that is still going on."""
+        if self.renderJob is not None:
+            self.after_cancel(self.renderJob)
+            self.renderJob = None
+        if self.renderSteps is not None:
+            self.renderSteps.close()
+            self.renderSteps = None
 
-    def width(self) -> int:
-        """The width of the view, or a default value of 500."""
-        width = self.canvas.winfo_reqwidth()
-        return width if width != 1 else 500
+    def updateStateDict(self, new_state_dict, plan=None):
+        """Updates the local state dictionary and redraws the screen.
 
-    @staticmethod
-    def yPositions(height: int, count: int) -> list:
-        """Generates a list of y positions with the given number of separators.
+        See `NetworkDrawer.setStateDict` for when items are recolored instead of redrawn.
 
         Args:
-            height (int): The total height of the window.
-            count (int): The number of positions to have in the generated list.
+            new_state_dict (dict): The state dictionary to show.
+            plan (RenderPlan): The plan of `new_state_dict` from `prepareSnapshot`, if already known.
+        """
+        if self.renderSteps is not None:
+            if plan is None:
+                new_state_dict, plan = self.prepareSnapshot(new_state_dict)
+            if plan is self.renderPlan:
+                # Starting over for every snapshot would never finish while training
+                # runs, so only the newest one is kept until the drawing is done.
+                self.pendingSnapshot = (new_state_dict, plan)
+                return
+        # Refresh the state dictionary and redraw the screen
+        with self.profiler.frame():
+            self.setStateDict(new_state_dict, plan=plan)
+            self.drawnSnapshots += 1
+            self.refreshStatistics()
+            with self.profiler.measure('tk'):
+                self.update()
 
-        Returns:
-            int: Y-coordinates to place `count` items centered on the window.
+    def enableProfiling(self, callback=None, overlay: bool = True):
+        """Starts recording the timings and Tk call counts of every drawn frame.
+
+        The 'fetch' and 'prepare' phases of live updates are measured on the fetcher
+        thread, and 'tk' is the time Tk takes to process the changed canvas.
+
+        Args:
+            callback: An optional function called with the `FrameStats` of every frame.
+            overlay (bool): Whether to show the frame time and FPS on the canvas.
         """
-        separators = height / (count + 1)
-        return [separators * i for i in range(1, count + 1)]
+        self.showOverlay = overlay
+
+        def frameDrawn(stats):
+            if self.showOverlay:
+                self.drawOverlay(stats)
+            if callback is not None:
+                callback(stats)
+
+        NetworkDrawer.enableProfiling(self, callback=frameDrawn)
+
+    def drawOverlay(self, stats):
+        """Shows the time, FPS, and item counts of the last frame in the top left corner of the canvas."""
+        text = (f"{stats.seconds * 1000:.1f} ms  {self.profiler.fps:.1f} FPS\n"
+                f"{stats.created} created  {stats.updated} updated  {stats.calls} Tk calls")
+        x, y = self.canvas.canvasx(5), self.canvas.canvasy(5)
+        if self.canvas.find_withtag("overlay"):
+            self.canvas.itemconfig("overlay", text=text)
+            self.canvas.coords("overlay", x, y)
+            self.canvas.tag_raise("overlay")
+        else:
+            self.canvas.create_text(x, y, text=text, anchor=tk.NW, font=("TkFixedFont", 9), tags=("overlay",))
 
     def create_widgets(self):
         """Creates all of the important widgets on screen."""
         self.drawNN()
+        if self.statisticsPanel is not None:
+            self.statisticsPanel.create_widgets()
+            self.refreshStatistics()
         self.canvas.pack(fill=tk.BOTH, expand=True)
         self.toolbar.create_widgets()
 
-    def updateColors(self):
-        """Updates the local `positiveColor` and `negativeColor` to match
-        the values of the text of the text fields.
-        """
-        self.toolbar.updateColors()
-        self.positiveColor = self.toolbar.positiveColor
-        self.negativeColor = self.toolbar.negativeColor
-        self.canvas.delete(tk.ALL)
-        self.drawNN()
-
-    def drawNN(self):
-        """Draws the neural net on the canvas."""
-        # Values for drawing on the screen
-        # Lines are drawn first, then circles.
-        # Otherwise, circles would have lines drawn over them.
-        inputCount = len(list(self.state_dict.values())[0][0])
-        horizontalCount = len(self.state_dict) // 2
-        x = self.xStart(count=horizontalCount) + self.incrementAmount(horizontalCount)
-
-        # Draw the line weights first; circles will be drawn over them later.
-        for index, listItem in enumerate(self.state_dict.values()):
-            # Even items are weights and odd items are biases
-            if index % 2 == 0:
-                # Weights: draw lines (likely two-dimensional)
-                yPositions = self.yPositions(self.height(), len(listItem))
-                for weights, yPos in zip(listItem, yPositions):
-                    self.drawLines(x, yPos, weights)
-                x += self.incrementAmount(horizontalCount=(len(self.state_dict) // 2))
-
-        # Draw the input circles.
-        x = self.xStart(count=horizontalCount)
-        self.drawInputCircles(x, self.height(), inputCount, radius=self.radius(inputCount))
-        x += self.incrementAmount(horizontalCount=horizontalCount)
-
-        # Draw each layer of biases.
-        for index, listItem in enumerate(self.state_dict.values()):
-            if index % 2 == 1:
-                # Biases: draw circles
-                self.drawLayer(x, listItem, self.radius(len(listItem)))
-                x += self.incrementAmount(horizontalCount=(len(self.state_dict) // 2))
-
-    def drawCircle(self, x: int, y: int, r: int, color: str, outline: str = "grey"):
-        """Draws a circle onto the canvas.
+    def refreshStatistics(self, recompute: bool = True):
+        """Shows the statistics of the weights and biases in the statistics panel, if it is shown.
 
         Args:
-            x (int): The X-coordinate to place the circle.
-            y (int): The Y-coordinate to place the circle.
-            r (int): The radius of the circle.
-            color (str): The color to fill the circle.
-            outline (str): The outline of the circle. Defaults to 'grey'.
+            recompute (bool): Whether to compute the statistics of `state_dict` again,
+                or only show the last ones (for example, in new colors).
         """
-        self.canvas.create_oval(x - r, y - r, x + r, y + r, fill=color, outline=outline)
-
-    def drawLayer(self, xPos: int, biases: list, radius: int = 20):
-        for bias, yPos in zip(biases, self.yPositions(self.height(), len(biases))):
-            self.drawCircle(xPos, yPos, radius, self.numToColor(bias))
-
-    def drawInputCircles(self, xPos: int, height: int, count: int, radius: int = 20):
-        yPositions = self.yPositions(height, count)
-        for yPos in yPositions:
-            self.drawCircle(xPos, yPos, radius, color="#EEEEEE")
-
-    def numToColor(self, num: float) -> str:
-        """Interpolates the number (0.0-1.0) into a color.
-
-        Args:
-            num (float): The number (0.0-1.0) to convert into a number.
+        if self.statisticsPanel is None:
+            return
+        keys = [key for layer in RenderPlan.of(self.state_dict).layers
+                for key in (layer.weightKey, layer.biasKey) if key is not None]
+        with self.profiler.measure('statistics'):
+            if recompute:
+                self.statistics.update(self.state_dict, keys)
+            self.statisticsPanel.refresh(self.statistics.layers, keys, self.palette)
 
-        Returns:
-            str: The hex value of the number converted to a string (#RRGGBB).
-        """
-        progress = (num + 1) / 2
-        red, green, blue = Color.interpolateColor(self.negativeColor, self.positiveColor, progress)
-        return Color.rgbToHex(red, green, blue)
-
-    def drawLine(self, x1: int, y1: int, x2: int, y2: int, color: str, width: float = 2):
-        self.canvas.create_line((x1, y1), (x2, y2), fill=color, width=width)
-
-    def drawLines(self, xPos: int, yPos: int, lineWeights: list):
-        """Draws lines between the left and right.
+    def updateColors(self):
+        """Updates the local `positiveColor` and `negativeColor` to match
+        the values of the text of the text fields.
 
-        Args:
-            xPos (int): The starting x position to draw lines.
-            yPos (int): The starting y position to draw lines.
-            lineWeights (int): The weight of each line.
+        Nothing is redrawn if a field is invalid or the colors did not change.
         """
-        x = xPos - self.incrementAmount(horizontalCount=(len(self.state_dict) // 2))
-        for weight, y in zip(lineWeights, self.yPositions(self.height(), len(lineWeights))):
-            lineWidth = min(2, max(1, abs(weight) + 1))
-            self.drawLine(xPos, yPos, x, y, color=self.numToColor(weight), width=lineWidth)
+        if not self.toolbar.updateColors():
+            return
+        if (self.toolbar.negativeColor, self.toolbar.positiveColor) == (self.negativeColor, self.positiveColor):
+            return
+        self.setColors(self.toolbar.negativeColor, self.toolbar.positiveColor)
+        self.refreshStatistics(recompute=False)
 
     def show(self):
         """Opens the visualizer on screen. Blocks the thread until
@@ -0,0 +1,1019 @@
+import math
+
+from Sources.Activations import ActivationView
+from Sources.Color import ColorPalette
+from Sources.Layout import Layout
+from Sources.LevelOfDetail import LevelOfDetail
+from Sources.Normalization import Normalizer
+from Sources.Profiler import Profiler
+from Sources.Renderers import RasterRenderer
+from Sources.RenderPlan import RenderPlan
+from Sources.SpatialIndex import SpatialIndex
+from Sources.StateDictionaries import StateDictionaries
+from Sources.Tensors import Tensors
+
+
+class NetworkDrawer:
+    """Lays out and draws the state dictionary of a neural net.
+
+    All drawing goes through a renderer, such as a `CanvasRenderer` for the Tk
+    window or a `RasterRenderer` for PNG images, so the same layout (`xStart`,
+    `incrementAmount`, `yPositions`, and `radius`) is used everywhere.
+    Which values are weights and which are biases is decided by a `RenderPlan`
+    compiled from the key names and shapes of the state dictionary.
+
+    Large networks can be drawn virtualized with `setViewport`: the layout is
+    scaled by a zoom factor, and only the items inside a rectangle of it are
+    created, with a level of detail chosen for what is actually visible.
+
+    Values are colored between -1.0 and 1.0 by default. `setNormalization` spreads
+    the colors over the range of the values instead, per layer or for the whole network.
+
+    Every colored item is tagged with the palette bucket of its value (such as
+    'bucket511'), so `setColors` only needs to reconfigure one tag per bucket in use
+    instead of drawing every line and circle again.
+
+    Circles show the biases by default. `setActivationInputs` runs a batch of inputs
+    through the network and colors every circle (including the inputs) by its activation.
+
+    `inspect` finds the circle or edge at a point of the layout and the state
+    dictionary value behind it, for tooltips.
+    """
+
+    def __init__(self, state_dict: dict, renderer, update_tolerance: float = 0.001, item_budget: int = 50000):
+        """Initializes a new drawer. Nothing is drawn until `drawNN()` or `redraw()` is called.
+
+        Args:
+            state_dict (dict): The state dictionary to draw.
+            renderer: The `CanvasRenderer` or `RasterRenderer` to draw with.
+            update_tolerance (float): The smallest change in a weight or bias that will
+                cause its line or circle to be recolored during updates, relative to
+                the range of -1.0 to 1.0. Normalized palettes scale it to their range.
+            item_budget (int): The maximum number of items to draw. Wide layers
+                are drawn with fewer edges or as heatmaps to stay within the budget,
+                and columns with too many circles as strips of averaged blocks.
+        """
+        self.state_dict = Tensors.stateDictView(state_dict)
+        self.renderer = renderer
+        self.update_tolerance = update_tolerance
+        self.item_budget = item_budget
+        self.negativeColor = (255, 0, 0)  # Red
+        self.positiveColor = (0, 0, 255)  # Blue
+        self.palette = ColorPalette(self.negativeColor, self.positiveColor)
+        self.normalizer = Normalizer()
+        self.palettes = {}
+        self.bucketTags = [f"bucket{bucket}" for bucket in range(self.palette.buckets)]
+        self.drawnBuckets = set()
+        self.activationView = None
+        self.nodeValues = None
+        self.nodePalettes = None
+        self.snapshotVersion = 0
+
+        # Item IDs keyed by (layer, row, col) for lines and (layer, row) for circles,
+        # along with the values they were last drawn with. Input circles use layer -1.
+        self.lineItems = {}
+        self.circleItems = {}
+        self.drawnValues = {}
+        self.drawnPlan = None
+        self.layerDetails = {}
+        # The number of blocks of every column of circles (0 for the inputs) drawn as a strip instead.
+        self.nodeSummaries = {}
+        self.currentLayout = None
+        # The items drawn are at `pendingScale * c + pendingShift` for the coordinates c
+        # of the layout after `zoomItems`, until they are drawn again.
+        self.pendingScale = 1.0
+        self.pendingShift = (0.0, 0.0)
+        self.zoomLevel = 1.0
+        self.viewport = None
+        self._spatialIndex = None
+        self.profiler = Profiler(renderer)
+
+    def enableProfiling(self, callback=None):
+        """Starts recording the timings and renderer call counts of every drawn frame.
+
+        The results are kept in `profiler.frames`, and `profiler.lastFrame` and
+        `profiler.fps` summarize them.
+
+        Args:
+            callback: An optional function called with the `FrameStats` of every frame.
+        """
+        self.profiler.callback = callback
+        self.profiler.enabled = True
+
+    def disableProfiling(self):
+        """Stops recording frames."""
+        self.profiler.enabled = False
+
+    def setColors(self, negativeColor, positiveColor):
+        """Changes the colors of negative and positive values and recolors the neural net with them.
+
+        Args:
+            negativeColor (int, int, int): The RGB color for negative weights/biases.
+            positiveColor (int, int, int): The RGB color for positive weights/biases.
+        """
+        self.negativeColor = negativeColor
+        self.positiveColor = positiveColor
+        self.palette = ColorPalette(negativeColor, positiveColor, buckets=self.palette.buckets)
+        self.palettes = {key: self.palette.withRange(palette.minimum, palette.maximum)
+                         for key, palette in self.palettes.items()}
+        self.recolor()
+
+    def recolor(self):
+        """Recolors the neural net after `palette` (and the `palettes` made from it) changed colors.
+
+        If the renderer keeps its items, every bucket tag in use is reconfigured
+        with its new color, which costs the same no matter how large the network is.
+        Otherwise, the neural net is drawn again.
+        """
+        if self.nodePalettes is not None:
+            self.nodePalettes = [self.palette.withRange(palette.minimum, palette.maximum)
+                                 for palette in self.nodePalettes]
+        if not self.renderer.retainsItems or self.drawnPlan is None:
+            self.redraw()
+            return
+        with self.profiler.frame():
+            with self.profiler.measure('recolor'):
+                colors = self.palette.colors
+                for bucket in sorted(self.drawnBuckets):
+                    self.renderer.configure(self.bucketTags[bucket], fill=colors[bucket])
+
+    def setNormalization(self, mode: str, scope: str = Normalizer.LAYER, percentile: float = 0.01):
+        """Changes the range of values that the colors are spread over and draws the neural net with it.
+
+        Args:
+            mode (str): `Normalizer.FIXED` (-1.0 to 1.0), `MIN_MAX`, `ABS_MAX`, or `PERCENTILE`.
+            scope (str): `Normalizer.LAYER` to give every weight matrix and bias vector
+                its own range, or `Normalizer.GLOBAL` to share one range.
+            percentile (float): The fraction of values clipped at either end in `PERCENTILE` mode.
+        """
+        self.normalizer = Normalizer(mode, scope=scope, percentile=percentile)
+        self.palettes.clear()
+        self.redraw()
+
+    def updatePalettes(self, plan: RenderPlan) -> set:
+        """Adds `state_dict` to the normalizer and updates the palette of every weight matrix and bias vector.
+
+        Returns:
+            set: The keys whose palette changed, so their items need to be recolored.
+        """
+        if self.normalizer.mode == Normalizer.FIXED:
+            self.palettes.clear()
+            return set()
+        keys = [key for layer in plan.layers for key in (layer.weightKey, layer.biasKey) if key is not None]
+        changed = self.normalizer.update(self.state_dict, keys)
+        for key in keys:
+            palette = self.palettes.get(key)
+            if key in changed or palette is None or palette.colors is not self.palette.colors:
+                self.palettes[key] = self.palette.withRange(*self.normalizer.rangeFor(key))
+        return changed
+
+    def setActivationInputs(self, inputs, sample: int = None, activations=None):
+        """Colors every circle by its activation for a batch of inputs, and draws the neural net with them.
+
+        Args:
+            inputs: The batch of inputs, as a (batch, inputs) NumPy array or nested list,
+                or None to color the circles by their biases again.
+            sample (int): The sample to show, or None to show the mean over the batch.
+            activations: The activation function of every layer; see `ActivationView`.
+
+        Raises:
+            ValueError: If the network is not fully connected, or the inputs do not fit it.
+        """
+        view = None
+        if inputs is not None:
+            view = ActivationView(inputs, sample=sample, activations=activations)
+            view.forward(self.state_dict, RenderPlan.of(self.state_dict), self.snapshotVersion)
+        self.activationView = view
+        self.redraw()
+
+    def setActivationSample(self, sample: int = None):
+        """Colors the circles by the activations for another sample of the batch (or the mean, if None).
+
+        The activations are cached, so only the circles are recolored.
+
+        Raises:
+            ValueError: If no inputs were given with `setActivationInputs`.
+        """
+        if self.activationView is None:
+            raise ValueError("There are no activations to show a sample of; call setActivationInputs first.")
+        self.activationView.sample = sample
+        if not self.renderer.retainsItems or self.drawnPlan is None:
+            self.redraw()
+            return
+        with self.profiler.frame():
+            with self.profiler.measure('activations'):
+                changed = self.updateNodeValues(self.drawnPlan)
+            with self.profiler.measure('update'):
+                self.recolorNodes(changed, tolerance=0.0)
+
+    def updateNodeValues(self, plan: RenderPlan) -> set:
+        """Runs (or looks up) the activations of `state_dict` and updates `nodeValues` and `nodePalettes`.
+
+        Every column is colored between minus and plus its largest activation over the batch.
+
+        Returns:
+            set: The columns whose palette changed, so all of their circles need to be recolored.
+        """
+        if self.activationView is None:
+            self.nodeValues = self.nodePalettes = None
+            return set()
+        columns = self.activationView.forward(self.state_dict, plan, self.snapshotVersion)
+        self.nodeValues, limits = self.activationView.nodeValues(columns)
+        oldPalettes = self.nodePalettes or []
+        self.nodePalettes = [self.palette.withRange(-limit, limit) if limit > 0 else self.palette
+                             for limit in limits]
+        return {column for column, palette in enumerate(self.nodePalettes)
+                if column >= len(oldPalettes) or (oldPalettes[column].minimum, oldPalettes[column].maximum)
+                != (palette.minimum, palette.maximum)}
+
+    def recolorNodes(self, changed=frozenset(), tolerance: float = None):
+        """Recolors the existing circles to match `nodeValues`.
+
+        Only circles whose value moved by at least `tolerance` (`update_tolerance`,
+        scaled to the range of the column's palette, by default) are reconfigured,
+        unless their column is in `changed`.
+        """
+        drawnValues = self.drawnValues
+        colors, bucketTags = self.palette.colors, self.bucketTags
+        for column, values in enumerate(self.nodeValues):
+            layer = column - 1
+            if column in self.nodeSummaries:
+                self.redrawNodeSummary(column)
+                continue
+            if column in changed:
+                columnTolerance = -1.0
+            elif tolerance is None:
+                columnTolerance = self.toleranceFor(palette=self.nodePalettes[column])
+            else:
+                columnTolerance = tolerance
+            buckets = None
+            for row, value in enumerate(values):
+                key = (layer, row)
+                drawnValue = drawnValues.get(key)
+                if drawnValue is None or abs(value - drawnValue) < columnTolerance:
+                    continue
+                if buckets is None:
+                    buckets = self.bucketsFor(values, palette=self.nodePalettes[column])
+                bucket = buckets[row]
+                self.renderer.configure(self.circleItems[key], fill=colors[bucket], tags=(bucketTags[bucket],))
+                drawnValues[key] = value
+
+    def redraw(self):
+        """Clears the renderer and draws the neural net from scratch."""
+        with self.profiler.frame():
+            with self.profiler.measure('clear'):
+                self.renderer.clear()
+            self.lineItems.clear()
+            self.circleItems.clear()
+            self.drawnValues.clear()
+            self.drawnBuckets.clear()
+            self.layerDetails.clear()
+            self.drawNN()
+
+    def setViewport(self, rect: tuple, zoom: float = 1.0):
+        """Only draws the items inside `rect` from now on, and draws them again.
+
+        Args:
+            rect (tuple): The (x1, y1, x2, y2) rectangle to draw, in the coordinates of the
+                layout scaled by `zoom`. None draws everything.
+            zoom (float): How much to scale the layout. A zoom of 2 lays the network out
+                as if the view was twice as wide and twice as high.
+        """
+        self.viewport = rect
+        self.zoomLevel = zoom
+        self.redraw()
+
+    def zoomItems(self, x: float, y: float, factor: float):
+        """Zooms every drawn item by `factor` around the point (x, y) without drawing it again.
+
+        Items that updates draw again later, such as reduced weight matrices and
+        strips of circles, are zoomed to match with `matchZoom`.
+        """
+        self.renderer.zoom("all", factor, x * (1 - factor), y * (1 - factor))
+        shiftX, shiftY = self.pendingShift
+        self.pendingScale *= factor
+        self.pendingShift = (x + (shiftX - x) * factor, y + (shiftY - y) * factor)
+
+    def matchZoom(self, item):
+        """Zooms an item or every item with a tag, drawn at the coordinates of the layout, like the rest."""
+        scale, (shiftX, shiftY) = self.pendingScale, self.pendingShift
+        if scale != 1.0 or shiftX != 0.0 or shiftY != 0.0:
+            self.renderer.zoom(item, scale, shiftX, shiftY)
+
+    def spatialIndex(self) -> SpatialIndex:
+        """Returns the `SpatialIndex` of `currentLayout`."""
+        if self._spatialIndex is None or self._spatialIndex.layout is not self.currentLayout:
+            self._spatialIndex = SpatialIndex(self.currentLayout)
+        return self._spatialIndex
+
+    def inspect(self, x: float, y: float, tolerance: float = 3.0) -> dict:
+        """Finds the drawn circle or edge at a point of the layout, and the value it shows.
+
+        Circles take precedence over edges, and of the edges within `tolerance`, the
+        nearest one that is actually drawn is chosen. The hit is looked up in
+        `spatialIndex()`, so the renderer is never queried.
+
+        Args:
+            x (float): The x position, in the coordinates of the (zoomed) layout.
+            y (float): The y position, in the coordinates of the (zoomed) layout.
+            tolerance (float): How far (in the coordinates of the layout) an edge may be from the point.
+
+        Returns:
+            dict: None if nothing is drawn at the point. Otherwise, 'kind' is 'input', 'bias',
+                'weight', or 'block' (a heatmap rectangle); 'key' is the state dictionary key,
+                'index' the index into its value ((row, col) for weights, and ((rowStart, rowStop),
+                (colStart, colStop)) for the weights averaged by a block), 'value' the value, and
+                'layer' the module name. Circles also have an 'activation' when colored by one.
+        """
+        plan, layout = self.drawnPlan, self.currentLayout
+        if plan is None or layout is None:
+            return None
+        index = self.spatialIndex()
+        circleItems = self.circleItems
+        circle = index.circleAt(x, y, drawn=lambda column, row: (column - 1, row) in circleItems)
+        if circle is not None:
+            column, row = circle
+            hit = {'kind': 'input', 'key': None, 'index': (row,), 'value': None, 'layer': None}
+            if column > 0:
+                planned = plan.layers[column - 1]
+                hit.update(kind='bias', key=planned.biasKey, layer=planned.module)
+                if planned.biasKey is not None:
+                    hit['value'] = self.state_dict[planned.biasKey][row]
+            if self.nodeValues is not None:
+                hit['activation'] = self.nodeValues[column][row]
+            return hit
+
+        layer = index.layerAt(x)
+        detail = self.layerDetails.get(layer)
+        if detail is None:
+            return None
+        planned = plan.layers[layer]
+        weights = self.state_dict[planned.weightKey]
+        hit = {'key': planned.weightKey, 'layer': planned.module}
+        if detail.mode == LevelOfDetail.HEATMAP:
+            if not 0 <= y < layout.height:
+                return None
+            row = int(y * detail.rows / layout.height)
+            col = min(detail.cols - 1, int((x - layout.columns[layer]) * detail.cols / layout.increment))
+            (rowStart, rowStop), (colStart, colStop) = (LevelOfDetail.bounds(len(weights), detail.rows)[row],
+                                                        LevelOfDetail.bounds(len(weights[0]), detail.cols)[col])
+            total = sum(sum(weights[r][colStart:colStop]) for r in range(rowStart, rowStop))
+            hit.update(kind='block', index=((rowStart, rowStop), (colStart, colStop)),
+                       value=total / max(1, (rowStop - rowStart) * (colStop - colStart)))
+            return hit
+        lineItems = self.lineItems
+        edge = index.edgeAt(layer, x, y, tolerance, drawn=lambda row, col: (layer, row, col) in lineItems)
+        if edge is None:
+            return None
+        hit.update(kind='weight', index=edge, value=weights[edge[0]][edge[1]])
+        return hit
+
+    def relayout(self):
+        """Moves the drawn items to the layout for the renderer's current size.
+
+        Lines and circles are moved in place instead of being created again. Only
+        weight matrices whose level of detail changes with the size, and heatmaps,
+        are drawn again. Draws from scratch if nothing has been drawn yet or the
+        renderer cannot move its items, or when drawing a viewport, where the visible
+        items change with the size.
+        """
+        self.pendingScale, self.pendingShift = 1.0, (0.0, 0.0)
+        if not self.renderer.retainsItems or self.drawnPlan is None or self.viewport is not None:
+            self.redraw()
+            return
+
+        profiler = self.profiler
+        with profiler.frame():
+            with profiler.measure('layout'):
+                layout = self.layout(self.drawnPlan)
+            columns, yPositions = layout.columns, layout.yPositions
+            weights = [self.state_dict[layer.weightKey] for layer in self.drawnPlan.layers]
+            moved = set()
+            with profiler.measure('edges'):
+                for layer, detail in list(self.layerDetails.items()):
+                    newDetail = self.chooseDetail(weights[layer])
+                    if detail.mode == LevelOfDetail.HEATMAP or vars(newDetail) != vars(detail):
+                        self.redrawEdges(layer, weights[layer])
+                    else:
+                        moved.add(layer)
+
+                for (layer, row, col), item in self.lineItems.items():
+                    if layer in moved:
+                        self.renderer.move(item, columns[layer + 1], yPositions[layer + 1][row],
+                                           columns[layer], layout.inputPositions[layer][col])
+
+            with profiler.measure('circles'):
+                for (layer, row), item in self.circleItems.items():
+                    x, y, r = columns[layer + 1], yPositions[layer + 1][row], layout.radii[layer + 1]
+                    self.renderer.move(item, x - r, y - r, x + r, y + r)
+                for column in self.nodeSummaries:
+                    self.redrawNodeSummary(column)
+
+    def setStateDict(self, new_state_dict, plan: RenderPlan = None):
+        """Replaces the state dictionary and draws it.
+
+        If the renderer keeps its items and the new state dictionary has the same
+        plan (keys and shapes) as the one already drawn, the existing lines and
+        circles are recolored in place. Otherwise, the whole neural net is drawn again.
+
+        Args:
+            new_state_dict (dict): The state dictionary to draw.
+            plan (RenderPlan): The plan of `new_state_dict` from `prepareSnapshot`, if already known.
+        """
+        with self.profiler.frame():
+            if plan is None:
+                with self.profiler.measure('prepare'):
+                    new_state_dict, plan = self.prepareSnapshot(new_state_dict)
+
+            self.state_dict = new_state_dict
+            self.snapshotVersion += 1
+            if self.renderer.retainsItems and plan is self.drawnPlan:
+                with self.profiler.measure('normalize'):
+                    changed = self.updatePalettes(plan)
+                with self.profiler.measure('activations'):
+                    changedColumns = self.updateNodeValues(plan)
+                with self.profiler.measure('update'):
+                    self.updateItems(changed)
+                    if self.nodeValues is not None:
+                        self.recolorNodes(changedColumns)
+            else:
+                self.redraw()
+
+    def prepareSnapshot(self, new_state_dict: dict) -> (dict, RenderPlan):
+        """Converts a fetched state dictionary into views and looks up its render plan.
+
+        This may run on a background thread, so it must not touch the renderer.
+        """
+        new_state_dict = Tensors.stateDictView(new_state_dict)
+        return new_state_dict, RenderPlan.of(new_state_dict)
+
+    @staticmethod
+    def snapshotChecksum(snapshot: tuple) -> int:
+        """Returns `Tensors.checksum` of the views in a snapshot from `prepareSnapshot`."""
+        return Tensors.checksum(snapshot[0])
+
+    @staticmethod
+    def shapes(state_dict: dict) -> tuple:
+        """Returns the shape of every value in `state_dict`, such as ((16, 27), (16,), ...).
+
+        The values are expected to be views from `Tensors.stateDictView`.
+        """
+        return tuple(Tensors.shape(value) for value in state_dict.values())
+
+    def updateItems(self, changed=frozenset()):
+        """Recolors the existing lines and circles to match `state_dict`.
+
+        Only items whose value moved by at least `toleranceFor` their key are
+        reconfigured, unless the palette of their key is in `changed`.
+        """
+        drawnValues = self.drawnValues
+        colors, bucketTags = self.palette.colors, self.bucketTags
+        for planned in self.drawnPlan.layers:
+            layer = planned.index
+            matrix = self.state_dict[planned.weightKey]
+            tolerance = -1.0 if planned.weightKey in changed else self.toleranceFor(planned.weightKey)
+            detail = self.layerDetails[layer]
+            edgeTags = ("edges", f"edges{layer}")
+            if detail.mode == LevelOfDetail.FULL:
+                # Weights: recolor lines
+                for row, weights in enumerate(matrix):
+                    buckets = None
+                    for col, weight in enumerate(weights):
+                        key = (layer, row, col)
+                        if abs(weight - drawnValues[key]) < tolerance:
+                            continue
+                        if buckets is None:
+                            buckets = self.bucketsFor(weights, planned.weightKey)
+                        bucket = buckets[col]
+                        lineWidth = min(2, max(1, abs(weight) + 1))
+                        self.renderer.configure(self.lineItems[key], fill=colors[bucket], width=lineWidth,
+                                                tags=edgeTags + (bucketTags[bucket],))
+                        drawnValues[key] = weight
+            elif detail.mode == LevelOfDetail.VISIBLE:
+                # Weights inside the viewport: recolor the lines that were drawn
+                for row, start, stop in detail.ranges:
+                    weights = matrix[row][start:stop]
+                    buckets = None
+                    for col, weight in enumerate(weights, start):
+                        key = (layer, row, col)
+                        if abs(weight - drawnValues[key]) < tolerance:
+                            continue
+                        if buckets is None:
+                            buckets = self.bucketsFor(weights, planned.weightKey)
+                        bucket = buckets[col - start]
+                        lineWidth = min(2, max(1, abs(weight) + 1))
+                        self.renderer.configure(self.lineItems[key], fill=colors[bucket], width=lineWidth,
+                                                tags=edgeTags + (bucketTags[bucket],))
+                        drawnValues[key] = weight
+            else:
+                # Reduced weights: the drawn edges depend on the values, so draw them again
+                self.redrawEdges(layer, matrix)
+            if planned.biasKey is not None and self.nodeValues is None and layer + 1 in self.nodeSummaries:
+                self.redrawNodeSummary(layer + 1)
+            elif planned.biasKey is not None and self.nodeValues is None:
+                # Biases: recolor circles
+                biases = self.state_dict[planned.biasKey]
+                tolerance = -1.0 if planned.biasKey in changed else self.toleranceFor(planned.biasKey)
+                buckets = None
+                for row, bias in enumerate(biases):
+                    key = (layer, row)
+                    drawnValue = drawnValues.get(key)
+                    if drawnValue is None or abs(bias - drawnValue) < tolerance:
+                        continue
+                    if buckets is None:
+                        buckets = self.bucketsFor(biases, planned.biasKey)
+                    bucket = buckets[row]
+                    self.renderer.configure(self.circleItems[key], fill=colors[bucket], tags=(bucketTags[bucket],))
+                    drawnValues[key] = bias
+
+    def toleranceFor(self, key: str = None, palette: ColorPalette = None) -> float:
+        """Returns `update_tolerance` scaled from the range -1.0 to 1.0 to the range of the palette of `key`.
+
+        A normalized palette may spread its colors over a much narrower range, where
+        changes far below `update_tolerance` still move values into other buckets.
+        """
+        if palette is None:
+            palette = self.palettes.get(key, self.palette)
+        return self.update_tolerance * (palette.maximum - palette.minimum) / 2
+
+    def xStart(self, count: int = None) -> int:
+        """Returns the starting x position to use."""
+        if count is None:
+            return 50
+        else:
+            return self.incrementAmount(count) // 2
+
+    def incrementAmount(self, horizontalCount: int = None) -> int:
+        """The amount to increment horizontally across the screen.
+
+        Args:
+            horizontalCount (int): The number of layers in the neural net.
+
+        Returns:
+            int: The amount to increase the current X position while drawing.
+        """
+        if horizontalCount is None:
+            return 100
+        else:
+            return Layout.incrementAmount(self.width(), horizontalCount)
+
+    def radius(self, count: int = None) -> int:
+        """Returns the radius to use for the circles.
+
+        Args:
+            count (int): The number of elements being placed vertically.
+                More circles will mean a smaller radius.
+        Returns:
+            int: The radius to use for all circles.
+        """
+        if count is None:
+            return 20
+        else:
+            return Layout.radius(self.height(), count)
+
+    def height(self) -> int:
+        """The height of the view, as reported by the renderer."""
+        return self.renderer.height()
+
+    def width(self) -> int:
+        """The width of the view, as reported by the renderer."""
+        return self.renderer.width()
+
+    @staticmethod
+    def yPositions(height: int, count: int) -> list:
+        """Generates a list of y positions with the given number of separators.
+
+        Args:
+            height (int): The total height of the window.
+            count (int): The number of positions to have in the generated list.
+
+        Returns:
+            int: Y-coordinates to place `count` items centered on the window.
+        """
+        return Layout.yPositions(height, count)
+
+    def layout(self, plan: RenderPlan = None) -> Layout:
+        """Returns the layout for the current view size and state dictionary.
+
+        The layout is only computed again when the size or the plan change.
+        It is also stored in `currentLayout` for the drawing methods to use.
+        """
+        if plan is None:
+            plan = RenderPlan.of(self.state_dict)
+        width, height = round(self.width() * self.zoomLevel), round(self.height() * self.zoomLevel)
+        if self.currentLayout is None or self.currentLayout.key != (width, height, plan.signature):
+            self.currentLayout = Layout(width, height, plan)
+        return self.currentLayout
+
+    def drawNN(self):
+        """Draws the neural net with the renderer."""
+        # Values for drawing on the screen
+        # Lines are drawn first, then circles.
+        # Otherwise, circles would have lines drawn over them.
+        self.pendingScale, self.pendingShift = 1.0, (0.0, 0.0)
+        profiler = self.profiler
+        with profiler.frame():
+            with profiler.measure('layout'):
+                plan = RenderPlan.of(self.state_dict)
+                layout = self.layout(plan)
+            with profiler.measure('normalize'):
+                self.updatePalettes(plan)
+            with profiler.measure('activations'):
+                self.updateNodeValues(plan)
+            self.nodeSummaries = self.summarizedColumns()
+
+            # Draw the line weights first; circles will be drawn over them later.
+            with profiler.measure('edges'):
+                for planned in plan.layers:
+                    self.drawEdges(layout.columns[planned.index + 1], self.state_dict[planned.weightKey],
+                                   layer=planned.index, key=planned.weightKey)
+
+            with profiler.measure('circles'):
+                # Draw the input circles.
+                self.drawInputCircles(layout.columns[0], layout.height, layout.counts[0], radius=layout.radii[0])
+
+                # Draw each layer of biases. Layers without biases get empty circles.
+                for planned in plan.layers:
+                    column = planned.index + 1
+                    if planned.biasKey is None:
+                        self.drawLayer(layout.columns[column], None, layout.radii[column], layer=planned.index)
+                    else:
+                        self.drawLayer(layout.columns[column], self.state_dict[planned.biasKey],
+                                       layout.radii[column], layer=planned.index, key=planned.biasKey)
+
+            self.drawnPlan = plan
+
+    def drawSteps(self, coarse: int = 3):
+        """Draws the neural net like `drawNN`, one small piece at a time.
+
+        This is a generator that yields after every piece of work (a column of circles,
+        a heatmap, or the lines into one neuron), so the caller can spread drawing over
+        as many slices of time as it likes, and stop early by closing it. The circles
+        are drawn first, then the `coarse` strongest lines leading into every neuron,
+        and then the remaining lines. Lines drawn after the circles end up above them,
+        so the caller has to lower the 'edges' tag after every slice, which needs a
+        renderer that keeps its items. `drawnPlan` is only set once everything is drawn.
+
+        Args:
+            coarse (int): The number of lines into every neuron to draw in the first pass.
+        """
+        profiler = self.profiler
+        self.drawnPlan = None
+        with profiler.measure('layout'):
+            plan = RenderPlan.of(self.state_dict)
+            layout = self.layout(plan)
+        with profiler.measure('normalize'):
+            self.updatePalettes(plan)
+        with profiler.measure('activations'):
+            self.updateNodeValues(plan)
+        self.nodeSummaries = self.summarizedColumns()
+
+        with profiler.measure('circles'):
+            self.drawInputCircles(layout.columns[0], layout.height, layout.counts[0], radius=layout.radii[0])
+        yield
+        for planned in plan.layers:
+            column = planned.index + 1
+            biases = self.state_dict[planned.biasKey] if planned.biasKey is not None else None
+            with profiler.measure('circles'):
+                self.drawLayer(layout.columns[column], biases, layout.radii[column], layer=planned.index,
+                               key=planned.biasKey)
+            yield
+
+        remaining = []
+        for planned in plan.layers:
+            layer, key = planned.index, planned.weightKey
+            weights = self.state_dict[key]
+            xPos, yPositions = layout.columns[layer + 1], layout.yPositions[layer + 1]
+            with profiler.measure('edges'):
+                detail = self.chooseDetail(weights, layer)
+                self.layerDetails[layer] = detail
+            if detail.mode == LevelOfDetail.HEATMAP:
+                with profiler.measure('edges'):
+                    self.drawHeatmap(xPos, weights, detail.rows, detail.cols, layer=layer, key=key)
+                yield
+                continue
+
+            for row, columns in self.edgeRows(weights, detail):
+                lineWeights = weights[row]
+                if columns is None:
+                    columns = range(len(lineWeights))
+                with profiler.measure('edges'):
+                    strongest = [columns[index] for index in
+                                 LevelOfDetail.topK([lineWeights[col] for col in columns], coarse)]
+                    self.drawLines(xPos, yPositions[row], lineWeights, layer=layer, row=row, columns=strongest,
+                                   key=key)
+                if len(strongest) < len(columns):
+                    remaining.append((layer, key, row, columns, set(strongest)))
+                yield
+
+        for layer, key, row, columns, drawn in remaining:
+            with profiler.measure('edges'):
+                self.drawLines(layout.columns[layer + 1], layout.yPositions[layer + 1][row],
+                               self.state_dict[key][row], layer=layer, row=row,
+                               columns=[col for col in columns if col not in drawn], key=key)
+            yield
+
+        self.drawnPlan = plan
+
+    def summarizedColumns(self) -> dict:
+        """Chooses the columns of circles to draw as strips of averaged blocks, for `currentLayout`.
+
+        Circles count against `item_budget` like edges do. If the circles in view would
+        take more than half of it, every column gets an equal share of that half, and
+        columns with more circles than their share are drawn as that many blocks.
+
+        Returns:
+            dict: The number of blocks of every summarized column (0 for the inputs).
+        """
+        counts = [len(self.visibleRows(column)) for column in range(len(self.currentLayout.counts))]
+        limit = self.item_budget // 2
+        if sum(counts) <= limit:
+            return {}
+        share = max(1, limit // len(counts))
+        return {column: share for column, count in enumerate(counts) if count > share}
+
+    def edgeBudget(self) -> int:
+        """The number of items each weight matrix may use.
+
+        The edges share whatever the circles (or their strips, see `summarizedColumns`)
+        leave of `item_budget`.
+        """
+        layout = self.currentLayout
+        nodes = sum(self.nodeSummaries.get(column, count) for column, count in enumerate(layout.counts))
+        return max(1, (self.item_budget - nodes) // max(1, len(layout.counts) - 1))
+
+    def chooseDetail(self, weights, layer: int = None) -> LevelOfDetail:
+        """Chooses the level of detail of a weight matrix for `currentLayout` and `item_budget`.
+
+        When drawing a viewport, only the edges of `layer` inside it are considered.
+        """
+        layout = self.currentLayout
+        if self.viewport is not None and layer is not None:
+            ranges = self.spatialIndex().edgesIn(layer, self.viewport)
+            if sum(stop - start for _, start, stop in ranges) < len(weights) * len(weights[0]):
+                if not ranges:
+                    return LevelOfDetail(LevelOfDetail.VISIBLE, ranges=[])
+                return LevelOfDetail.chooseVisible(ranges, width=layout.increment, height=layout.height,
+                                                   budget=self.edgeBudget())
+        return LevelOfDetail.choose(len(weights[0]), len(weights), width=layout.increment,
+                                    height=layout.height, budget=self.edgeBudget())
+
+    def drawEdges(self, xPos: int, weights, layer: int, key: str = None):
+        """Draws a weight matrix between the layer at `xPos` and the layer to its left.
+
+        The level of detail is chosen from the number of edges, the size of the
+        view, and `item_budget`, then stored in `layerDetails`.
+
+        Args:
+            xPos (int): The x position of the layer the weights lead into.
+            weights: The weight matrix, with one row per neuron at `xPos`.
+            layer (int): The index of the weight matrix.
+            key (str): The state dictionary key of the weight matrix, to look up its palette.
+        """
+        layout = self.currentLayout
+        detail = self.chooseDetail(weights, layer)
+        self.layerDetails[layer] = detail
+        if detail.mode == LevelOfDetail.HEATMAP:
+            self.drawHeatmap(xPos, weights, detail.rows, detail.cols, layer=layer, key=key)
+            return
+
+        yPositions = layout.yPositions[layer + 1]
+        for row, columns in self.edgeRows(weights, detail):
+            self.drawLines(xPos, yPositions[row], weights[row], layer=layer, row=row, columns=columns, key=key)
+
+    @staticmethod
+    def edgeRows(weights, detail: LevelOfDetail):
+        """Yields (row, columns) for the lines to draw of a weight matrix at `detail` (except heatmaps).
+
+        `columns` are the indices of the weights in the row to draw, or None for all of them.
+        """
+        if detail.ranges is not None:
+            # Only the edges inside the viewport
+            for row, start, stop in detail.ranges:
+                if detail.mode == LevelOfDetail.TOP_K:
+                    columns = [start + col for col in LevelOfDetail.topK(weights[row][start:stop], detail.count)]
+                else:
+                    columns = range(start, stop)
+                yield row, columns
+            return
+
+        for row, lineWeights in enumerate(weights):
+            yield row, (LevelOfDetail.topK(lineWeights, detail.count) if detail.mode == LevelOfDetail.TOP_K else None)
+
+    def redrawEdges(self, layer: int, weights):
+        """Deletes and draws the edges of a single weight matrix again, below every other item."""
+        self.renderer.delete(f"edges{layer}")
+        for key in [key for key in self.lineItems if key[0] == layer]:
+            del self.lineItems[key]
+            del self.drawnValues[key]
+        self.drawEdges(self.currentLayout.columns[layer + 1], weights, layer=layer,
+                       key=self.drawnPlan.layers[layer].weightKey)
+        self.matchZoom(f"edges{layer}")
+        self.renderer.lower(f"edges{layer}")
+
+    def drawHeatmap(self, xPos: int, weights, rows: int, cols: int, layer: int = None, key: str = None):
+        """Draws a weight matrix as a grid of averaged rectangles between two layers.
+
+        Args:
+            xPos (int): The x position of the layer the weights lead into.
+            weights: The weight matrix, with one row per neuron at `xPos`.
+            rows (int): The number of rectangles to draw vertically.
+            cols (int): The number of rectangles to draw horizontally.
+            layer (int): The index of the weight matrix, used to tag the rectangles.
+            key (str): The state dictionary key of the weight matrix, to look up its palette.
+        """
+        grid = LevelOfDetail.downsample(weights, rows, cols)
+        left = xPos - self.currentLayout.increment
+        cellWidth = (xPos - left) / cols
+        cellHeight = self.currentLayout.height / rows
+        tags = ("edges", f"edges{layer}") if layer is not None else ("edges",)
+        colors, bucketTags = self.palette.colors, self.bucketTags
+        for row, values in enumerate(grid):
+            for col, bucket in enumerate(self.bucketsFor(values, key)):
+                x = left + col * cellWidth
+                y = row * cellHeight
+                self.renderer.drawRectangle(x, y, x + cellWidth, y + cellHeight, colors[bucket],
+                                            tags=tags + (bucketTags[bucket],))
+
+    def drawCircle(self, x: int, y: int, r: int, color: str, outline: str = "grey", tags=()) -> int:
+        """Draws a circle with the renderer.
+
+        Args:
+            x (int): The X-coordinate to place the circle.
+            y (int): The Y-coordinate to place the circle.
+            r (int): The radius of the circle.
+            color (str): The color to fill the circle.
+            outline (str): The outline of the circle. Defaults to 'grey'.
+            tags: The tags of the circle.
+
+        Returns:
+            int: The item ID of the circle.
+        """
+        return self.renderer.drawCircle(x, y, r, color, outline=outline, tags=tags)
+
+    def drawLayer(self, xPos: int, biases: list, radius: int = 20, layer: int = None, key: str = None):
+        """Draws a column of circles colored by `biases`.
+
+        If `biases` is None (a layer without biases), empty circles are drawn at the
+        positions of `layer` instead, and they are never recolored.
+        """
+        if layer is not None:
+            yPositions = self.currentLayout.yPositions[layer + 1]
+            rows = self.visibleRows(layer + 1)
+        else:
+            yPositions = self.yPositions(self.height(), len(biases))
+            rows = range(len(biases))
+        if layer is not None and layer + 1 in self.nodeSummaries:
+            self.drawNodeSummary(layer + 1)
+            return
+        if layer is not None and self.nodeValues is not None:
+            self.drawNodes(layer, xPos, yPositions, rows, radius)
+            return
+        if biases is None:
+            for row in rows:
+                self.circleItems[(layer, row)] = self.drawCircle(xPos, yPositions[row], radius, color="#EEEEEE")
+            return
+        colors, bucketTags = self.palette.colors, self.bucketTags
+        for row, bucket in zip(rows, self.bucketsFor(biases[rows.start:rows.stop], key)):
+            item = self.drawCircle(xPos, yPositions[row], radius, colors[bucket], tags=(bucketTags[bucket],))
+            if layer is not None:
+                self.circleItems[(layer, row)] = item
+                self.drawnValues[(layer, row)] = biases[row]
+
+    def drawInputCircles(self, xPos: int, height: int, count: int, radius: int = 20):
+        if 0 in self.nodeSummaries:
+            self.drawNodeSummary(0)
+            return
+        yPositions = self.yPositions(height, count)
+        if self.nodeValues is not None:
+            self.drawNodes(-1, xPos, yPositions, self.visibleRows(0, count), radius)
+            return
+        for row in self.visibleRows(0, count):
+            self.circleItems[(-1, row)] = self.drawCircle(xPos, yPositions[row], radius, color="#EEEEEE")
+
+    def drawNodeSummary(self, column: int):
+        """Draws a column of circles (0 for the inputs) as a strip of averaged blocks, see `summarizedColumns`.
+
+        Every block is colored by the mean bias (or activation) of the neurons it covers.
+        Columns without values, such as the inputs, are drawn as a single grey block.
+        """
+        layout = self.currentLayout
+        x, r, yPositions = layout.columns[column], max(1, layout.radii[column]), layout.yPositions[column]
+        tags = ("nodes", f"nodes{column}")
+        key = RenderPlan.of(self.state_dict).layers[column - 1].biasKey if column > 0 else None
+        if self.nodeValues is not None:
+            values, key, palette = self.nodeValues[column], None, self.nodePalettes[column]
+        elif key is not None:
+            values, palette = self.state_dict[key], None
+        else:
+            self.renderer.drawRectangle(x - r, yPositions[0] - r, x + r, yPositions[-1] + r, "#EEEEEE", tags=tags)
+            return
+        bounds = LevelOfDetail.bounds(len(values), self.nodeSummaries[column])
+        means = [math.fsum(values[start:stop]) / max(1, stop - start) for start, stop in bounds]
+        colors, bucketTags = self.palette.colors, self.bucketTags
+        for (start, stop), bucket in zip(bounds, self.bucketsFor(means, key, palette=palette)):
+            self.renderer.drawRectangle(x - r, yPositions[start] - r, x + r, yPositions[stop - 1] + r, colors[bucket],
+                                        tags=tags + (bucketTags[bucket],))
+
+    def redrawNodeSummary(self, column: int):
+        """Deletes and draws the strip of a summarized column of circles again."""
+        self.renderer.delete(f"nodes{column}")
+        self.drawNodeSummary(column)
+        self.matchZoom(f"nodes{column}")
+
+    def drawNodes(self, layer: int, xPos: int, yPositions: list, rows: range, radius: int):
+        """Draws the circles of `layer` (-1 for the inputs) colored by their activations in `nodeValues`."""
+        values = self.nodeValues[layer + 1]
+        colors, bucketTags = self.palette.colors, self.bucketTags
+        buckets = self.bucketsFor(values[rows.start:rows.stop], palette=self.nodePalettes[layer + 1])
+        for row, bucket in zip(rows, buckets):
+            self.circleItems[(layer, row)] = self.drawCircle(xPos, yPositions[row], radius, colors[bucket],
+                                                             tags=(bucketTags[bucket],))
+            self.drawnValues[(layer, row)] = values[row]
+
+    def visibleRows(self, column: int, count: int = None) -> range:
+        """Returns the rows of the circles in `column` (0 for the inputs) inside the viewport."""
+        if self.viewport is None:
+            return range(count if count is not None else self.currentLayout.counts[column])
+        if column not in self.spatialIndex().columnsIn(self.viewport):
+            return range(0)
+        return self.spatialIndex().rowsIn(column, self.viewport)
+
+    def numToColor(self, num: float) -> str:
+        """Converts the number (-1.0-1.0) into a color using the current palette.
+
+        Args:
+            num (float): The number (-1.0-1.0) to convert into a color.
+
+        Returns:
+            str: The hex value of the number converted to a string (#RRGGBB).
+        """
+        return self.palette.color(num)
+
+    def bucketsFor(self, values, key: str = None, palette: ColorPalette = None) -> list:
+        """Returns the palette bucket of every value, timed as the 'colors' phase when profiling.
+
+        The buckets index `palette.colors` and `bucketTags`, and are remembered in
+        `drawnBuckets` so `setColors` knows which tags to recolor.
+
+        Args:
+            values: The values to color.
+            key (str): The state dictionary key the values belong to, whose normalized
+                palette is used. Defaults to `palette`.
+            palette (ColorPalette): The palette to use instead of the one of `key`.
+        """
+        with self.profiler.measure('colors'):
+            if palette is None:
+                palette = self.palettes.get(key, self.palette)
+            buckets = palette.bucketsFor(values)
+            self.drawnBuckets.update(buckets)
+            return buckets
+
+    def drawLine(self, x1: int, y1: int, x2: int, y2: int, color: str, width: float = 2, tags=()) -> int:
+        return self.renderer.drawLine(x1, y1, x2, y2, color, width=width, tags=tags)
+
+    def drawLines(self, xPos: int, yPos: int, lineWeights: list, layer: int = None, row: int = None,
+                  columns: list = None, key: str = None):
+        """Draws lines between the left and right.
+
+        Args:
+            xPos (int): The starting x position to draw lines.
+            yPos (int): The starting y position to draw lines.
+            lineWeights (int): The weight of each line.
+            layer (int): The index of the weight matrix, used to remember the drawn lines.
+            row (int): The row of `lineWeights` within its weight matrix.
+            columns (list): The indices of the weights to draw. Draws every weight if empty.
+            key (str): The state dictionary key of the weight matrix, to look up its palette.
+        """
+        if layer is not None:
+            x = xPos - self.currentLayout.increment
+            yPositions = self.currentLayout.inputPositions[layer]
+        else:
+            x = xPos - self.incrementAmount(horizontalCount=len(RenderPlan.of(self.state_dict).layers))
+            yPositions = self.yPositions(self.height(), len(lineWeights))
+        if columns is None:
+            columns = range(len(lineWeights))
+        else:
+            lineWeights = [lineWeights[col] for col in columns]
+        colors, bucketTags = self.palette.colors, self.bucketTags
+        tags = ("edges", f"edges{layer}") if layer is not None else ("edges",)
+        # Only lines that can be recolored later are remembered.
+        remember = layer is not None and self.renderer.retainsItems
+        for col, weight, bucket in zip(columns, lineWeights, self.bucketsFor(lineWeights, key)):
+            lineWidth = min(2, max(1, abs(weight) + 1))
+            item = self.drawLine(xPos, yPos, x, yPositions[col], color=colors[bucket], width=lineWidth,
+                                 tags=tags + (bucketTags[bucket],))
+            if remember:
+                self.lineItems[(layer, row, col)] = item
+                self.drawnValues[(layer, row, col)] = weight
+
+
+def main():
+    renderer = RasterRenderer(width=800, height=600)
+    drawer = NetworkDrawer(state_dict=StateDictionaries.tictactoe_state_dict(), renderer=renderer)
+    drawer.drawNN()
+    renderer.savePNG('tictactoe.png')
+
+
+if __name__ == '__main__':
+    main()
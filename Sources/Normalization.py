@@ -0,0 +1,264 @@
+import itertools
+import math
+
+from Sources.Tensors import MatrixView, Tensors
+
+
+class QuantileSketch:
+    """A bounded-memory summary of a stream of numbers that answers approximate quantile queries.
+
+    The sketch is a stack of compactors, like the KLL sketch: values are added to
+    the lowest level, and whenever a level holds more than its capacity, it is
+    sorted and every other value moves up one level, where it stands in for two
+    values. Higher levels get smaller capacities, so the sketch keeps
+    O(`capacity`) values no matter how many are added, and ranks are off by at most
+    about 2/`capacity` of the total. The exact minimum and maximum are kept as well.
+
+    Attributes:
+        capacity (int): The capacity of the highest level.
+        count (int): The number of values added.
+        minimum (float): The smallest value added.
+        maximum (float): The largest value added.
+        levels (list): The values kept at every level. A value at level h stands in for 2**h values.
+    """
+
+    def __init__(self, capacity: int = 200):
+        self.capacity = capacity
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.levels = [[]]
+        self._odd = [False]
+
+    def __len__(self):
+        return sum(len(items) for items in self.levels)
+
+    def add(self, values):
+        """Adds every number in `values` to the sketch."""
+        values = list(values)
+        if not values:
+            return
+        self.count += len(values)
+        self.minimum = min(self.minimum, min(values))
+        self.maximum = max(self.maximum, max(values))
+        self.levels[0].extend(values)
+        self._compress()
+
+    def merged(self, *others) -> 'QuantileSketch':
+        """Returns a new sketch that summarizes this sketch and `others` together."""
+        merged = QuantileSketch(self.capacity)
+        for sketch in (self,) + others:
+            while len(merged.levels) < len(sketch.levels):
+                merged.levels.append([])
+            for level, items in enumerate(sketch.levels):
+                merged.levels[level].extend(items)
+            merged.count += sketch.count
+            merged.minimum = min(merged.minimum, sketch.minimum)
+            merged.maximum = max(merged.maximum, sketch.maximum)
+        merged._compress()
+        return merged
+
+    def quantile(self, q: float) -> float:
+        """Returns a value that about a fraction `q` (0.0-1.0) of the added values are below.
+
+        Raises:
+            ValueError: If nothing was added yet.
+        """
+        if self.count == 0:
+            raise ValueError("The quantile of an empty sketch is undefined.")
+        if q <= 0:
+            return self.minimum
+        if q >= 1:
+            return self.maximum
+        weighted = sorted((value, 1 << level) for level, items in enumerate(self.levels) for value in items)
+        target = q * sum(weight for _, weight in weighted)
+        total = 0
+        for value, weight in weighted:
+            total += weight
+            if total >= target:
+                return value
+        return self.maximum
+
+    def _levelCapacity(self, level: int) -> int:
+        return max(2, math.ceil(self.capacity * (2 / 3) ** (len(self.levels) - 1 - level)))
+
+    def _compress(self):
+        self._odd.extend([False] * (len(self.levels) - len(self._odd)))
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._levelCapacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                    self._odd.append(False)
+                items.sort()
+                leftover = [items.pop()] if len(items) % 2 else []
+                # Alternate between keeping the even and the odd values, so the
+                # rounding errors of repeated compactions cancel out.
+                self._odd[level] = not self._odd[level]
+                self.levels[level + 1].extend(items[self._odd[level]::2])
+                self.levels[level] = leftover
+            level += 1
+
+
+class Normalizer:
+    """Chooses the range of values that is spread over the colors, per layer or for the whole network.
+
+    `FIXED` maps -1.0 to 1.0, like `ColorPalette` does by default. The other modes
+    follow the values of the snapshots:
+
+    * `MIN_MAX` maps the smallest value to the negative color and the largest to the positive one.
+    * `ABS_MAX` is symmetric around zero, so zero keeps the color halfway between them.
+    * `PERCENTILE` clips the `percentile` smallest and largest values, so a few outliers do not
+      wash out the colors of every other value.
+
+    Values are never sorted as a whole. Every update adds at most `sample_size` values
+    of each entry (a strided sample, whose offset moves with every update) to a
+    `QuantileSketch`, and the exact minimum and maximum are added as well. A new
+    generation of sketches is started every `window` updates, and quantiles are
+    answered from the current and previous generation, so the range follows values
+    that grow or shrink during training. A range only changes once one of its ends
+    moves by more than `hysteresis` of its width, so colors do not flicker.
+
+    Attributes:
+        mode (str): `FIXED`, `MIN_MAX`, `ABS_MAX`, or `PERCENTILE`.
+        scope (str): `LAYER` to normalize every entry on its own, or `GLOBAL` to share one range.
+        ranges (dict): The (minimum, maximum) of every entry, by key.
+    """
+
+    FIXED = 'fixed'
+    MIN_MAX = 'minmax'
+    ABS_MAX = 'absmax'
+    PERCENTILE = 'percentile'
+    MODES = (FIXED, MIN_MAX, ABS_MAX, PERCENTILE)
+    """tuple: Every mode, in the order they are offered."""
+
+    LAYER = 'layer'
+    GLOBAL = 'global'
+
+    def __init__(self, mode: str = FIXED, scope: str = LAYER, percentile: float = 0.01, sample_size: int = 4096,
+                 capacity: int = 200, window: int = 50, hysteresis: float = 0.05):
+        """Initializes a new normalizer.
+
+        Args:
+            mode (str): `FIXED`, `MIN_MAX`, `ABS_MAX`, or `PERCENTILE`.
+            scope (str): `LAYER` or `GLOBAL`.
+            percentile (float): The fraction of values clipped at either end in `PERCENTILE` mode.
+            sample_size (int): The largest number of values of an entry added per update.
+            capacity (int): The capacity of every `QuantileSketch`.
+            window (int): The number of updates after which a new generation of sketches starts.
+            hysteresis (float): The fraction of a range's width that either end has to move
+                before the range changes.
+
+        Raises:
+            ValueError: If `mode` or `scope` is unknown.
+        """
+        if mode not in Normalizer.MODES:
+            raise ValueError(f"Unknown normalization mode {mode!r}, expected one of {Normalizer.MODES}.")
+        if scope not in (Normalizer.LAYER, Normalizer.GLOBAL):
+            raise ValueError(f"Unknown normalization scope {scope!r}, expected 'layer' or 'global'.")
+        self.mode = mode
+        self.scope = scope
+        self.percentile = percentile
+        self.sample_size = sample_size
+        self.capacity = capacity
+        self.window = window
+        self.hysteresis = hysteresis
+        self.ranges = {}
+        self.updateCount = 0
+        self._current = {}
+        self._previous = {}
+        self._lastStateDict = None
+
+    def update(self, state_dict: dict, keys) -> set:
+        """Adds the values of a snapshot and recomputes the ranges of `keys`.
+
+        Adding the same state dictionary again (such as when it is redrawn) does nothing.
+
+        Args:
+            state_dict (dict): The state dictionary, with values from `Tensors.stateDictView`.
+            keys: The keys to normalize.
+
+        Returns:
+            set: The keys whose range changed.
+        """
+        keys = list(keys)
+        if self.mode == Normalizer.FIXED or (state_dict is self._lastStateDict and
+                                             all(key in self.ranges for key in keys)):
+            return set()
+        self._lastStateDict = state_dict
+        if self.updateCount % self.window == 0:
+            self._previous, self._current = self._current, {}
+        self.updateCount += 1
+
+        values = {key: Normalizer.flatValues(state_dict[key]) for key in keys}
+        total = sum(len(flat) for flat in values.values())
+        for key, flat in values.items():
+            if len(flat) == 0:
+                continue
+            sketchKey = key if self.scope == Normalizer.LAYER else None
+            size = self.sample_size if self.scope == Normalizer.LAYER else \
+                max(1, self.sample_size * len(flat) // total)
+            sketch = self._current.setdefault(sketchKey, QuantileSketch(self.capacity))
+            sketch.add(self.sample(flat, size))
+
+        changed = set()
+        for key in keys:
+            sketchKey = key if self.scope == Normalizer.LAYER else None
+            if sketchKey not in self._current:
+                continue
+            sketch = self._current[sketchKey]
+            if sketchKey in self._previous:
+                sketch = sketch.merged(self._previous[sketchKey])
+            newRange = self.rangeOf(sketch)
+            oldRange = self.ranges.get(key)
+            if oldRange is None or self._moved(oldRange, newRange):
+                self.ranges[key] = newRange
+                changed.add(key)
+        return changed
+
+    def rangeFor(self, key: str) -> (float, float):
+        """Returns the (minimum, maximum) that the values of `key` are mapped to."""
+        if self.mode == Normalizer.FIXED:
+            return -1.0, 1.0
+        return self.ranges.get(key, (-1.0, 1.0))
+
+    def rangeOf(self, sketch: QuantileSketch) -> (float, float):
+        """Returns the range that the current mode picks for the values summarized by `sketch`."""
+        if self.mode == Normalizer.MIN_MAX:
+            low, high = sketch.minimum, sketch.maximum
+        elif self.mode == Normalizer.ABS_MAX:
+            high = max(-sketch.minimum, sketch.maximum)
+            low = -high
+        else:
+            low, high = sketch.quantile(self.percentile), sketch.quantile(1 - self.percentile)
+        if high - low < 1e-12:
+            # Every value is the same, such as freshly initialized biases
+            low, high = low - 1.0, high + 1.0
+        return low, high
+
+    def sample(self, flat, size: int) -> list:
+        """Returns at most `size` evenly spaced values of `flat`, along with its exact minimum and maximum."""
+        step = max(1, -(-len(flat) // size))
+        start = self.updateCount % step
+        numpy = Tensors.numpy()
+        if numpy is not None:
+            values = numpy.asarray(flat, dtype=numpy.float64)
+            sample = values[start::step].tolist()
+            sample.extend((float(values.min()), float(values.max())))
+        else:
+            sample = list(flat[start::step])
+            sample.extend((min(flat), max(flat)))
+        return sample
+
+    def _moved(self, oldRange: tuple, newRange: tuple) -> bool:
+        tolerance = self.hysteresis * (oldRange[1] - oldRange[0])
+        return abs(newRange[0] - oldRange[0]) > tolerance or abs(newRange[1] - oldRange[1]) > tolerance
+
+    @staticmethod
+    def flatValues(value):
+        """Returns the numbers of a viewed value as one flat sequence."""
+        flat = value.flat if isinstance(value, MatrixView) else value
+        if len(flat) > 0 and hasattr(flat[0], '__len__'):
+            flat = list(itertools.chain.from_iterable(flat))
+        return flat
@@ -0,0 +1,146 @@
+import collections
+import time
+
+
+class FrameStats:
+    """The timings and counts of one drawn frame.
+
+    Attributes:
+        phases (dict): Seconds spent in every measured phase, such as 'fetch',
+            'prepare', 'layout', 'colors', and 'clear'.
+        seconds (float): The total time spent drawing the frame.
+        calls (int): The number of renderer (Tk) calls issued.
+        created (int): The number of items created.
+        updated (int): The number of items reconfigured in place.
+        timestamp (float): When the frame finished, from `time.perf_counter()`.
+    """
+
+    def __init__(self, phases: dict, seconds: float, calls: int, created: int, updated: int, timestamp: float):
+        self.phases = phases
+        self.seconds = seconds
+        self.calls = calls
+        self.created = created
+        self.updated = updated
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        phases = ', '.join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.phases.items())
+        return (f"FrameStats({self.seconds * 1000:.1f}ms, {phases}, calls={self.calls}, "
+                f"created={self.created}, updated={self.updated})")
+
+
+class _Timer:
+    """Adds the time spent inside a `with` block to one phase of a profiler."""
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+
+
+class _Frame:
+    """Starts a frame on entry and finishes it on exit, unless a frame is already running."""
+
+    def __init__(self, profiler: 'Profiler'):
+        self.profiler = profiler
+
+    def __enter__(self):
+        self.profiler.beginFrame()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.endFrame()
+
+
+class _Nothing:
+    """A `with` block that does nothing, used while profiling is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NOTHING = _Nothing()
+
+
+class Profiler:
+    """Records per-frame timings and renderer call counts for a `NetworkDrawer`.
+
+    Profiling is disabled until `enabled` is set, and then costs a couple of
+    `time.perf_counter()` calls per measured block.
+
+    Attributes:
+        renderer: The renderer whose `calls`, `created`, and `updated` counters are read.
+        enabled (bool): Whether frames are being recorded.
+        callback: Called with the `FrameStats` of every finished frame, if set.
+        frames (collections.deque): The most recent `FrameStats`, oldest first.
+    """
+
+    def __init__(self, renderer, callback=None, history: int = 60):
+        self.renderer = renderer
+        self.enabled = False
+        self.callback = callback
+        self.frames = collections.deque(maxlen=history)
+        self._depth = 0
+        self._phases = {}
+        self._start = 0.0
+        self._counters = (0, 0, 0)
+
+    def measure(self, name: str):
+        """Returns a `with` block that adds its duration to phase `name` of the current frame."""
+        return _Timer(self, name) if self.enabled else _NOTHING
+
+    def frame(self):
+        """Returns a `with` block that records everything inside it as one frame.
+
+        Frames may be nested; only the outermost one is recorded.
+        """
+        return _Frame(self) if self.enabled else _NOTHING
+
+    def add(self, name: str, seconds: float):
+        """Adds `seconds` to phase `name` of the current (or next) frame."""
+        if self.enabled:
+            self._phases[name] = self._phases.get(name, 0.0) + seconds
+
+    def _readCounters(self) -> (int, int, int):
+        return self.renderer.calls, self.renderer.created, self.renderer.updated
+
+    def beginFrame(self):
+        self._depth += 1
+        if self._depth == 1:
+            self._start = time.perf_counter()
+            self._counters = self._readCounters()
+
+    def endFrame(self):
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        end = time.perf_counter()
+        calls, created, updated = (after - before for after, before in zip(self._readCounters(), self._counters))
+        stats = FrameStats(self._phases, end - self._start, calls, created, updated, end)
+        self._phases = {}
+        self.frames.append(stats)
+        if self.callback is not None:
+            self.callback(stats)
+
+    @property
+    def lastFrame(self) -> FrameStats:
+        """FrameStats: The most recently finished frame, or None."""
+        return self.frames[-1] if self.frames else None
+
+    @property
+    def fps(self) -> float:
+        """float: The number of frames finished per second, over the recorded history."""
+        if len(self.frames) < 2:
+            return 0.0
+        elapsed = self.frames[-1].timestamp - self.frames[0].timestamp
+        return (len(self.frames) - 1) / elapsed if elapsed > 0 else 0.0
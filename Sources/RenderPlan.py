@@ -0,0 +1,111 @@
+from Sources.Tensors import Tensors
+
+
+class PlannedLayer:
+    """A weight matrix, drawn as edges leading into a column of circles.
+
+    Attributes:
+        index (int): The position of the layer in the plan, starting at 0.
+        module (str): The key prefix shared by the layer's parameters, such as 'hiddenLayer1'.
+        weightKey (str): The state dictionary key of the weight matrix.
+        biasKey (str): The key of the bias vector, or None if the layer has no bias.
+        outputs (int): The number of rows of the weight matrix (circles in the layer's column).
+        inputs (int): The number of columns of the weight matrix. Dimensions after
+            the first, such as convolution kernels, are flattened into the columns.
+        norm (dict): The keys of a normalization layer (such as BatchNorm) that follows
+            this layer, keyed by parameter name ('weight', 'bias', 'running_mean', ...).
+    """
+
+    def __init__(self, index: int, module: str, weightKey: str, outputs: int, inputs: int):
+        self.index = index
+        self.module = module
+        self.weightKey = weightKey
+        self.biasKey = None
+        self.outputs = outputs
+        self.inputs = inputs
+        self.norm = {}
+
+    def __repr__(self):
+        return (f"PlannedLayer({self.weightKey!r}, bias={self.biasKey!r}, "
+                f"shape=({self.outputs}, {self.inputs}), norm={sorted(self.norm)})")
+
+
+class RenderPlan:
+    """The structure of a state dictionary, worked out once from its key names and shapes.
+
+    Every value with two or more dimensions is a weight matrix and starts a new layer.
+    A one-dimensional `<module>.bias` of the same module is paired with it as its bias;
+    one-dimensional values of the following module whose parameters look like a
+    normalization layer (BatchNorm, LayerNorm) are attached to it as `norm`. Layers
+    without a bias and any other values (such as embeddings' buffers) are allowed.
+    Keys without a module prefix fall back to pairing a weight matrix with the
+    vector right after it, if its length matches.
+
+    Plans only depend on the keys and shapes, so they are cached by that signature
+    and every snapshot of a training run shares the same plan.
+
+    Attributes:
+        signature (tuple): The keys and shapes the plan was compiled from.
+        layers (list): The `PlannedLayer`s, in drawing order.
+        counts (list): The number of circles in every column, starting with the inputs.
+        ignored (list): The keys that are not drawn.
+    """
+
+    NORM_PARAMETERS = frozenset(('weight', 'bias', 'running_mean', 'running_var', 'num_batches_tracked'))
+    """frozenset: The parameter and buffer names of normalization layers."""
+
+    CACHE_SIZE: int = 16
+    """int: The number of compiled plans to keep."""
+
+    _plans = {}
+    """dict: The compiled plans, keyed by signature."""
+
+    def __init__(self, keys: tuple, shapes: tuple):
+        """Compiles the plan for a state dictionary with `keys` whose values have `shapes`.
+
+        Raises:
+            ValueError: If none of the values is a weight matrix.
+        """
+        self.signature = (tuple(keys), tuple(shapes))
+        self.layers = []
+        self.ignored = []
+        for key, shape in zip(keys, shapes):
+            module, _, name = key.rpartition('.')
+            last = self.layers[-1] if self.layers else None
+            if len(shape) >= 2:
+                inputs = 1
+                for size in shape[1:]:
+                    inputs *= size
+                self.layers.append(PlannedLayer(len(self.layers), module, key, shape[0], inputs))
+            elif last is not None and last.biasKey is None and shape == (last.outputs,) and \
+                    ((module == last.module and name == 'bias') or (not module and not last.norm)):
+                last.biasKey = key
+            elif last is not None and module and module != last.module and name in self.NORM_PARAMETERS and \
+                    (shape == (last.outputs,) or name == 'num_batches_tracked') and \
+                    all(normKey.rpartition('.')[0] == module for normKey in last.norm.values()):
+                last.norm[name] = key
+            else:
+                self.ignored.append(key)
+        if not self.layers:
+            raise ValueError("The state dictionary does not contain any weight matrices to draw.")
+        self.counts = [self.layers[0].inputs] + [layer.outputs for layer in self.layers]
+
+    def __repr__(self):
+        return f"RenderPlan(layers={self.layers}, ignored={self.ignored})"
+
+    @staticmethod
+    def of(state_dict: dict) -> 'RenderPlan':
+        """Returns the (cached) plan for a state dictionary of views from `Tensors.stateDictView`."""
+        return RenderPlan.compile(tuple(state_dict), tuple(Tensors.shape(value) for value in state_dict.values()))
+
+    @staticmethod
+    def compile(keys: tuple, shapes: tuple) -> 'RenderPlan':
+        """Returns the plan for `keys` and `shapes`, compiling it only if it is not cached yet."""
+        signature = (keys, shapes)
+        plan = RenderPlan._plans.get(signature)
+        if plan is None:
+            plan = RenderPlan(keys, shapes)
+            if len(RenderPlan._plans) >= RenderPlan.CACHE_SIZE:
+                RenderPlan._plans.clear()
+            RenderPlan._plans[signature] = plan
+        return plan
@@ -0,0 +1,481 @@
+import math
+import struct
+import zlib
+
+from Sources.Tensors import Tensors
+
+
+class CanvasRenderer:
+    """Draws lines, circles, and rectangles onto a Tk canvas.
+
+    Every drawn item stays on the canvas, so it can be recolored, moved, or deleted later.
+    The size of the canvas is read from Tk once and then cached, so drawing never
+    waits on `winfo_reqwidth`/`winfo_reqheight`; call `resize` to change it.
+
+    Attributes:
+        calls (int): The number of Tk canvas calls made so far.
+        created (int): The number of items created so far.
+        updated (int): The number of items (or tags) reconfigured so far.
+    """
+
+    retainsItems: bool = True
+    """bool: Whether drawn items can be changed with `configure`, `move`, `zoom`, `delete`, and `lower`."""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        width = canvas.winfo_reqwidth()
+        height = canvas.winfo_reqheight()
+        self._width = width if width != 1 else 500
+        self._height = height if height != 1 else 400
+        self.calls = 0
+        self.created = 0
+        self.updated = 0
+
+    def width(self) -> int:
+        """The width of the canvas, or a default value of 500."""
+        return self._width
+
+    def height(self) -> int:
+        """The height of the canvas, or a default value of 400."""
+        return self._height
+
+    def resize(self, width: int, height: int):
+        """Changes the size of the canvas. Existing items are not moved."""
+        self.calls += 1
+        self.canvas.config(width=width, height=height)
+        self._width = width
+        self._height = height
+
+    def clear(self):
+        """Deletes every item on the canvas."""
+        self.calls += 1
+        self.canvas.delete('all')
+
+    @property
+    def itemCount(self) -> int:
+        """int: The number of items on the canvas."""
+        return len(self.canvas.find_all())
+
+    def drawLine(self, x1: float, y1: float, x2: float, y2: float, color: str, width: float = 2, tags=()) -> int:
+        self.calls += 1
+        self.created += 1
+        return self.canvas.create_line((x1, y1), (x2, y2), fill=color, width=width, tags=tags)
+
+    def drawCircle(self, x: float, y: float, r: float, color: str, outline: str = "grey", tags=()) -> int:
+        self.calls += 1
+        self.created += 1
+        return self.canvas.create_oval(x - r, y - r, x + r, y + r, fill=color, outline=outline, tags=tags)
+
+    def drawRectangle(self, x1: float, y1: float, x2: float, y2: float, color: str, tags=()) -> int:
+        self.calls += 1
+        self.created += 1
+        return self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, width=0, tags=tags)
+
+    def configure(self, item, **options):
+        """Changes the options (such as `fill` or `width`) of an item or tag."""
+        self.calls += 1
+        self.updated += 1
+        self.canvas.itemconfig(item, **options)
+
+    def move(self, item, *coords: float):
+        """Changes the coordinates of an item, as given when it was drawn (two points)."""
+        self.calls += 1
+        self.updated += 1
+        self.canvas.coords(item, *coords)
+
+    def zoom(self, item, factor: float, shiftX: float = 0.0, shiftY: float = 0.0):
+        """Scales the coordinates of an item or every item with a tag by `factor`, then moves them by the shift."""
+        self.calls += 2
+        self.updated += 1
+        self.canvas.scale(item, 0, 0, factor, factor)
+        self.canvas.move(item, shiftX, shiftY)
+
+    def delete(self, item):
+        """Deletes an item or every item with a tag."""
+        self.calls += 1
+        self.canvas.delete(item)
+
+    def lower(self, item):
+        """Moves an item or every item with a tag below all other items."""
+        self.calls += 1
+        self.canvas.tag_lower(item)
+
+
+class RasterRenderer:
+    """Draws lines, circles, and rectangles into an in-memory RGB image.
+
+    Shapes are drawn as runs of pixels that are copied with a single slice
+    assignment each, instead of being set one pixel at a time. With NumPy,
+    lines are buffered instead and rasterized together with index arrays
+    before the next circle or rectangle, or once `flush` is called.
+    The image can be written as a PNG with `savePNG`.
+
+    Attributes:
+        pixels (bytearray): The image, as rows of packed RGB bytes. Call `flush` before reading it.
+        calls (int): The number of drawing calls made so far.
+        created (int): The number of items drawn so far.
+        updated (int): Always 0, since drawn items cannot be changed.
+    """
+
+    retainsItems: bool = False
+    """bool: Whether drawn items can be changed with `configure`, `move`, `zoom`, `delete`, and `lower`,
+    which do nothing otherwise."""
+
+    NAMED_COLORS = {'grey': '#bebebe', 'gray': '#bebebe', 'white': '#ffffff', 'black': '#000000'}
+    """dict: The Tk color names that may be used instead of #RRGGBB."""
+
+    LINE_BATCH: int = 1 << 20
+    """int: The most pixels of buffered lines to rasterize at once."""
+
+    def __init__(self, width: int = 500, height: int = 400, background: str = '#ffffff'):
+        """Initializes a new image filled with `background`.
+
+        Args:
+            width (int): The width of the image in pixels.
+            height (int): The height of the image in pixels.
+            background (str): The hex color (#RRGGBB) of the empty image.
+        """
+        self._width = width
+        self._height = height
+        self.background = background
+        self._colors = {}
+        self._itemCount = 0
+        self.calls = 0
+        self.created = 0
+        self.updated = 0
+        self.pixels = bytearray(self.rgb(background) * (width * height))
+        self._lines = []
+        self._linePixels = 0
+
+    def width(self) -> int:
+        return self._width
+
+    def height(self) -> int:
+        return self._height
+
+    def clear(self):
+        """Fills the whole image with the background color."""
+        self._lines.clear()
+        self._linePixels = 0
+        self.pixels[:] = self.rgb(self.background) * (self._width * self._height)
+        self._itemCount = 0
+
+    @property
+    def itemCount(self) -> int:
+        """int: The number of items drawn since the image was last cleared."""
+        return self._itemCount
+
+    def rgb(self, color: str) -> bytes:
+        """Returns the three RGB bytes for a hex color (#RRGGBB) or Tk color name."""
+        rgb = self._colors.get(color)
+        if rgb is None:
+            hexColor = self.NAMED_COLORS.get(color.lower(), color)
+            rgb = bytes.fromhex(hexColor[1:7])
+            self._colors[color] = rgb
+        return rgb
+
+    def _nextItem(self) -> int:
+        self.calls += 1
+        self.created += 1
+        self._itemCount += 1
+        return self._itemCount
+
+    def _span(self, y: int, x1: int, x2: int, rgb: bytes):
+        """Fills the pixels from `x1` (inclusive) to `x2` (exclusive) on row `y`."""
+        if 0 <= y < self._height:
+            x1 = max(0, x1)
+            x2 = min(self._width, x2)
+            if x1 < x2:
+                offset = (y * self._width + x1) * 3
+                self.pixels[offset:offset + (x2 - x1) * 3] = rgb * (x2 - x1)
+
+    def _column(self, x: int, y1: int, y2: int, rgb: bytes):
+        """Fills the pixels from `y1` (inclusive) to `y2` (exclusive) in column `x`."""
+        if 0 <= x < self._width:
+            y1 = max(0, y1)
+            y2 = min(self._height, y2)
+            count = y2 - y1
+            if count > 0:
+                stride = self._width * 3
+                offset = (y1 * self._width + x) * 3
+                for channel in range(3):
+                    start = offset + channel
+                    self.pixels[start:start + count * stride:stride] = rgb[channel:channel + 1] * count
+
+    def drawLine(self, x1: float, y1: float, x2: float, y2: float, color: str, width: float = 2, tags=()) -> int:
+        rgb = self.rgb(color)
+        thickness = max(1, int(round(width)))
+        x1, y1, x2, y2 = int(round(x1)), int(round(y1)), int(round(x2)), int(round(y2))
+        if Tensors.numpy() is not None:
+            self._lines.append((x1, y1, x2, y2, thickness, rgb))
+            self._linePixels += (max(abs(x2 - x1), abs(y2 - y1)) + 1) * thickness
+            if self._linePixels >= self.LINE_BATCH:
+                self.flush()
+        elif abs(x2 - x1) >= abs(y2 - y1):
+            # Mostly horizontal: one horizontal run of pixels for every row the line crosses
+            if x1 > x2:
+                x1, y1, x2, y2 = x2, y2, x1, y1
+            steps = abs(y2 - y1) + 1
+            direction = 1 if y2 >= y1 else -1
+            length = x2 - x1 + 1
+            for step in range(steps):
+                start = x1 + length * step // steps
+                stop = x1 + length * (step + 1) // steps
+                for offset in range(thickness):
+                    self._span(y1 + step * direction + offset, start, stop, rgb)
+        else:
+            # Mostly vertical: one vertical run of pixels for every column the line crosses
+            if y1 > y2:
+                x1, y1, x2, y2 = x2, y2, x1, y1
+            steps = abs(x2 - x1) + 1
+            direction = 1 if x2 >= x1 else -1
+            length = y2 - y1 + 1
+            for step in range(steps):
+                start = y1 + length * step // steps
+                stop = y1 + length * (step + 1) // steps
+                for offset in range(thickness):
+                    self._column(x1 + step * direction + offset, start, stop, rgb)
+        return self._nextItem()
+
+    def flush(self):
+        """Rasterizes the buffered lines into `pixels`, with the same pixels as drawing them one at a time."""
+        if not self._lines:
+            return
+        numpy = Tensors.numpy()
+        lines = self._lines
+        self._lines = []
+        self._linePixels = 0
+        x1, y1, x2, y2, thickness = numpy.array([line[:5] for line in lines], dtype=numpy.int64).T
+        colors = numpy.frombuffer(b''.join(line[5] for line in lines), dtype=numpy.uint8).reshape(-1, 3)
+
+        # Walk every line along its major axis from its smaller end, like `drawLine` does:
+        # pixel k of a line of `length` pixels spanning `steps` rows (or columns) is
+        # on step ((k + 1) * steps - 1) // length, thickened towards larger coordinates.
+        steep = numpy.abs(y2 - y1) > numpy.abs(x2 - x1)
+        start, end = numpy.where(steep, y1, x1), numpy.where(steep, y2, x2)
+        minorStart, minorEnd = numpy.where(steep, x1, y1), numpy.where(steep, x2, y2)
+        swap = start > end
+        start, end = numpy.where(swap, end, start), numpy.where(swap, start, end)
+        minorStart, minorEnd = numpy.where(swap, minorEnd, minorStart), numpy.where(swap, minorStart, minorEnd)
+        length = end - start + 1
+        steps = numpy.abs(minorEnd - minorStart) + 1
+        direction = numpy.where(minorEnd >= minorStart, 1, -1)
+
+        # Later lines are drawn over earlier ones, so every pixel takes the color of the last line on it.
+        owner = numpy.full(self._width * self._height, -1, dtype=numpy.int64)
+        for width in numpy.unique(thickness):
+            group = numpy.flatnonzero(thickness == width)
+            counts = length[group]
+            line = numpy.repeat(group, counts)
+            k = numpy.arange(len(line)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+            major = (start[line] + k)[:, numpy.newaxis]
+            minor = minorStart[line] + ((k + 1) * steps[line] - 1) // length[line] * direction[line]
+            minor = minor[:, numpy.newaxis] + numpy.arange(width)
+            isSteep = steep[line][:, numpy.newaxis]
+            x, y = numpy.where(isSteep, minor, major), numpy.where(isSteep, major, minor)
+            inside = (x >= 0) & (x < self._width) & (y >= 0) & (y < self._height)
+            line = numpy.broadcast_to(line[:, numpy.newaxis], inside.shape)
+            numpy.maximum.at(owner, (y * self._width + x)[inside], line[inside])
+        index = numpy.flatnonzero(owner >= 0)
+        image = numpy.frombuffer(self.pixels, dtype=numpy.uint8).reshape(-1, 3)
+        image[index] = colors[owner[index]]
+
+    def _disc(self, x: int, y: int, r: int, rgb: bytes):
+        for dy in range(-r, r + 1):
+            half = int(math.sqrt(r * r - dy * dy))
+            self._span(y + dy, x - half, x + half + 1, rgb)
+
+    def drawCircle(self, x: float, y: float, r: float, color: str, outline: str = "grey", tags=()) -> int:
+        self.flush()
+        x, y, r = int(round(x)), int(round(y)), int(round(r))
+        self._disc(x, y, r, self.rgb(outline))
+        self._disc(x, y, r - 1, self.rgb(color))
+        return self._nextItem()
+
+    def drawRectangle(self, x1: float, y1: float, x2: float, y2: float, color: str, tags=()) -> int:
+        self.flush()
+        rgb = self.rgb(color)
+        left, right = int(round(x1)), int(round(x2))
+        for y in range(int(round(y1)), int(round(y2))):
+            self._span(y, left, right, rgb)
+        return self._nextItem()
+
+    def configure(self, item, **options):
+        """Does nothing, since drawn pixels cannot be changed."""
+
+    def move(self, item, *coords: float):
+        """Does nothing, since drawn pixels cannot be changed."""
+
+    def zoom(self, item, factor: float, shiftX: float = 0.0, shiftY: float = 0.0):
+        """Does nothing, since drawn pixels cannot be changed."""
+
+    def delete(self, item):
+        """Does nothing, since drawn pixels cannot be changed."""
+
+    def lower(self, item):
+        """Does nothing, since drawn pixels cannot be changed."""
+
+    def toPNG(self) -> bytes:
+        """Returns the image encoded as a PNG file."""
+        self.flush()
+        rowSize = self._width * 3
+        raw = b''.join(b'\x00' + bytes(self.pixels[row:row + rowSize])
+                       for row in range(0, len(self.pixels), rowSize))
+
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+        header = struct.pack('>IIBBBBB', self._width, self._height, 8, 2, 0, 0, 0)
+        return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+                + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b''))
+
+    def savePNG(self, path: str):
+        """Writes the image to `path` as a PNG file."""
+        with open(path, 'wb') as file:
+            file.write(self.toPNG())
+
+
+class SvgRenderer:
+    """Writes lines, circles, and rectangles to an SVG file as they are drawn.
+
+    No display or Tk root is needed, and nothing is kept in memory once it is written,
+    so even networks with millions of edges are exported in constant memory.
+    Lines of the same color and width are merged into a single `<path>`: every group
+    collects up to `GROUP_SIZE` lines and is written out when it is full, so the file
+    holds one color attribute per group instead of one per edge. Buffered lines are
+    written before any circle or rectangle, so they stay below it as on the canvas.
+    Call `close` to finish the file.
+
+    The file is drawn in a single pass, so a `NetworkDrawer` cannot draw it again
+    (such as for `setColors` or `setStateDict`) once items were written.
+
+    Attributes:
+        file: The text file the SVG is written to.
+        calls (int): The number of drawing calls made so far.
+        created (int): The number of items drawn so far.
+        updated (int): Always 0, since drawn items cannot be changed.
+    """
+
+    retainsItems: bool = False
+    """bool: Whether drawn items can be changed with `configure`, `move`, `zoom`, `delete`, and `lower`,
+    which do nothing otherwise."""
+
+    GROUP_SIZE: int = 512
+    """int: The most lines merged into one `<path>`."""
+
+    PRECISION: int = 2
+    """int: The number of decimal places coordinates are written with."""
+
+    def __init__(self, file, width: int = 500, height: int = 400, background: str = '#ffffff'):
+        """Starts a new SVG document and writes its header to `file`.
+
+        Args:
+            file: A text file (or any object with a `write` method) to write the SVG to.
+            width (int): The width of the image.
+            height (int): The height of the image.
+            background (str): The color of the empty image, or None for a transparent one.
+        """
+        self.file = file
+        self._width = width
+        self._height = height
+        self._groups = {}
+        self._itemCount = 0
+        self._written = False
+        self.calls = 0
+        self.created = 0
+        self.updated = 0
+        file.write(f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                   f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                   f'viewBox="0 0 {width} {height}">\n')
+        if background is not None:
+            file.write(f'<rect width="{width}" height="{height}" fill="{background}"/>\n')
+
+    def width(self) -> int:
+        return self._width
+
+    def height(self) -> int:
+        return self._height
+
+    def clear(self):
+        """Discards the buffered lines, if nothing was written yet.
+
+        Raises:
+            RuntimeError: If items were already written, since the file is drawn in a single pass.
+        """
+        if self._written:
+            raise RuntimeError("An SVG file is drawn in a single pass and cannot be drawn again once items "
+                               "are written; export every image with its own `VectorExport.exportSVG`.")
+        self._groups.clear()
+        self._itemCount = 0
+
+    @property
+    def itemCount(self) -> int:
+        """int: The number of items drawn so far."""
+        return self._itemCount
+
+    def _number(self, value: float) -> str:
+        return '%g' % round(value, self.PRECISION)
+
+    def _nextItem(self) -> int:
+        self.calls += 1
+        self.created += 1
+        self._itemCount += 1
+        return self._itemCount
+
+    def _writeGroup(self, key: tuple, segments: list):
+        color, width = key
+        self.file.write(f'<path stroke="{color}" stroke-width="{self._number(width)}" fill="none" '
+                        f'd="{"".join(segments)}"/>\n')
+        self._written = True
+
+    def flush(self):
+        """Writes every buffered line."""
+        for key, segments in self._groups.items():
+            self._writeGroup(key, segments)
+        self._groups.clear()
+
+    def drawLine(self, x1: float, y1: float, x2: float, y2: float, color: str, width: float = 2, tags=()) -> int:
+        number = self._number
+        key = (color, round(width, self.PRECISION))
+        segments = self._groups.setdefault(key, [])
+        segments.append(f"M{number(x1)} {number(y1)}L{number(x2)} {number(y2)}")
+        if len(segments) >= self.GROUP_SIZE:
+            self._writeGroup(key, segments)
+            del self._groups[key]
+        return self._nextItem()
+
+    def drawCircle(self, x: float, y: float, r: float, color: str, outline: str = "grey", tags=()) -> int:
+        self.flush()
+        number = self._number
+        self.file.write(f'<circle cx="{number(x)}" cy="{number(y)}" r="{number(r)}" '
+                        f'fill="{color}" stroke="{outline}"/>\n')
+        self._written = True
+        return self._nextItem()
+
+    def drawRectangle(self, x1: float, y1: float, x2: float, y2: float, color: str, tags=()) -> int:
+        self.flush()
+        number = self._number
+        self.file.write(f'<rect x="{number(x1)}" y="{number(y1)}" width="{number(x2 - x1)}" '
+                        f'height="{number(y2 - y1)}" fill="{color}"/>\n')
+        self._written = True
+        return self._nextItem()
+
+    def configure(self, item, **options):
+        """Does nothing, since written items cannot be changed."""
+
+    def move(self, item, *coords: float):
+        """Does nothing, since written items cannot be changed."""
+
+    def zoom(self, item, factor: float, shiftX: float = 0.0, shiftY: float = 0.0):
+        """Does nothing, since written items cannot be changed."""
+
+    def delete(self, item):
+        """Does nothing, since written items cannot be changed."""
+
+    def lower(self, item):
+        """Does nothing, since written items cannot be changed."""
+
+    def close(self):
+        """Writes the buffered lines and the end of the document. The file itself is left open."""
+        self.flush()
+        self.file.write('</svg>\n')
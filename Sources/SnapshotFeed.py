@@ -0,0 +1,240 @@
+import mmap
+import os
+import struct
+import time
+
+from Sources.SnapshotLog import decodeSnapshot, encodeValue, packLayers, unpackLayers
+from Sources.Tensors import Tensors
+
+MAGIC = b'NNVF'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sBcIQ6x')
+"""struct.Struct: Magic, version, dtype ('f' or 'e'), slot count, and payload size of every slot."""
+_LATEST = struct.Struct('<Q')
+"""struct.Struct: The sequence number of the newest complete snapshot, stored right after the header."""
+_SLOT = struct.Struct('<QQ')
+"""struct.Struct: The marker and training step at the start of every slot."""
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class SnapshotPublisher:
+    """Publishes state dictionaries to a `SnapshotSubscriber` in another process.
+
+    Snapshots are written into a ring of slots in a memory-mapped file, so the
+    trainer and the visualizer do not share a process (or a GIL). Publishing
+    never waits for the subscriber: it encodes the snapshot and copies it into the
+    next slot, overwriting whatever was there. A subscriber that falls behind
+    skips straight to the newest snapshot, and the stale ones are dropped.
+
+    Put the file on a memory-backed file system (such as /dev/shm on Linux) to
+    keep it off the disk:
+
+        with SnapshotPublisher('/dev/shm/run.nnvf') as feed:
+            for epoch in range(epochs):
+                train()
+                feed.publish(model.state_dict(), step=epoch)
+
+    Every snapshot must have the same keys and shapes as the first one.
+    """
+
+    def __init__(self, path: str, slots: int = 4, dtype: str = 'f', min_interval: float = 0.0):
+        """Initializes a new publisher. The file is created by the first `publish`.
+
+        Args:
+            path (str): The file to share snapshots through. Replaced if it exists.
+            slots (int): The number of snapshots in the ring. More slots give a slow
+                subscriber more time to copy a snapshot before it is overwritten.
+            dtype (str): 'f' to publish float32 values or 'e' to publish float16 values.
+            min_interval (float): The minimum time (in seconds) between published snapshots.
+                Snapshots published sooner are dropped without being encoded.
+        """
+        if dtype not in ('f', 'e'):
+            raise ValueError(f"Snapshots are published as 'f' (float32) or 'e' (float16), not {dtype!r}.")
+        self.path = path
+        self.slots = max(2, slots)
+        self.dtype = dtype
+        self.min_interval = min_interval
+        self.sequence = 0
+        self.skippedCount = 0
+        self.keys = None
+        self.payloadSize = None
+        self._lastPublished = None
+        self._file = None
+        self._map = None
+        self._slotsStart = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    def _create(self, state_dict: dict, payloadSize: int):
+        """Creates the feed file, then moves it into place so subscribers never see half of a header."""
+        self.keys = list(state_dict)
+        self.payloadSize = payloadSize
+        header = _HEADER.pack(MAGIC, VERSION, self.dtype.encode(), self.slots, payloadSize) \
+            + _LATEST.pack(0) + packLayers(state_dict)
+        self._slotsStart = _align(len(header))
+        size = self._slotsStart + self.slots * self._slotSize()
+        temporaryPath = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporaryPath, 'wb') as file:
+            file.write(header)
+            file.truncate(size)
+        os.replace(temporaryPath, self.path)
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+    def _slotSize(self) -> int:
+        return _SLOT.size + _align(self.payloadSize)
+
+    def publish(self, state_dict: dict, step: int = None) -> bool:
+        """Publishes a snapshot, without waiting for any subscriber.
+
+        Args:
+            state_dict (dict): The state dictionary to publish.
+            step (int): The training step or epoch of the snapshot. Defaults to its sequence number.
+
+        Returns:
+            bool: Whether the snapshot was published, or dropped because of `min_interval`.
+        """
+        now = time.perf_counter()
+        if self._lastPublished is not None and now - self._lastPublished < self.min_interval:
+            self.skippedCount += 1
+            return False
+        self._lastPublished = now
+
+        state_dict = Tensors.stateDictView(state_dict)
+        chunks = [encodeValue(value, self.dtype) for value in state_dict.values()]
+        payloadSize = sum(len(chunk) for chunk in chunks)
+        if self._map is None:
+            self._create(state_dict, payloadSize)
+        elif list(state_dict) != self.keys or payloadSize != self.payloadSize:
+            raise ValueError("Every published snapshot must have the same keys and shapes as the first one.")
+
+        # A slot's marker is odd while it is being written and twice the sequence number once
+        # it is complete, so subscribers can tell when a copy was torn by a newer snapshot.
+        self.sequence += 1
+        offset = self._slotsStart + (self.sequence % self.slots) * self._slotSize()
+        _SLOT.pack_into(self._map, offset, 2 * self.sequence - 1, self.sequence if step is None else step)
+        position = offset + _SLOT.size
+        for chunk in chunks:
+            self._map[position:position + len(chunk)] = chunk
+            position += len(chunk)
+        _SLOT.pack_into(self._map, offset, 2 * self.sequence, self.sequence if step is None else step)
+        _LATEST.pack_into(self._map, _HEADER.size, self.sequence)
+        return True
+
+
+class SnapshotSubscriber:
+    """Reads the newest snapshot published by a `SnapshotPublisher` in another process.
+
+    Attributes:
+        step (int): The training step of the last snapshot read.
+        receivedCount (int): The number of snapshots read.
+        droppedCount (int): The number of snapshots published but never read,
+            because a newer one arrived first.
+        readSeconds (float): How long reading and decoding the last snapshot took.
+    """
+
+    def __init__(self, path: str):
+        """Initializes a new subscriber. The publisher does not have to have started yet.
+
+        Args:
+            path (str): The file the publisher shares snapshots through.
+        """
+        self.path = path
+        self.step = None
+        self.receivedCount = 0
+        self.droppedCount = 0
+        self.readSeconds = 0.0
+        self._file = None
+        self._map = None
+        self._inode = None
+        self._sequence = 0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    def _open(self) -> bool:
+        """Opens the feed file, or opens it again if the publisher replaced it. Returns whether it is open."""
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return self._map is not None
+        if self._map is not None and inode == self._inode:
+            return True
+        self.close()
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._inode = inode
+        self._sequence = 0
+        magic, version, dtype, self.slots, self.payloadSize = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a snapshot feed.")
+        self.dtype = dtype.decode()
+        self.keys, self.shapes, offset = unpackLayers(self._map, _HEADER.size + _LATEST.size)
+        self._slotsStart = _align(offset)
+        self._slotSize = _SLOT.size + _align(self.payloadSize)
+        return True
+
+    def poll(self) -> dict:
+        """Returns the newest snapshot if it has not been read yet, and None otherwise.
+
+        Never waits for the publisher. If the newest snapshot is being overwritten
+        while it is copied, None is returned and the next poll picks up a newer one.
+        """
+        if not self._open():
+            return None
+        start = time.perf_counter()
+        sequence, = _LATEST.unpack_from(self._map, _HEADER.size)
+        if sequence == self._sequence:
+            return None
+        offset = self._slotsStart + (sequence % self.slots) * self._slotSize
+        marker, step = _SLOT.unpack_from(self._map, offset)
+        if marker != 2 * sequence:
+            return None
+        data = self._map[offset + _SLOT.size:offset + _SLOT.size + self.payloadSize]
+        if _SLOT.unpack_from(self._map, offset)[0] != marker:
+            return None  # Torn by a newer snapshot while copying
+
+        if self._sequence:
+            self.droppedCount += sequence - self._sequence - 1
+        self._sequence = sequence
+        self.step = step
+        self.receivedCount += 1
+        state_dict = decodeSnapshot(data, self.keys, self.shapes, self.dtype)
+        self.readSeconds = time.perf_counter() - start
+        return state_dict
+
+    def wait(self, timeout: float = None, interval: float = 0.05) -> dict:
+        """Waits for a snapshot that has not been read yet and returns it.
+
+        Args:
+            timeout (float): The longest time (in seconds) to wait, or None to wait forever.
+            interval (float): How long (in seconds) to sleep between polls.
+
+        Raises:
+            TimeoutError: If no snapshot arrived within `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state_dict = self.poll()
+            if state_dict is not None:
+                return state_dict
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"No snapshot was published to {self.path} within {timeout} seconds.")
+            time.sleep(interval)
@@ -0,0 +1,157 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LatestSnapshot:
+    """A thread-safe, single-slot buffer where the newest snapshot always wins.
+
+    Attributes:
+        putCount (int): The number of snapshots put into the slot.
+        droppedCount (int): The number of snapshots replaced before anyone took them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._isFull = False
+        self.putCount = 0
+        self.droppedCount = 0
+
+    def put(self, snapshot) -> bool:
+        """Stores `snapshot`, replacing any snapshot that has not been taken yet.
+
+        Returns:
+            bool: Whether an unread snapshot was dropped to make room.
+        """
+        with self._lock:
+            dropped = self._isFull
+            self._snapshot = snapshot
+            self._isFull = True
+            self.putCount += 1
+            if dropped:
+                self.droppedCount += 1
+            return dropped
+
+    def take(self):
+        """Removes and returns the newest snapshot, or None if there is nothing new."""
+        with self._lock:
+            snapshot = self._snapshot
+            self._snapshot = None
+            self._isFull = False
+            return snapshot
+
+
+class SnapshotFetcher(threading.Thread):
+    """A background thread that periodically fetches state dictionaries.
+
+    The fetched (and optionally preprocessed) snapshots are handed to the Tk thread
+    through a `LatestSnapshot`, so a slow `update_state_dict` never blocks the UI.
+
+    Snapshots that did not change are never handed over. If a `version` function is
+    given, `update_state_dict` is only called when the version it returns changes;
+    if a `checksum` function is given, preprocessed snapshots with the same checksum
+    as the last one are dropped before they are handed over.
+
+    `interval` may be changed while the fetcher runs, such as by an `UpdateScheduler`.
+
+    An exception raised while fetching or preprocessing a snapshot is logged and
+    counted, and the fetcher tries again after `interval`, so a single failed fetch
+    never stops live updates.
+
+    Attributes:
+        fetchSeconds (float): How long `update_state_dict` took for the last taken snapshot.
+        preprocessSeconds (float): How long `checksum` and `preprocess` took for the last taken snapshot.
+        unchangedCount (int): The number of checks that found an unchanged snapshot.
+        errorCount (int): The number of fetches that raised an exception.
+        lastError (Exception): The exception raised by the last failed fetch, if any.
+    """
+
+    def __init__(self, update_state_dict, interval: int, preprocess=None, checksum=None, version=None):
+        """Initializes a new fetcher. Call `start()` to begin fetching.
+
+        Args:
+            update_state_dict: A function that returns an updated version of the state dictionary.
+            interval (int): How long (in ms) to wait between fetches.
+            preprocess: An optional function applied to every state dictionary on the
+                fetcher thread before it is handed over.
+            checksum: An optional function that returns a checksum of a preprocessed snapshot,
+                such as `Tensors.checksum`. It sees the values `preprocess` already converted.
+            version: An optional function that returns a value (such as a counter of training
+                steps) that changes whenever the state dictionary does.
+        """
+        super().__init__(name="SnapshotFetcher", daemon=True)
+        self.update_state_dict = update_state_dict
+        self.interval = interval
+        self.preprocess = preprocess
+        self.checksum = checksum
+        self.version = version
+        self.slot = LatestSnapshot()
+        self.fetchSeconds = 0.0
+        self.preprocessSeconds = 0.0
+        self.unchangedCount = 0
+        self.errorCount = 0
+        self.lastError = None
+        self._stopped = threading.Event()
+        self._lastVersion = self._lastChecksum = object()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self.fetch()
+            except Exception as error:
+                self.errorCount += 1
+                self.lastError = error
+                logger.exception("Fetching a snapshot failed, trying again in %s ms.", self.interval)
+            self._stopped.wait(self.interval / 1000)
+
+    def fetch(self):
+        """Fetches and preprocesses one snapshot, and hands it over unless it did not change."""
+        if self.version is not None:
+            version = self.version()
+            if version == self._lastVersion:
+                self.unchangedCount += 1
+                return
+        start = time.perf_counter()
+        snapshot = self.update_state_dict()
+        fetched = time.perf_counter()
+        if self.preprocess is not None:
+            snapshot = self.preprocess(snapshot)
+        if self.version is not None:
+            # Only remembered once the snapshot was fetched, so a failed fetch is tried again.
+            self._lastVersion = version
+        if self.checksum is not None:
+            checksum = self.checksum(snapshot)
+            if checksum == self._lastChecksum:
+                self.unchangedCount += 1
+                return
+            self._lastChecksum = checksum
+        # The timings travel with the snapshot, so they always describe the one that is drawn.
+        self.slot.put((snapshot, fetched - start, time.perf_counter() - fetched))
+
+    def stop(self):
+        """Asks the fetcher to stop after its current fetch."""
+        self._stopped.set()
+
+    def take(self):
+        """Returns the newest fetched snapshot, or None if nothing new has arrived.
+
+        `fetchSeconds` and `preprocessSeconds` are updated to describe the returned snapshot.
+        """
+        item = self.slot.take()
+        if item is None:
+            return None
+        snapshot, self.fetchSeconds, self.preprocessSeconds = item
+        return snapshot
+
+    @property
+    def fetchedCount(self) -> int:
+        """int: The number of snapshots fetched so far."""
+        return self.slot.putCount
+
+    @property
+    def droppedCount(self) -> int:
+        """int: The number of snapshots that were replaced by a newer one before being drawn."""
+        return self.slot.droppedCount
@@ -0,0 +1,317 @@
+import array
+import itertools
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from Sources.Tensors import MatrixView, Tensors
+
+MAGIC = b'NNVL'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sBcI')
+"""struct.Struct: Magic, version, dtype ('f' for float32 or 'e' for float16), and keyframe interval."""
+_RECORD = struct.Struct('<BIQ')
+"""struct.Struct: Record kind, payload length, and training step."""
+
+KEYFRAME = 0
+"""int: A record holding the full snapshot."""
+DELTA = 1
+"""int: A record holding the XOR of the snapshot with the previous one."""
+
+
+def _xor(first: bytes, second: bytes) -> bytes:
+    """XORs two equally long byte strings, without a Python loop over the bytes."""
+    return (int.from_bytes(first, 'little') ^ int.from_bytes(second, 'little')).to_bytes(len(first), 'little')
+
+
+def packLayers(state_dict: dict) -> bytes:
+    """Returns the layer table (the key and shape of every value) of a viewed state dictionary."""
+    table = [struct.pack('<I', len(state_dict))]
+    for key, value in state_dict.items():
+        name = key.encode('utf-8')
+        shape = Tensors.shape(value)
+        table.append(struct.pack('<H', len(name)) + name)
+        table.append(struct.pack(f'<B{len(shape)}I', len(shape), *shape))
+    return b''.join(table)
+
+
+def unpackLayers(buffer, offset: int) -> (list, list, int):
+    """Reads a layer table written by `packLayers` at `offset`.
+
+    Returns:
+        (list, list, int): The keys, the shapes, and the offset just after the table.
+    """
+    layerCount, = struct.unpack_from('<I', buffer, offset)
+    offset += 4
+    keys = []
+    shapes = []
+    for _ in range(layerCount):
+        nameLength, = struct.unpack_from('<H', buffer, offset)
+        offset += 2
+        keys.append(bytes(buffer[offset:offset + nameLength]).decode('utf-8'))
+        offset += nameLength
+        ndim, = struct.unpack_from('<B', buffer, offset)
+        shapes.append(struct.unpack_from(f'<{ndim}I', buffer, offset + 1))
+        offset += 1 + 4 * ndim
+    return keys, shapes, offset
+
+
+def encodeValue(value, dtype: str) -> bytes:
+    """Returns the values of one (viewed) layer as float32 ('f') or float16 ('e') bytes."""
+    flat = value.flat if isinstance(value, MatrixView) else value
+    if len(flat) > 0 and hasattr(flat[0], '__len__'):
+        flat = list(itertools.chain.from_iterable(flat))
+    if dtype == 'f':
+        if isinstance(flat, memoryview) and flat.format == 'f':
+            return flat.tobytes()
+        return array.array('f', flat).tobytes()
+    return struct.pack(f'<{len(flat)}e', *flat)
+
+
+def decodeSnapshot(data: bytes, keys: list, shapes: list, dtype: str) -> dict:
+    """Turns the concatenated bytes of every layer back into a state dictionary of float32 arrays.
+
+    Two-dimensional (and larger) layers are returned as `MatrixView`s.
+    """
+    itemsize = struct.calcsize(dtype)
+    state_dict = {}
+    offset = 0
+    for key, shape in zip(keys, shapes):
+        count = 1
+        for size in shape:
+            count *= size
+        chunk = data[offset:offset + count * itemsize]
+        offset += count * itemsize
+        if dtype == 'f':
+            values = array.array('f')
+            values.frombytes(chunk)
+        else:
+            values = array.array('f', struct.unpack(f'<{count}e', chunk))
+        state_dict[key] = Tensors.view(values) if len(shape) == 1 else \
+            MatrixView(memoryview(values), rows=shape[0], cols=count // shape[0])
+    return state_dict
+
+
+class SnapshotWriter:
+    """Appends state dictionaries to a compact binary log for later replay.
+
+    Every snapshot is stored as float32 or float16. Most records hold only the
+    XOR of the snapshot's bytes with the previous snapshot, which is mostly zeros
+    while training and compresses well; every `keyframe_interval` records a full
+    keyframe is written, so any step can be rebuilt from at most that many records.
+    XOR deltas are exact, so replayed values never drift.
+
+    Use it as a context manager, or call `close()` when done:
+
+        with SnapshotWriter('run.nnvl') as log:
+            for epoch in range(epochs):
+                train()
+                log.append(model.state_dict(), step=epoch)
+    """
+
+    def __init__(self, path: str, dtype: str = 'f', keyframe_interval: int = 32):
+        """Creates (or overwrites) the log at `path`.
+
+        Args:
+            path (str): The file to write.
+            dtype (str): 'f' to store float32 values or 'e' to store float16 values.
+            keyframe_interval (int): The number of records between full keyframes.
+        """
+        if dtype not in ('f', 'e'):
+            raise ValueError(f"Snapshots are stored as 'f' (float32) or 'e' (float16), not {dtype!r}.")
+        self.path = path
+        self.dtype = dtype
+        self.keyframe_interval = keyframe_interval
+        self.count = 0
+        self.keys = None
+        self._previous = None
+        self._file = open(path, 'wb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def _writeHeader(self, state_dict: dict):
+        self.keys = list(state_dict)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, self.dtype.encode(), self.keyframe_interval)
+                         + packLayers(state_dict))
+
+    def encode(self, value) -> bytes:
+        """Returns the values of one (viewed) layer as float32 or float16 bytes."""
+        return encodeValue(value, self.dtype)
+
+    def append(self, state_dict: dict, step: int = None):
+        """Appends a snapshot. Every snapshot must have the same keys and shapes as the first.
+
+        Args:
+            state_dict (dict): The state dictionary to record.
+            step (int): The training step or epoch of the snapshot. Defaults to its index.
+        """
+        state_dict = Tensors.stateDictView(state_dict)
+        if self.keys is None:
+            self._writeHeader(state_dict)
+        elif list(state_dict) != self.keys:
+            raise ValueError("Every snapshot in a log must have the same keys as the first one.")
+
+        data = b''.join(self.encode(value) for value in state_dict.values())
+        if self.count % self.keyframe_interval == 0:
+            kind, payload = KEYFRAME, data
+        else:
+            if len(data) != len(self._previous):
+                raise ValueError("Every snapshot in a log must have the same shapes as the first one.")
+            kind, payload = DELTA, _xor(data, self._previous)
+        payload = zlib.compress(payload, 1)
+        self._file.write(_RECORD.pack(kind, len(payload), self.count if step is None else step) + payload)
+        self._file.flush()
+        self._previous = data
+        self.count += 1
+
+
+class SnapshotReader:
+    """Reads a log written by `SnapshotWriter` through a memory map.
+
+    Only the record headers are scanned when the log is opened, so the log is never
+    loaded into memory as a whole. Reading a step decodes its nearest keyframe and
+    the deltas after it, which is bounded by the keyframe interval; stepping forward
+    one snapshot at a time only decodes one delta.
+
+    A log that is still empty, or whose header the writer has not finished yet,
+    has no snapshots (and no `keys`) until `refresh` finds that it grew.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = None
+        self.keyframe_interval = None
+        self.dtype = None
+        self.itemsize = None
+        self.keys = None
+        self.shapes = None
+
+        self.offsets = []
+        """list: The file offset of every record."""
+        self.steps = []
+        """list: The training step of every record."""
+        self._end = None
+        self._cache = (None, None)
+        self.refresh()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def _readHeader(self) -> bool:
+        """Reads the header and the layer table, unless the writer has not written all of them yet.
+
+        Raises:
+            ValueError: If the file is not a snapshot log.
+        """
+        if len(self._map) < _HEADER.size:
+            return False
+        magic, version, dtype, keyframe_interval = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a snapshot log.")
+        try:
+            keys, shapes, offset = unpackLayers(self._map, _HEADER.size)
+        except (struct.error, UnicodeDecodeError):
+            return False
+        if offset > len(self._map):
+            return False
+        self.keyframe_interval = keyframe_interval
+        self.dtype = dtype.decode()
+        self.itemsize = struct.calcsize(self.dtype)
+        self.keys, self.shapes, self._end = keys, shapes, offset
+        return True
+
+    def refresh(self) -> int:
+        """Picks up records appended since the log was opened.
+
+        Returns:
+            int: The number of records in the log.
+        """
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            return 0  # An empty file cannot be mapped.
+        if self._map is None or size > len(self._map):
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.keys is None and not self._readHeader():
+            return 0
+        while self._end + _RECORD.size <= len(self._map):
+            kind, length, step = _RECORD.unpack_from(self._map, self._end)
+            if self._end + _RECORD.size + length > len(self._map):
+                break  # The writer has not finished this record yet.
+            self.offsets.append(self._end)
+            self.steps.append(step)
+            self._end += _RECORD.size + length
+        return len(self.offsets)
+
+    def wait(self, timeout: float = None, interval: float = 0.1) -> int:
+        """Waits until the log holds at least one snapshot.
+
+        Args:
+            timeout (float): The longest time (in seconds) to wait, or None to wait forever.
+            interval (float): How long (in seconds) to sleep between refreshes.
+
+        Returns:
+            int: The number of records in the log.
+
+        Raises:
+            TimeoutError: If no snapshot was written within `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.refresh() == 0:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"No snapshot was written to {self.path} within {timeout} seconds.")
+            time.sleep(interval)
+        return len(self)
+
+    def _payload(self, index: int) -> (int, bytes):
+        offset = self.offsets[index]
+        kind, length, _ = _RECORD.unpack_from(self._map, offset)
+        start = offset + _RECORD.size
+        return kind, zlib.decompress(self._map[start:start + length])
+
+    def rawSnapshot(self, index: int) -> bytes:
+        """Returns the stored bytes of every layer of snapshot `index`, concatenated."""
+        cachedIndex, cachedData = self._cache
+        if cachedIndex is not None and cachedIndex <= index and \
+                cachedIndex // self.keyframe_interval == index // self.keyframe_interval:
+            start, data = cachedIndex + 1, cachedData
+        else:
+            start = index - index % self.keyframe_interval
+            kind, data = self._payload(start)
+            start += 1
+        for position in range(start, index + 1):
+            kind, payload = self._payload(position)
+            data = payload if kind == KEYFRAME else _xor(data, payload)
+        self._cache = (index, data)
+        return data
+
+    def read(self, index: int) -> dict:
+        """Returns snapshot `index` as a state dictionary of float32 arrays.
+
+        Two-dimensional (and larger) layers are returned as `MatrixView`s.
+
+        Raises:
+            IndexError: If the log has no snapshot `index`, such as while it is still empty.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"{self.path} has no snapshot {index}; it has {len(self)}.")
+        return decodeSnapshot(self.rawSnapshot(index), self.keys, self.shapes, self.dtype)
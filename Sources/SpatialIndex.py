@@ -0,0 +1,142 @@
+import bisect
+import math
+
+
+class SpatialIndex:
+    """Finds the circles and edges of a `Layout` that fall inside a rectangle.
+
+    Circles sit in columns at sorted y positions, and every edge of a weight matrix
+    runs straight from one column to the next, so nothing needs to be inserted
+    into a grid or tree: circles are found by bisecting the y positions of the
+    columns in range, and for every neuron of a layer, the edges leading into it
+    that cross a rectangle form one contiguous range of inputs, which is found with
+    two bisections. A query costs O(neurons), no matter how many edges there are.
+
+    Rectangles are (x1, y1, x2, y2) tuples in the coordinates of the layout.
+
+    Points are found the same way, so hovering over a network with millions of
+    edges only bisects the columns, rows, and inputs around the mouse.
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+
+    def columnsIn(self, rect: tuple) -> list:
+        """Returns the index of every column whose circles may overlap `rect`."""
+        x1, _, x2, _ = rect
+        layout = self.layout
+        return [column for column, (x, r) in enumerate(zip(layout.columns, layout.radii))
+                if x1 - r <= x <= x2 + r]
+
+    def rowsIn(self, column: int, rect: tuple) -> range:
+        """Returns the rows of the circles in `column` that overlap `rect`."""
+        _, y1, _, y2 = rect
+        r = self.layout.radii[column]
+        positions = self.layout.yPositions[column]
+        return range(bisect.bisect_left(positions, y1 - r), bisect.bisect_right(positions, y2 + r))
+
+    def circleAt(self, x: float, y: float, drawn=None) -> (int, int):
+        """Returns the (column, row) of the circle containing the point, or None.
+
+        Args:
+            drawn: An optional function of (column, row) telling whether a circle is drawn.
+                Other circles are skipped.
+        """
+        layout = self.layout
+        column = bisect.bisect_left(layout.columns, x)
+        for candidate in (column - 1, column):
+            if not 0 <= candidate < len(layout.columns):
+                continue
+            dx, r = x - layout.columns[candidate], layout.radii[candidate]
+            if abs(dx) > r:
+                continue
+            # Circles in dense columns overlap, so take the nearest of every circle around the point.
+            positions = layout.yPositions[candidate]
+            rows = [row for row in self.rowsIn(candidate, (x, y, x, y)) if drawn is None or drawn(candidate, row)]
+            if rows:
+                row = min(rows, key=lambda row: abs(y - positions[row]))
+                if dx * dx + (y - positions[row]) ** 2 <= r * r:
+                    return candidate, row
+        return None
+
+    def layerAt(self, x: float) -> int:
+        """Returns the weight matrix whose edges span `x`, or None."""
+        layer = bisect.bisect_right(self.layout.columns, x) - 1
+        return layer if 0 <= layer < len(self.layout.columns) - 1 else None
+
+    def edgeAt(self, layer: int, x: float, y: float, tolerance: float, drawn=None) -> (int, int):
+        """Returns the (row, col) of the edge of `layer` nearest to the point, or None if none is within `tolerance`.
+
+        Args:
+            drawn: An optional function of (row, col) telling whether an edge is drawn. Other edges are skipped.
+        """
+        layout = self.layout
+        left, right = layout.columns[layer], layout.columns[layer + 1]
+        if right <= left:
+            return None
+        inputs, outputs = layout.inputPositions[layer], layout.yPositions[layer + 1]
+        t = max(0.0, min(1.0, (x - left) / (right - left)))
+        best, bestDistance = None, tolerance
+        for row, start, stop in self.edgesIn(layer, (x - tolerance, y - tolerance, x + tolerance, y + tolerance)):
+            # The edges into `row` cross `x` in the order of their inputs, so only the
+            # nearest drawn edge on either side of the point needs to be measured.
+            middle = bisect.bisect_left(inputs, SpatialIndex._lowerBound(y, t, outputs[row]), start, stop)
+            for cols in (range(middle - 1, start - 1, -1), range(middle, stop)):
+                for col in cols:
+                    if drawn is None or drawn(row, col):
+                        distance = SpatialIndex.distance(left, inputs[col], right, outputs[row], x, y)
+                        if distance <= bestDistance:
+                            best, bestDistance = (row, col), distance
+                        break
+        return best
+
+    @staticmethod
+    def distance(x1: float, y1: float, x2: float, y2: float, x: float, y: float) -> float:
+        """Returns the distance from the point to the line segment from (x1, y1) to (x2, y2)."""
+        dx, dy = x2 - x1, y2 - y1
+        length = dx * dx + dy * dy
+        t = 0.0 if length == 0 else max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length))
+        return math.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
+
+    def edgesIn(self, layer: int, rect: tuple) -> list:
+        """Returns the edges of weight matrix `layer` that cross `rect`.
+
+        Returns:
+            list: (row, start, stop) tuples; the edges from inputs `start` up to (but
+                not including) `stop` into neuron `row` cross the rectangle.
+        """
+        layout = self.layout
+        left, right = layout.columns[layer], layout.columns[layer + 1]
+        x1, y1, x2, y2 = rect
+        a, b = max(x1, left), min(x2, right)
+        if a > b or right <= left:
+            return []
+        # Along an edge, y = (1 - t) * yInput + t * yOutput, with t running from 0 at the
+        # input column to 1 at the output column. The edge crosses the rectangle if its
+        # y range between the clipped ends `a` and `b` overlaps [y1, y2].
+        ta, tb = (a - left) / (right - left), (b - left) / (right - left)
+        inputs = layout.inputPositions[layer]
+        ranges = []
+        for row, yOutput in enumerate(layout.yPositions[layer + 1]):
+            low = min(SpatialIndex._lowerBound(y1, ta, yOutput), SpatialIndex._lowerBound(y1, tb, yOutput))
+            high = max(SpatialIndex._upperBound(y2, ta, yOutput), SpatialIndex._upperBound(y2, tb, yOutput))
+            if low > high:
+                continue
+            start, stop = bisect.bisect_left(inputs, low), bisect.bisect_right(inputs, high)
+            if start < stop:
+                ranges.append((row, start, stop))
+        return ranges
+
+    @staticmethod
+    def _lowerBound(y: float, t: float, yOutput: float) -> float:
+        """The smallest input position whose edge has a y of at least `y` at `t`."""
+        if t >= 1:
+            return -math.inf if yOutput >= y else math.inf
+        return (y - t * yOutput) / (1 - t)
+
+    @staticmethod
+    def _upperBound(y: float, t: float, yOutput: float) -> float:
+        """The largest input position whose edge has a y of at most `y` at `t`."""
+        if t >= 1:
+            return math.inf if yOutput <= y else -math.inf
+        return (y - t * yOutput) / (1 - t)
@@ -1,182 +1,156 @@
+import array
+import copy
+import os
+import random
+
+from Sources.SnapshotLog import SnapshotReader
+from Sources.Tensors import MatrixView
+
+FIXTURE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Fixtures')
+"""str: The directory of the fixture files shipped with NNVisualizer."""
+
+
 class StateDictionaries:
-    """A class that holds example state dictionaries."""
+    """A class that holds example state dictionaries.
+
+    Examples are stored in a registry of fixtures, either as compact snapshot logs
+    (float32, see `SnapshotWriter`) in `FIXTURE_DIRECTORY` or as functions that
+    generate them. Nothing is loaded until a fixture is first asked for, and every
+    fixture is only loaded once. Later calls share the loaded values through read-only
+    memoryviews, so a caller cannot change the fixture that other callers see.
+    """
+
+    _fixtures = {}
+    """dict: The file name or generating function of every registered fixture, by name."""
+
+    _loaded = {}
+    """dict: The fixtures loaded so far, by name."""
 
     def __init__(self):
         pass
 
+    @staticmethod
+    def register(name: str, source):
+        """Registers a fixture that `fixture(name)` loads the first time it is asked for.
+
+        Args:
+            name (str): The name of the fixture.
+            source: The path of a snapshot log (relative to `FIXTURE_DIRECTORY`), whose
+                last snapshot is the fixture, or a function that returns the state dictionary.
+        """
+        StateDictionaries._fixtures[name] = source
+        StateDictionaries._loaded.pop(name, None)
+
+    @staticmethod
+    def fixtures() -> list:
+        """Returns the names of every registered fixture."""
+        return list(StateDictionaries._fixtures)
+
+    @staticmethod
+    def fixture(name: str) -> dict:
+        """Returns the state dictionary of a registered fixture, loading it if needed.
+
+        Buffers and `MatrixView`s of buffers are returned as read-only views of the loaded
+        values, and anything else (such as nested lists) is copied for every call.
+
+        Raises:
+            KeyError: If no fixture called `name` is registered.
+        """
+        state_dict = StateDictionaries._loaded.get(name)
+        if state_dict is None:
+            if name not in StateDictionaries._fixtures:
+                raise KeyError(f"Unknown fixture {name!r}, expected one of {StateDictionaries.fixtures()}.")
+            source = StateDictionaries._fixtures[name]
+            if callable(source):
+                state_dict = source()
+            else:
+                reader = SnapshotReader(os.path.join(FIXTURE_DIRECTORY, source))
+                try:
+                    state_dict = reader.read(-1)
+                finally:
+                    reader.close()
+            StateDictionaries._loaded[name] = state_dict
+        return {key: StateDictionaries.readOnly(value) for key, value in state_dict.items()}
+
+    @staticmethod
+    def readOnly(value):
+        """Returns a read-only view of `value` if it is a buffer (or a `MatrixView` of one), or a copy of it otherwise."""
+        if isinstance(value, MatrixView):
+            flat = StateDictionaries.readOnly(value.flat)
+            return MatrixView(flat, rows=value.rows, cols=value.cols)
+        try:
+            return memoryview(value).toreadonly()
+        except TypeError:
+            return copy.deepcopy(value)
+
     @staticmethod
     def default_state_dict():
-        return {'0.weight': [[0.2576, -0.2207, -0.0969, 0.2347],
-                             [-0.4707, 0.2999, -0.1029, 0.2544],
-                             [0.0695, -0.0612, 0.1387, 0.0247],
-                             [0.1826, -0.1949, -0.0365, -0.0450]],
-                '0.bias': [0.0725, -0.0020, 0.4371, 0.1556],
-                '2.weight': [[-0.1862, -0.3020, -0.0838, -0.2157],
-                             [-0.1602, 0.0239, 0.2981, 0.2718],
-                             [-0.4888, 0.3100, 0.1397, 0.4743],
-                             [0.3300, -0.4556, -0.4754, -0.2412]],
-                '2.bias': [0.4391, -0.0833, 0.2140, -0.2324]}
+        return StateDictionaries.fixture('default')
 
     @staticmethod
     def snake_state_dict():
-        return {'0.weight': [[1.1293, -0.8090, -0.5287, 1.5705],
-                             [-1.7147, -0.0526, 2.0345, 0.5660],
-                             [0.6976, 1.7807, -0.2015, -0.9580],
-                             [0.1019, -0.2117, -0.0835, -0.0862]],
-                '0.bias': [0.3508, 0.1918, 0.4731, 0.1465],
-                '2.weight': [[0.7126, -1.9938, 0.1523, -0.2113],
-                             [-1.3194, -0.2110, 1.3227, 0.2657],
-                             [-0.9676, 1.8449, -0.4638, 0.4726],
-                             [1.3500, 0.1278, -1.7198, -0.2386]],
-                '2.bias': [0.1505, -0.5000, -0.1721, -0.3832]}
+        return StateDictionaries.fixture('snake')
 
     @staticmethod
     def tictactoe_state_dict():
-        return {
-            'hiddenLayer1.weight': [[-0.3398, 0.1490, 0.3501, -0.0939, 0.3081, -0.2135, -0.0801, 0.0255,
-                                     -0.1353, 0.4678, 0.1746, -0.4011, 0.3448, 0.1045, 0.0704, 0.2500,
-                                     -0.2546, 0.2166, -0.0107, -0.1822, 0.5980, 0.1173, -0.2198, -0.0871,
-                                     -0.0315, 0.4331, -0.0209],
-                                    [0.4050, 0.1118, 0.2161, 0.0193, -0.4657, -0.0263, 0.2969, -0.0121,
-                                     0.1594, 0.0648, 0.2698, -0.1246, 0.0614, 0.0601, 0.2118, 0.7584,
-                                     0.0949, 0.0470, 0.0149, 0.2338, -0.0874, 0.0730, 0.8829, -0.0115,
-                                     -0.7749, 0.1685, 0.0716],
-                                    [0.0023, 0.4483, 0.5293, -0.0632, 0.2820, -0.0352, -0.0762, 0.4615,
-                                     0.5499, 0.2708, -0.1862, 0.3416, 0.2347, 0.2732, 0.4889, 0.3545,
-                                     0.0145, 0.7614, 0.1058, -0.0153, -0.3622, 0.2310, 0.1185, -0.1379,
-                                     0.1673, -0.0200, -0.8193],
-                                    [0.3333, 0.1998, 0.2766, -0.6045, 0.0763, 0.1810, -0.1132, 0.3687,
-                                     0.0992, -0.2065, 0.0130, -0.0870, 0.1583, 0.1438, 0.1856, 0.6341,
-                                     0.5329, -0.0465, 0.0527, -0.0480, 0.0417, 0.7502, 0.1278, 0.0151,
-                                     -0.2046, -0.4791, 0.4382],
-                                    [-0.0638, -0.3622, -0.5087, 0.2184, -0.1826, 0.5935, 0.5568, -0.5148,
-                                     0.6611, 0.0374, 0.3176, 0.4315, -0.1527, 0.3745, -0.3218, -0.3339,
-                                     0.3996, -0.3060, 0.0795, 0.3589, 0.2267, 0.0895, -0.0474, -0.5410,
-                                     -0.3241, 0.0844, -0.3291],
-                                    [0.0216, 0.0576, 0.4620, 0.1391, 0.1520, 0.0057, 0.1185, 0.0277,
-                                     0.3072, -0.0796, -0.0056, -0.1618, 0.5050, -0.5421, 0.3020, -0.3144,
-                                     0.6472, 0.0066, 0.5722, -0.2783, 0.2385, -0.3311, 0.5769, 0.0537,
-                                     0.4588, -0.1060, 0.1473],
-                                    [-0.4256, 0.5741, 0.3846, 0.7226, -0.6480, 0.6166, 0.6835, 0.3993,
-                                     -0.5657, 0.3681, -0.0085, 0.0777, -0.0845, 0.7408, -0.0575, 0.1197,
-                                     -0.0128, 0.4234, 0.4361, -0.3059, -0.0548, -0.1971, 0.2391, -0.2050,
-                                     -0.2596, -0.3504, 0.4038],
-                                    [0.5869, 0.0212, 0.4462, 0.1247, 0.0799, 0.0342, -0.0755, 0.4645,
-                                     -0.1474, 0.3359, -0.0590, 0.4245, 0.3884, 0.2881, 0.0727, 0.1776,
-                                     0.1281, 0.0091, -0.7153, 0.3142, -0.6072, -0.1141, 0.3141, 0.2680,
-                                     0.3750, 0.1781, 0.2142],
-                                    [-0.1201, 0.2808, 1.1108, -0.1658, 0.2073, 0.7284, -0.2263, -0.3969,
-                                     -0.8055, 0.0931, 0.2662, -0.2444, 0.0704, 0.1570, -0.0225, 0.4141,
-                                     0.3077, 0.6229, -0.0077, 0.0968, -0.5453, 0.1207, -0.2000, -0.3736,
-                                     0.1998, 0.1829, 0.4194],
-                                    [0.4076, 0.5521, 0.0161, 0.3022, 0.1771, 0.1558, 0.2051, 0.3175,
-                                     0.0587, 0.2904, 0.8098, 0.1777, 0.3143, 0.0552, 0.0478, 0.1795,
-                                     0.2087, 0.1466, -0.2312, -1.0549, 0.4651, -0.1088, 0.1149, 0.1330,
-                                     0.1523, 0.2034, -0.0563],
-                                    [0.2437, 0.0612, -0.2716, -0.3131, 0.2457, -0.0108, 0.2105, -0.1779,
-                                     -0.0409, -0.2376, 0.0238, 0.2945, 0.1838, -0.0512, 0.7722, -0.0644,
-                                     -0.0138, 0.0276, -0.0614, -0.1113, 0.2370, 0.5146, -0.2560, -0.4262,
-                                     -0.1369, 0.3384, 0.2936],
-                                    [0.2895, 0.1476, 0.1190, 0.1016, 0.1894, 0.6089, 0.5806, 0.2825,
-                                     -0.0359, 0.6826, 0.1333, -0.2099, 0.3106, 0.0377, 0.2830, 0.0178,
-                                     0.3490, 0.5362, -0.5638, 0.3265, 0.1828, -0.0219, 0.0829, -0.5674,
-                                     0.1484, -0.2693, 0.0457],
-                                    [-0.1225, 0.0485, 0.0669, -0.0314, -0.1705, -0.0577, 0.0688, -0.1408,
-                                     -0.1262, -0.1553, 0.0617, -0.1279, -0.0374, 0.0717, -0.0038, -0.1630,
-                                     -0.0516, -0.1227, -0.0357, 0.1599, 0.0024, -0.1012, -0.0192, 0.0704,
-                                     -0.0423, -0.0094, -0.1568],
-                                    [-0.2181, -0.5587, -0.2778, -0.1620, 0.6943, 0.4051, -0.0685, 0.6199,
-                                     0.5164, 0.2426, 0.6948, 0.3385, 0.5501, -0.8291, 0.0704, 0.3674,
-                                     -0.6149, -0.3024, 0.0711, -0.2193, 0.0153, -0.2337, 0.0101, -0.0307,
-                                     -0.0283, -0.2161, 0.1331],
-                                    [0.1438, 0.0146, -0.5778, -0.0061, -0.0297, -0.4979, 0.0603, 0.2471,
-                                     0.6219, -0.0746, -0.0814, 0.9077, -0.1446, -0.1088, 0.7313, -0.2700,
-                                     -0.0951, -0.7145, 0.1072, -0.1706, -0.3317, 0.0297, -0.0696, -0.3626,
-                                     0.0356, 0.0966, 0.1682],
-                                    [0.3713, 0.0772, 0.6408, -0.2313, -0.2800, -0.2734, -0.4533, -0.2177,
-                                     -0.5886, -0.8106, -0.4481, -0.9120, -0.0708, 0.0461, 0.4541, 0.1752,
-                                     -0.1726, 0.3296, 0.2675, 0.1837, 0.2745, 0.1308, 0.0643, -0.0411,
-                                     0.1041, 0.2302, 0.0161],
-                                    [0.0089, 0.0047, -0.0941, -0.1075, -0.0398, -0.0398, -0.2146, 0.1955,
-                                     -0.0316, -0.2920, 0.4793, 0.5122, 0.4004, 0.4837, -0.1863, 0.5137,
-                                     -0.4685, 0.5218, 0.3999, -0.1139, -0.2685, -0.3723, -0.2351, 0.0476,
-                                     -0.1781, 0.4677, -0.4524],
-                                    [0.5898, 0.3151, 0.1610, 0.0843, 0.5076, -0.0464, -0.3139, 0.3000,
-                                     0.1492, -0.9762, -0.0945, 0.2853, 0.6477, -0.4733, 0.6163, 0.7039,
-                                     -0.0426, -0.0430, 0.3243, 0.0780, 0.0493, -0.4912, 0.0843, -0.1367,
-                                     -0.6008, -0.0069, 0.0523],
-                                    [-0.0189, -0.0443, 0.5650, 0.4786, 0.3761, -0.2748, 0.4625, 0.1578,
-                                     0.2825, 0.3118, -0.1078, 0.0394, 0.1682, 0.3215, 0.1059, 0.1755,
-                                     0.4072, 0.3753, 0.2375, 0.2128, -0.0523, -0.1791, -0.7095, 0.5526,
-                                     -0.2990, -0.2348, -0.1591],
-                                    [0.6524, 0.3723, -0.5429, 0.5219, -0.7938, 0.6251, -0.7458, 0.3565,
-                                     0.4405, -0.1548, -0.1802, 0.6080, -0.2991, 0.5552, -0.0059, 0.6737,
-                                     -0.2319, -0.3161, -0.1224, -0.1504, 0.2331, -0.1323, 0.2077, -0.0152,
-                                     0.2372, -0.1827, -0.2246]],
-            'hiddenLayer1.bias': [0.0753, 0.3019, 0.5684, 0.3201, 0.1131, 0.0481, 0.2577, 0.3867,
-                                  0.0184, 0.1259, 0.1418, 0.6220, -0.2026, -0.1124, -0.0520, -0.1643,
-                                  0.1830, 0.1213, 0.2831, 0.0015],
-            'hiddenLayer2.weight': [[-0.5840, -0.1600, 0.3411, 0.3212, 0.0054, 0.3587, 0.8171, 0.2582,
-                                     -0.4390, 0.0219, -0.4503, 0.1768, 0.0768, 0.2810, -0.2559, -0.1012,
-                                     -0.0443, 0.5402, 0.2106, 0.0921],
-                                    [0.0267, 0.4663, 0.1225, -0.3344, 0.3787, 0.4693, 0.1493, -0.1056,
-                                     0.3614, 0.0070, 0.1778, 0.4590, 0.1563, 0.2689, 0.8805, -0.0456,
-                                     0.0413, 0.4632, -0.5987, -0.1513],
-                                    [0.0151, 0.9657, -0.3281, 0.0762, 0.1658, -0.6910, 0.2006, -0.4852,
-                                     -0.0376, 0.1441, -0.0098, -0.0065, -0.1613, 0.1361, 0.1470, -0.2439,
-                                     0.2144, 0.6180, 0.8742, -0.5682],
-                                    [0.2230, 0.1089, 0.8439, -0.2789, 0.7982, 0.0580, -0.3060, -0.6193,
-                                     -0.2693, 0.0513, 0.1919, 0.7268, 0.1347, 0.4073, -0.7786, 0.5553,
-                                     0.3126, 0.0672, -0.0153, 0.5878],
-                                    [-0.3736, 0.2439, -0.4918, -0.6455, 0.3940, -0.1503, 0.4515, 0.1130,
-                                     0.6767, 0.1094, -0.4593, 0.4750, 0.1139, -0.2545, -0.0074, 0.3293,
-                                     -0.0812, -0.0220, -0.0202, 0.6344],
-                                    [-0.6186, 0.4835, 0.2184, 0.4814, -0.8903, 0.3543, 0.0621, -0.2119,
-                                     -0.3794, 0.3638, -0.0899, 0.6041, -0.1023, 0.4076, -0.3134, -0.3448,
-                                     -0.4933, -0.5168, -0.1241, 0.3042],
-                                    [-0.1280, 0.1688, -0.2568, -0.0101, 0.3013, -0.2897, -0.0478, -0.0238,
-                                     0.3230, 0.0031, 0.2349, 0.4220, 0.1810, 0.1187, -0.0414, 0.0132,
-                                     -0.2391, 0.0144, -0.1211, -0.1112],
-                                    [-0.1560, -0.0779, -0.0550, 0.5958, 0.0616, -0.6338, 0.2442, 0.4441,
-                                     0.3724, -0.3881, 0.2876, 0.5587, 0.2084, 0.4735, 0.6377, -0.0539,
-                                     -0.3622, 0.3283, 0.0576, -0.5446],
-                                    [0.0110, -0.4481, -0.3506, -0.6305, -0.2057, 0.1033, -0.3273, 0.6087,
-                                     0.3937, 0.4262, -0.2375, 0.3737, -0.0899, -0.2713, 0.2635, -0.0581,
-                                     -0.2945, 0.9025, 0.6454, 0.4633],
-                                    [0.5354, -0.0487, -0.0602, 0.3016, -0.3063, -0.4838, 0.0198, 0.0981,
-                                     0.1932, 1.0791, 0.6447, 0.2524, -0.0648, -0.6706, -0.3022, -0.8874,
-                                     -0.1572, 0.0363, 0.0152, 0.2703],
-                                    [-0.0348, -0.3160, 0.7575, 0.1439, -0.1802, 0.2126, 0.4714, -0.0100,
-                                     0.7546, 0.6266, 0.1437, -0.8412, -0.0891, -0.0565, 0.3654, -0.7349,
-                                     0.6578, -0.1358, 0.1045, -0.4478],
-                                    [0.0409, -0.0762, 0.0069, -0.3244, -0.2879, 0.3419, -0.2785, 0.0863,
-                                     -0.6266, 0.3363, -0.0243, 0.2708, -0.0787, 0.0932, -0.3636, -0.2455,
-                                     0.2334, 0.4214, 0.4574, -0.1215],
-                                    [-0.5118, 0.7553, 1.0235, -0.4628, 0.2250, -0.4536, -0.7680, 0.6888,
-                                     0.2302, 0.3985, -0.1361, 0.2170, 0.2045, -0.2850, -0.2620, -0.5395,
-                                     0.0765, -0.4184, 0.1815, 0.0047],
-                                    [0.0492, -0.8574, 0.3667, 0.3824, 0.3565, -0.1709, 0.0663, -0.4037,
-                                     0.3935, -0.4634, 0.4203, 0.1239, 0.0917, 0.9333, -0.0553, 0.0539,
-                                     -0.1626, -0.3093, 1.0511, 0.7260]],
-            'hiddenLayer2.bias': [-0.1898, -0.1511, 0.6029, -0.2031, -0.1894, 0.4280, -0.1449, 0.0107,
-                                  0.1766, 0.4067, 0.3833, 0.3448, 0.4416, -0.2499],
-            'outputLayer.weight': [[0.2218, 0.3172, 0.2579, 0.0035, -0.1446, -0.3144, -0.0483, -0.4668,
-                                    -0.5399, -0.7215, 0.6694, 0.1405, -0.6885, 0.3459],
-                                   [0.0646, -0.2946, -0.0330, -0.0450, 0.4362, -0.2110, 0.1919, 0.6179,
-                                    -0.0633, -0.9727, -0.7588, 0.2720, 0.2821, 0.2222],
-                                   [-0.1410, -0.2879, 0.1226, 0.8954, -0.0985, 0.3336, 0.0368, -0.4556,
-                                    -0.1026, 0.5551, -0.9448, 0.2866, -0.7639, 0.0466],
-                                   [-0.5654, -0.1970, -0.1467, -0.0484, -0.8278, 0.3639, 0.4548, 0.4757,
-                                    -0.9372, 0.2980, 0.1157, -0.6070, 0.2306, 0.2194],
-                                   [0.4921, 1.9303, -0.5439, -0.2050, 0.2639, 1.7069, -0.2422, -0.4688,
-                                    -1.2454, -1.0948, -0.5457, 0.1390, 0.7442, -2.2190],
-                                   [0.1866, -1.0155, 0.2726, -0.3523, -0.6754, 0.0446, 0.1977, -0.3761,
-                                    0.1023, -0.2594, 0.1763, 0.6204, 0.4368, -0.4560],
-                                   [-0.3313, -0.0566, -1.4446, -0.0530, 0.0890, 0.5280, 0.0626, -0.1920,
-                                    0.5274, -0.3612, 0.2693, -0.0153, -0.0035, 0.5821],
-                                   [-0.9017, 0.2186, 0.2028, 0.1432, 0.2726, -0.8056, -0.2922, -0.2268,
-                                    0.0807, 0.2414, 0.2512, -0.0360, 0.1600, -0.5540],
-                                   [-0.1513, 0.1667, 0.0315, -1.1483, 0.3202, 0.0652, -0.2050, 0.6554,
-                                    0.2357, 0.4020, -0.0859, -0.0388, -0.8993, -0.2437]],
-            'outputLayer.bias': [-0.0185, -0.1057, -0.2973, -0.3582, 0.6287, 0.1831, -0.2730, 0.0750,
-                                 0.0249]}
+        return StateDictionaries.fixture('tictactoe')
+
+    @staticmethod
+    def mnist_state_dict():
+        """A randomly initialized 784-128-64-10 network, the size of a small MNIST classifier."""
+        return StateDictionaries.fixture('mnist')
+
+    @staticmethod
+    def synthetic_state_dict(widths: list, distribution: str = 'normal', scale: float = 0.5,
+                             format: str = 'list', seed: int = 0) -> dict:
+        """Generates a random state dictionary of any size, for benchmarks and demos.
+
+        Args:
+            widths (list): The number of neurons in every layer, starting with the inputs.
+                For example, [784, 512, 10] has two weight matrices.
+            distribution (str): 'normal' (standard deviation `scale`), 'uniform'
+                (between -`scale` and `scale`), or 'sparse' (normal, with 90% zeros).
+            scale (float): The spread of the generated values.
+            format (str): 'list' for nested lists, 'array' for float32 `array`s,
+                or 'numpy' for NumPy arrays (requires NumPy).
+            seed (int): The seed of the random values, so results can be repeated.
+
+        Returns:
+            dict: Keys '0.weight', '0.bias', '1.weight', ... like a PyTorch `nn.Sequential`.
+        """
+        generator = random.Random(seed)
+        if distribution == 'normal':
+            sample = lambda: generator.gauss(0, scale)
+        elif distribution == 'uniform':
+            sample = lambda: generator.uniform(-scale, scale)
+        elif distribution == 'sparse':
+            sample = lambda: generator.gauss(0, scale) if generator.random() < 0.1 else 0.0
+        else:
+            raise ValueError(f"Unknown distribution: {distribution}")
+
+        def values(rows: int, cols: int = None):
+            count = rows * (cols or 1)
+            if format == 'list':
+                flat = [sample() for _ in range(count)]
+                return flat if cols is None else [flat[row * cols:(row + 1) * cols] for row in range(rows)]
+            flat = array.array('f', (sample() for _ in range(count)))
+            if format == 'numpy':
+                import numpy
+                flat = numpy.frombuffer(flat, dtype=numpy.float32)
+                return flat if cols is None else flat.reshape(rows, cols)
+            if format != 'array':
+                raise ValueError(f"Unknown format: {format}")
+            return flat if cols is None else MatrixView(memoryview(flat), rows=rows, cols=cols)
+
+        state_dict = {}
+        for layer, (inputs, outputs) in enumerate(zip(widths, widths[1:])):
+            state_dict[f'{layer}.weight'] = values(outputs, inputs)
+            state_dict[f'{layer}.bias'] = values(outputs)
+        return state_dict
+
+
+StateDictionaries.register('default', 'default.nnvl')
+StateDictionaries.register('snake', 'snake.nnvl')
+StateDictionaries.register('tictactoe', 'tictactoe.nnvl')
+StateDictionaries.register('mnist', lambda: StateDictionaries.synthetic_state_dict(
+    [784, 128, 64, 10], distribution='normal', scale=0.05, format='array'))
@@ -0,0 +1,73 @@
+import tkinter as tk
+
+
+class StatisticsPanel:
+    """A panel that summarizes every weight matrix and bias vector next to the network.
+
+    Each entry is shown as one text item (mean, standard deviation, L2 norm,
+    sparsity, and range) above a histogram of `bins` bars colored like the
+    network. A million-parameter layer takes a few dozen canvas items instead
+    of one per edge, and updates only move and recolor the existing items.
+    """
+
+    ROW_HEIGHT: int = 84
+    """int: The height (in pixels) of every entry."""
+    HISTOGRAM_HEIGHT: int = 26
+    """int: The height (in pixels) of the tallest histogram bar."""
+
+    def __init__(self, master, width: int = 220):
+        self.master = master
+        self.width = width
+        self.keys = None
+        self.textItems = []
+        self.barItems = []
+
+    def create_widgets(self):
+        self.canvas = tk.Canvas(master=self.master, width=self.width, highlightthickness=0, background='white')
+        self.canvas.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def _createItems(self, keys: list, bins: int):
+        self.canvas.delete('all')
+        self.keys = list(keys)
+        self.textItems = []
+        self.barItems = []
+        for index in range(len(keys)):
+            top = index * self.ROW_HEIGHT + 4
+            self.textItems.append(self.canvas.create_text(6, top, anchor=tk.NW, font=("TkFixedFont", 8)))
+            self.barItems.append([self.canvas.create_rectangle(0, 0, 0, 0, width=0) for _ in range(bins)])
+        self.canvas.config(scrollregion=(0, 0, self.width, len(keys) * self.ROW_HEIGHT))
+
+    def refresh(self, statistics: dict, keys: list, palette):
+        """Shows the statistics of `keys`.
+
+        Args:
+            statistics (dict): The `LayerStatistics` by key, from `StatisticsEngine.update`.
+            keys (list): The keys to show, in order.
+            palette (ColorPalette): The palette to color the histogram bars with.
+        """
+        if not keys:
+            # Nothing to summarize, such as a network without any drawn layers
+            if self.keys != []:
+                self._createItems([], 0)
+            return
+        bins = len(statistics[keys[0]].histogram)
+        if keys != self.keys or len(self.barItems[0]) != bins:
+            self._createItems(keys, bins)
+        barWidth = (self.width - 12) / bins
+        for index, key in enumerate(keys):
+            layer = statistics[key]
+            self.canvas.itemconfig(self.textItems[index], text=(
+                f"{key}\n"
+                f"mean {layer.mean:+.3f}  std {layer.std:.3f}\n"
+                f"l2 {layer.l2:.3g}  zero {layer.sparsity:.0%}\n"
+                f"[{layer.minimum:+.3g}, {layer.maximum:+.3g}]"))
+
+            bottom = (index + 1) * self.ROW_HEIGHT - 4
+            tallest = max(layer.histogram) or 1
+            centers = [layer.limit * ((2 * bin + 1) / bins - 1) for bin in range(bins)]
+            for bin, (item, count, color) in enumerate(zip(self.barItems[index], layer.histogram,
+                                                         palette.colorsFor(centers))):
+                x = 6 + bin * barWidth
+                height = self.HISTOGRAM_HEIGHT * count / tallest
+                self.canvas.coords(item, x, bottom - height, x + barWidth, bottom)
+                self.canvas.itemconfig(item, fill=color)
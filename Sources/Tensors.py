@@ -0,0 +1,190 @@
+import array
+import itertools
+import struct
+import sys
+import zlib
+
+
+class MatrixView:
+    """A read-only, two-dimensional view over a flat sequence of numbers.
+
+    Indexing a row returns a slice of the flat sequence, so rows of a memoryview
+    are themselves memoryviews and nothing is copied.
+
+    Attributes:
+        flat: The numbers in row-major order (a memoryview, tuple, or list).
+        rows (int): The number of rows.
+        cols (int): The number of columns.
+    """
+
+    def __init__(self, flat, rows: int, cols: int):
+        self.flat = flat
+        self.rows = rows
+        self.cols = cols
+
+    @property
+    def shape(self) -> (int, int):
+        return self.rows, self.cols
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(self.rows))]
+        if index < 0:
+            index += self.rows
+        if not 0 <= index < self.rows:
+            raise IndexError("MatrixView index out of range")
+        return self.flat[index * self.cols:(index + 1) * self.cols]
+
+    def __iter__(self):
+        flat, cols = self.flat, self.cols
+        for start in range(0, self.rows * cols, cols):
+            yield flat[start:start + cols]
+
+    def __repr__(self):
+        return f"MatrixView(rows={self.rows}, cols={self.cols})"
+
+
+class Tensors:
+    """Converts the values of a state dictionary into views that `NNVisualizer` can draw.
+
+    Nested lists are used as they are. NumPy arrays, torch tensors, and any other
+    object that supports the buffer protocol or `__array__` are read through
+    memoryviews instead of being converted element by element with `tolist()`.
+    """
+
+    _CASTABLE_FORMATS = frozenset('bBhHiIlLqQnNfd?')
+    """frozenset: The formats that `memoryview.cast` can read directly."""
+
+    _ARRAY_FORMATS = frozenset('bBhHiIlLqQfd')
+    """frozenset: The formats that `array.array` can hold."""
+
+    _numpy = None
+    """The `numpy` module once `numpy()` imported it, or False if it is not installed."""
+
+    @staticmethod
+    def numpy():
+        """Returns the `numpy` module, or None if it is not installed.
+
+        NumPy is imported on first use, since importing it takes several times as
+        long as importing the rest of the visualizer.
+        """
+        if Tensors._numpy is None:
+            try:
+                import numpy
+            except ImportError:
+                numpy = False
+            Tensors._numpy = numpy
+        return Tensors._numpy or None
+
+    @staticmethod
+    def stateDictView(state_dict: dict) -> dict:
+        """Returns a copy of `state_dict` whose values are all sequences or `MatrixView`s."""
+        return {key: Tensors.view(value) for key, value in state_dict.items()}
+
+    @staticmethod
+    def view(value):
+        """Returns a one-dimensional sequence or a `MatrixView` for `value`.
+
+        Args:
+            value: A (nested) list, NumPy array, torch tensor, or any object supporting
+                the buffer protocol or `__array__`. Dimensions after the first are
+                flattened into the columns of the matrix.
+
+        Returns:
+            A sequence of numbers for one-dimensional values, or a `MatrixView` otherwise.
+        """
+        if isinstance(value, (list, tuple, MatrixView)):
+            return value
+        # A value can only be a tensor if torch was imported already, so never import it here.
+        torch = sys.modules.get('torch')
+        if torch is not None and isinstance(value, torch.Tensor):
+            value = value.detach()
+            if value.dtype == torch.bfloat16:
+                value = value.float()
+            value = value.cpu().numpy()
+
+        try:
+            memory = memoryview(value)
+        except TypeError:
+            if not hasattr(value, '__array__'):
+                raise TypeError(f"Cannot visualize values of type {type(value).__name__}.")
+            memory = memoryview(value.__array__())
+
+        shape = memory.shape if memory.ndim > 0 else (1,)
+        flat = Tensors.flatten(memory)
+        if len(shape) == 1:
+            return flat
+        cols = 1
+        for size in shape[1:]:
+            cols *= size
+        return MatrixView(flat, rows=shape[0], cols=cols)
+
+    @staticmethod
+    def shape(value) -> tuple:
+        """Returns the shape of a value from `view`, such as (16, 27) or (16,)."""
+        if isinstance(value, MatrixView):
+            return value.shape
+        if len(value) > 0 and hasattr(value[0], '__len__'):
+            return len(value), len(value[0])
+        return len(value),
+
+    @staticmethod
+    def picklable(state_dict: dict) -> dict:
+        """Returns a copy of a state dictionary that can be sent to another process.
+
+        Memoryviews (including the rows of `MatrixView`s) cannot be pickled, so they are
+        copied into arrays. Every other value is kept as it is.
+        """
+        copied = {}
+        for key, value in state_dict.items():
+            if isinstance(value, MatrixView):
+                value = MatrixView(Tensors._copyBuffer(value.flat), rows=value.rows, cols=value.cols)
+            copied[key] = Tensors._copyBuffer(value)
+        return copied
+
+    @staticmethod
+    def _copyBuffer(value):
+        if not isinstance(value, memoryview):
+            return value
+        format = value.format.lstrip('@')
+        if format not in Tensors._ARRAY_FORMATS:
+            return list(value)
+        copy = array.array(format)
+        copy.frombytes(value.cast('B') if value.c_contiguous else value.tobytes())
+        return copy
+
+    @staticmethod
+    def checksum(state_dict: dict) -> int:
+        """Returns a CRC-32 of the keys and values of a state dictionary, to cheaply tell whether it changed.
+
+        Buffers (such as NumPy arrays and torch tensors) are checksummed in place;
+        nested lists are packed into a float64 array first.
+        """
+        crc = 0
+        for key, value in state_dict.items():
+            crc = zlib.crc32(key.encode('utf-8'), crc)
+            value = Tensors.view(value)
+            flat = value.flat if isinstance(value, MatrixView) else value
+            if not isinstance(flat, memoryview):
+                if len(flat) > 0 and hasattr(flat[0], '__len__'):
+                    flat = itertools.chain.from_iterable(flat)
+                flat = array.array('d', flat)
+            crc = zlib.crc32(flat, crc)
+        return crc
+
+    @staticmethod
+    def flatten(memory: memoryview):
+        """Returns the elements of `memory` as a flat sequence in row-major order.
+
+        C-contiguous buffers in a native format are cast without copying.
+        Anything else is copied once with `struct`, still without a Python call per element.
+        """
+        format = memory.format
+        if memory.c_contiguous and format.lstrip('@') in Tensors._CASTABLE_FORMATS:
+            return memory.cast('B').cast(format.lstrip('@'))
+        count = memory.nbytes // memory.itemsize
+        prefix, code = (format[0], format[1:]) if format[0] in '@=<>!' else ('', format)
+        return struct.unpack(f"{prefix}{count}{code}", memory.tobytes())
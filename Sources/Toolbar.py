@@ -9,20 +9,34 @@ class Toolbar:
     and biases for `NNVisualizer`. Colors are stored with `negativeColor` and
     `positiveColor` in RGB format (int, int int) tuples.
 
+    If a `timeline_func` is given, a slider for scrubbing through recorded
+    snapshots is shown as well, and `timeline_func` is called with the index
+    of the selected snapshot whenever it moves.
+
     Attributes:
         negativeColor (int, int, int): The RGB value for negative weights/biases.
         positiveColor (int, int, int): The RGB value for positive weights/biases.
     """
 
-    def __init__(self, master, frame, update_func):
+    INVALID_COLOR: str = "#FFCCCC"
+    """str: The background of text fields that do not hold a valid color component."""
+
+    def __init__(self, master, frame, update_func, timeline_func=None):
         self.master = master
         self.frame = frame
         self.update_func = update_func
+        self.timeline_func = timeline_func
 
         self.negativeColor = (255, 0, 0)
         self.positiveColor = (0, 0, 255)
 
     def create_widgets(self):
+        # Timeline
+        if self.timeline_func is not None:
+            self.timeline = tk.Scale(master=self.master, orient=tk.HORIZONTAL, from_=0, to=0, showvalue=False,
+                                     command=lambda value: self.timeline_func(int(float(value))))
+            self.timeline.pack(side=tk.BOTTOM, fill=tk.X)
+
         # Negative Red Text
         self.negativeRedTextField = tk.Text(master=self.master, fg="red", height=1, width=3)
         self.negativeRedTextField.config(highlightbackground="red")
@@ -67,20 +81,49 @@ class Toolbar:
         self.updateButton = tk.Button(master=self.master, text="Update", command=self.update_func)
         self.updateButton.pack(fill=tk.Y, expand=False, anchor=tk.S)
 
-    def updateColors(self):
-        """Updates `positiveColor` and `negativeColor` to match the text fields."""
-        self.negativeColor = (int(self.negativeRedTextField.get("1.0", tk.END)),
-                              int(self.negativeGreenTextField.get("1.0", tk.END)),
-                              int(self.negativeBlueTextField.get("1.0", tk.END)))
-        self.positiveColor = (int(self.positiveRedTextField.get("1.0", tk.END)),
-                              int(self.positiveGreenTextField.get("1.0", tk.END)),
-                              int(self.positiveBlueTextField.get("1.0", tk.END)))
+    def updateColors(self) -> bool:
+        """Updates `positiveColor` and `negativeColor` to match the text fields.
+
+        Fields that do not hold a whole number between 0 and 255 are highlighted,
+        and the colors are left unchanged.
+
+        Returns:
+            bool: Whether every field was valid and the colors were updated.
+        """
+        fields = (self.negativeRedTextField, self.negativeGreenTextField, self.negativeBlueTextField,
+                  self.positiveRedTextField, self.positiveGreenTextField, self.positiveBlueTextField)
+        values = [Toolbar.parseComponent(field.get("1.0", tk.END)) for field in fields]
+        for field, value in zip(fields, values):
+            field.config(background="white" if value is not None else self.INVALID_COLOR)
+        if None in values:
+            return False
+
+        self.negativeColor = tuple(values[:3])
+        self.positiveColor = tuple(values[3:])
         # Update the positive and negative labels
         self.negativeLabel.config(background=self.negativeColorHex())
         self.positiveLabel.config(background=self.positiveColorHex())
 
         print(f"Negative: {self.negativeColor}")
         print(f"Positive: {self.positiveColor}")
+        return True
+
+    @staticmethod
+    def parseComponent(text: str):
+        """Returns the color component (0-255) in `text`, or None if it is not a whole number in range."""
+        try:
+            value = int(text.strip())
+        except ValueError:
+            return None
+        return value if 0 <= value <= 255 else None
+
+    def setTimelineLength(self, count: int):
+        """Lets the timeline select any of `count` snapshots."""
+        self.timeline.config(to=max(0, count - 1))
+
+    def setTimelineLabel(self, text: str):
+        """Shows `text` above the timeline, such as the step of the selected snapshot."""
+        self.timeline.config(label=text)
 
     def positiveColorHex(self) -> str:
         return Color.colorToHex(self.positiveColor)
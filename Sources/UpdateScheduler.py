@@ -0,0 +1,77 @@
+class UpdateScheduler:
+    """Chooses how long to wait before checking for the next snapshot, from how long updates take.
+
+    Every drawn snapshot reports how long it took to fetch and to draw, and the
+    scheduler keeps a moving average of both. The time between two updates is
+    then the longest of:
+
+    * the frame time of `target_fps`, so small networks are not redrawn pointlessly often,
+    * the drawing time divided by `render_share`, so drawing only takes up that share
+      of the Tk thread and the window stays responsive while a large network updates,
+    * the fetching time, since snapshots cannot arrive faster than they are fetched,
+    * and `minimum_interval`.
+
+    While no new snapshot arrives (because it did not change, or training paused),
+    the interval grows by `idle_backoff` with every check, up to `maximum_interval`,
+    and snaps back as soon as one arrives.
+
+    Attributes:
+        interval (int): How long (in ms) to wait before the next check.
+        renderSeconds (float): The moving average of the drawing time.
+        fetchSeconds (float): The moving average of the fetching time.
+    """
+
+    def __init__(self, minimum_interval: int = 0, maximum_interval: int = 1000, target_fps: float = 30.0,
+                 render_share: float = 0.5, idle_backoff: float = 1.5, smoothing: float = 0.3):
+        """Initializes a new scheduler.
+
+        Args:
+            minimum_interval (int): The shortest time (in ms) between two checks.
+            maximum_interval (int): The longest time (in ms) between two checks.
+            target_fps (float): The most updates to draw per second, or None for no limit.
+            render_share (float): The largest share (0.0-1.0) of the time that drawing may take.
+            idle_backoff (float): How much the interval grows with every check without a new snapshot.
+            smoothing (float): The weight (0.0-1.0) of the newest timing in the moving averages.
+        """
+        self.minimum_interval = max(0, minimum_interval)
+        self.maximum_interval = max(self.minimum_interval, maximum_interval)
+        self.target_fps = target_fps
+        self.render_share = render_share
+        self.idle_backoff = idle_backoff
+        self.smoothing = smoothing
+        self.renderSeconds = None
+        self.fetchSeconds = None
+        self.interval = self.minimum_interval
+
+    def _average(self, average: float, seconds: float) -> float:
+        return seconds if average is None else average + self.smoothing * (seconds - average)
+
+    def drawn(self, renderSeconds: float, fetchSeconds: float = 0.0) -> int:
+        """Records the timings of a drawn snapshot.
+
+        Returns:
+            int: How long (in ms) to wait before the next check.
+        """
+        self.renderSeconds = self._average(self.renderSeconds, renderSeconds)
+        self.fetchSeconds = self._average(self.fetchSeconds, fetchSeconds)
+        self.interval = self.activeInterval()
+        return self.interval
+
+    def idle(self) -> int:
+        """Records a check that found no new snapshot.
+
+        Returns:
+            int: How long (in ms) to wait before the next check.
+        """
+        self.interval = min(self.maximum_interval,
+                            max(self.activeInterval(), round(max(1, self.interval) * self.idle_backoff)))
+        return self.interval
+
+    def activeInterval(self) -> int:
+        """The time (in ms) to wait after drawing a snapshot, while snapshots keep arriving."""
+        render = self.renderSeconds or 0.0
+        period = max(render / self.render_share, self.fetchSeconds or 0.0)
+        if self.target_fps:
+            period = max(period, 1 / self.target_fps)
+        wait = round((period - render) * 1000)
+        return min(self.maximum_interval, max(self.minimum_interval, wait))
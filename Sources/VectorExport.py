@@ -0,0 +1,57 @@
+from Sources.NetworkDrawer import NetworkDrawer
+from Sources.Normalization import Normalizer
+from Sources.Renderers import SvgRenderer
+from Sources.StateDictionaries import StateDictionaries
+
+
+class VectorExport:
+    """Exports a state dictionary as an SVG image, such as for papers and reports.
+
+    The network is drawn by a `NetworkDrawer` with the same layout, colors, line
+    widths, and level of detail as on screen, into an `SvgRenderer`. `exportSVG` draws
+    the whole file in a single pass, so call it again for every image to export.
+
+    The level of detail depends on the size of the image like it does for the canvas,
+    so export at a larger size to include more of the edges of a wide layer.
+    """
+
+    @staticmethod
+    def exportSVG(state_dict: dict, output, width: int = 1600, height: int = 1200, item_budget: int = 10000000,
+                  normalization: str = Normalizer.FIXED, normalization_scope: str = Normalizer.LAYER,
+                  background: str = '#ffffff') -> int:
+        """Draws `state_dict` into an SVG file.
+
+        Args:
+            state_dict (dict): The state dictionary to export.
+            output: The path of the SVG file, or a text file to write it to.
+            width (int): The width of the image.
+            height (int): The height of the image.
+            item_budget (int): The maximum number of items to draw.
+            normalization (str): The range the colors are spread over; see `NetworkDrawer.setNormalization`.
+            normalization_scope (str): `Normalizer.LAYER` or `Normalizer.GLOBAL`.
+            background (str): The color of the background, or None for a transparent one.
+
+        Returns:
+            int: The number of items written.
+        """
+        if isinstance(output, str):
+            with open(output, 'w', encoding='utf-8') as file:
+                return VectorExport.exportSVG(state_dict, file, width=width, height=height,
+                                              item_budget=item_budget, normalization=normalization,
+                                              normalization_scope=normalization_scope, background=background)
+
+        renderer = SvgRenderer(output, width=width, height=height, background=background)
+        drawer = NetworkDrawer(state_dict, renderer=renderer, item_budget=item_budget)
+        drawer.normalizer = Normalizer(normalization, scope=normalization_scope)
+        drawer.drawNN()
+        renderer.close()
+        return renderer.itemCount
+
+
+def main():
+    count = VectorExport.exportSVG(StateDictionaries.tictactoe_state_dict(), 'tictactoe.svg')
+    print(f"Wrote {count} items to tictactoe.svg")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import time
+import tracemalloc
+
+from Sources.NetworkDrawer import NetworkDrawer
+from Sources.Renderers import CanvasRenderer, RasterRenderer
+from Sources.StateDictionaries import StateDictionaries
+
+DEFAULT_WIDTHS = [[27, 16, 9, 9], [256, 256, 10], [784, 512, 512, 10]]
+"""list: The layer widths benchmarked when none are given on the command line."""
+
+
+def createRenderer(backend: str, width: int, height: int):
+    """Creates the renderer for `backend`, along with the Tk root to destroy afterwards (if any).
+
+    The 'tk' backend needs a display. On a headless machine, run the benchmark
+    under a virtual display such as `xvfb-run python benchmark.py --backend tk`.
+    """
+    if backend == 'raster':
+        return RasterRenderer(width, height), None
+    import tkinter as tk
+    root = tk.Tk()
+    canvas = tk.Canvas(master=root, width=width, height=height, highlightthickness=0)
+    canvas.pack()
+    return CanvasRenderer(canvas), root
+
+
+def measure(function, repeat: int, traceMemory: bool = False) -> dict:
+    """Runs `function` and returns its fastest wall time.
+
+    Tracing memory slows Python down considerably, so the timed runs are never traced.
+    If `traceMemory` is set, one extra traced run measures the peak Python memory used.
+    """
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    result = {'seconds': min(seconds)}
+    if traceMemory:
+        tracemalloc.start()
+        function()
+        result['peakMemory'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def benchmark(widths: list, format: str, distribution: str, backend: str,
+              width: int = 800, height: int = 600, repeat: int = 3, traceMemory: bool = False) -> dict:
+    """Benchmarks drawing, updating, and recoloring one synthetic state dictionary.
+
+    Every phase is timed `repeat` times and the fastest run is kept. Renderers that
+    don't keep their items (such as the raster renderer) can only draw the neural net
+    from scratch, so their update and recolor phases are skipped rather than timed as redraws.
+
+    Returns:
+        dict: The configuration, the timing of every phase that was run, the names of
+            the skipped phases, and the number of drawn items.
+    """
+    renderer, root = createRenderer(backend, width, height)
+    first = StateDictionaries.synthetic_state_dict(widths, distribution=distribution, format=format, seed=0)
+    second = StateDictionaries.synthetic_state_dict(widths, distribution=distribution, format=format, seed=1)
+    drawer = NetworkDrawer(first, renderer)
+    snapshots = [first, second]
+
+    def update():
+        snapshots.reverse()
+        drawer.setStateDict(snapshots[0])
+        if root is not None:
+            root.update()
+
+    def recolor():
+        drawer.setColors((0, 255, 0), (255, 0, 255))
+        if root is not None:
+            root.update()
+
+    phases = {'drawNN': drawer.redraw, 'updateStateDict': update, 'updateColors': recolor}
+    skipped = [] if renderer.retainsItems else ['updateStateDict', 'updateColors']
+    results = {name: measure(phase, repeat, traceMemory) for name, phase in phases.items() if name not in skipped}
+    itemCount = renderer.itemCount
+    if root is not None:
+        root.destroy()
+
+    return {
+        'widths': widths,
+        'parameters': sum(inputs * outputs + outputs for inputs, outputs in zip(widths, widths[1:])),
+        'format': format,
+        'distribution': distribution,
+        'backend': backend,
+        'size': [width, height],
+        'phases': results,
+        'skippedPhases': skipped,
+        'items': itemCount,
+    }
+
+
+def compare(results: list, baseline: list, threshold: float) -> list:
+    """Returns a message for every phase that got more than `threshold` times slower than `baseline`."""
+    key = lambda result: (tuple(result['widths']), result['format'], result['distribution'], result['backend'])
+    previous = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        for phase, timing in result['phases'].items():
+            oldSeconds = old['phases'].get(phase, {}).get('seconds')
+            if oldSeconds and timing['seconds'] > oldSeconds * threshold:
+                regressions.append(f"{phase} {result['widths']} {result['format']}: "
+                                   f"{oldSeconds:.4f}s -> {timing['seconds']:.4f}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks drawing synthetic neural nets.")
+    parser.add_argument('--widths', action='append', default=None,
+                        help="Comma-separated layer widths, such as 784,512,10. May be repeated.")
+    parser.add_argument('--formats', default='list,array', help="Comma-separated value formats: list, array, numpy.")
+    parser.add_argument('--distribution', default='normal', help="normal, uniform, or sparse.")
+    parser.add_argument('--backend', default='auto', help="tk, raster, or auto (tk when a display is available).")
+    parser.add_argument('--repeat', type=int, default=3, help="How many times to run every phase.")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Also measure the peak Python memory of every phase (slow).")
+    parser.add_argument('--output', default='benchmark_results.json', help="The JSON file to write the results to.")
+    parser.add_argument('--compare', default=None, help="A previous results file to check for regressions.")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="How many times slower a phase may get before it counts as a regression.")
+    args = parser.parse_args()
+
+    backend = args.backend
+    if backend == 'auto':
+        backend = 'tk' if os.environ.get('DISPLAY') else 'raster'
+        print(f"Using the {backend} backend.")
+    allWidths = [[int(width) for width in widths.split(',')] for widths in args.widths] \
+        if args.widths else DEFAULT_WIDTHS
+
+    results = []
+    for widths in allWidths:
+        for format in args.formats.split(','):
+            result = benchmark(widths, format, args.distribution, backend, repeat=args.repeat,
+                               traceMemory=args.trace_memory)
+            results.append(result)
+            phases = [f"{name} {timing['seconds']:.4f}s" + (f" {timing['peakMemory'] / 1024:.0f} KiB"
+                                                              if 'peakMemory' in timing else '')
+                      for name, timing in result['phases'].items()]
+            phases += [f"{name} skipped" for name in result['skippedPhases']]
+            print(f"{widths} {format}: {', '.join(phases)}, {result['items']} items")
+
+    # The resident memory is a peak over the whole process, so it is only meaningful once, for the whole run.
+    maxResidentMemory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"Peak resident memory of the run: {maxResidentMemory} KiB")
+    with open(args.output, 'w') as file:
+        json.dump({'python': platform.python_version(), 'platform': platform.platform(),
+                   'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'maxResidentMemory': maxResidentMemory,
+                   'results': results}, file, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file)['results'], args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import argparse
+import os
+
+from Sources.BatchExport import BatchExport
+from Sources.VectorExport import VectorExport
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Renders state dictionaries (one per file) to PNG frames or SVG images.")
+    parser.add_argument('files', nargs='+', help="State dictionary files (.json, .npz, or .pt), in order.")
+    parser.add_argument('--output', default='frames', help="The directory to write the frames to.")
+    parser.add_argument('--width', type=int, default=800, help="The width of every frame in pixels.")
+    parser.add_argument('--height', type=int, default=600, help="The height of every frame in pixels.")
+    parser.add_argument('--processes', type=int, default=None, help="The number of worker processes.")
+    parser.add_argument('--item-budget', type=int, default=50000, help="The maximum number of items per frame.")
+    parser.add_argument('--format', choices=('png', 'svg'), default='png', help="The image format to write.")
+    args = parser.parse_args()
+
+    if args.format == 'svg':
+        # Every SVG image is streamed to its file as it is drawn, one file at a time.
+        os.makedirs(args.output, exist_ok=True)
+        for index, path in enumerate(args.files):
+            VectorExport.exportSVG(BatchExport.load(path), os.path.join(args.output, f"frame_{index:05d}.svg"),
+                                   width=args.width, height=args.height, item_budget=args.item_budget)
+        print(f"Wrote {len(args.files)} SVG images to {args.output}")
+        return
+
+    paths = BatchExport.exportFrames((BatchExport.load(path) for path in args.files), args.output,
+                                     width=args.width, height=args.height, processes=args.processes,
+                                     item_budget=args.item_budget)
+    print(f"Wrote {len(paths)} frames to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+class RecordingRenderer:
+    """A renderer that keeps every item in a dictionary, so tests can check what was drawn without Tk."""
+
+    retainsItems: bool = True
+
+    def __init__(self, width: int = 500, height: int = 400):
+        self._width = width
+        self._height = height
+        self.items = {}
+        self.calls = 0
+        self.created = 0
+        self.updated = 0
+        self._nextId = 0
+
+    def width(self) -> int:
+        return self._width
+
+    def height(self) -> int:
+        return self._height
+
+    def resize(self, width: int, height: int):
+        self._width, self._height = width, height
+
+    def clear(self):
+        self.items.clear()
+
+    @property
+    def itemCount(self) -> int:
+        return len(self.items)
+
+    def _create(self, kind: str, coords: tuple, color: str, tags, **options) -> int:
+        self._nextId += 1
+        self.calls += 1
+        self.created += 1
+        self.items[self._nextId] = dict(kind=kind, coords=coords, fill=color, tags=set(tags), **options)
+        return self._nextId
+
+    def drawLine(self, x1, y1, x2, y2, color, width=2, tags=()):
+        return self._create('line', (x1, y1, x2, y2), color, tags, width=width)
+
+    def drawCircle(self, x, y, r, color, outline="grey", tags=()):
+        return self._create('circle', (x - r, y - r, x + r, y + r), color, tags)
+
+    def drawRectangle(self, x1, y1, x2, y2, color, tags=()):
+        return self._create('rectangle', (x1, y1, x2, y2), color, tags)
+
+    def _find(self, item) -> list:
+        if isinstance(item, int):
+            return [item] if item in self.items else []
+        if item == 'all':
+            return list(self.items)
+        return [key for key, value in self.items.items() if item in value['tags']]
+
+    def configure(self, item, **options):
+        self.calls += 1
+        self.updated += 1
+        for key in self._find(item):
+            if 'tags' in options:
+                options = dict(options, tags=set(options['tags']))
+            self.items[key].update(options)
+
+    def move(self, item, *coords):
+        self.calls += 1
+        for key in self._find(item):
+            self.items[key]['coords'] = coords
+
+    def zoom(self, item, factor, shiftX=0.0, shiftY=0.0):
+        self.calls += 1
+        for key in self._find(item):
+            coords = self.items[key]['coords']
+            self.items[key]['coords'] = tuple(c * factor + (shiftX, shiftY)[i % 2] for i, c in enumerate(coords))
+
+    def delete(self, item):
+        self.calls += 1
+        for key in self._find(item):
+            del self.items[key]
+
+    def lower(self, item):
+        self.calls += 1
+
+    def colors(self, kind: str) -> list:
+        """Returns the (coords, fill) of every item of `kind`, sorted."""
+        return sorted((tuple(round(c, 3) for c in item['coords']), item['fill'])
+                      for item in self.items.values() if item['kind'] == kind)
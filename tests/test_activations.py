@@ -0,0 +1,93 @@
+import math
+import random
+import unittest
+
+from Sources.Activations import ActivationView
+from Sources.NetworkDrawer import NetworkDrawer
+from Sources.RenderPlan import RenderPlan
+from Sources.StateDictionaries import StateDictionaries
+from Sources.Tensors import Tensors
+
+from support import RecordingRenderer
+
+
+def normalizedStateDict() -> dict:
+    """The tictactoe fixture, with a BatchNorm layer after its first hidden layer."""
+    generator = random.Random(5)
+    state_dict = {}
+    for key, value in StateDictionaries.tictactoe_state_dict().items():
+        state_dict[key] = value
+        if key == 'hiddenLayer1.bias':
+            state_dict['norm.weight'] = [generator.uniform(0.5, 2) for _ in range(20)]
+            state_dict['norm.bias'] = [generator.uniform(-1, 1) for _ in range(20)]
+            state_dict['norm.running_mean'] = [generator.uniform(-1, 1) for _ in range(20)]
+            state_dict['norm.running_var'] = [generator.uniform(0.1, 3) for _ in range(20)]
+    return state_dict
+
+
+def referenceForward(state_dict: dict, inputs: list) -> list:
+    """Runs `inputs` through the layers of `normalizedStateDict` one neuron at a time."""
+    matrix = lambda key: [list(row) for row in state_dict[key]]
+    columns = [inputs]
+    x = inputs
+    for name, activation in (('hiddenLayer1', 'relu'), ('hiddenLayer2', 'relu'), ('outputLayer', 'identity')):
+        weights, biases = matrix(f'{name}.weight'), list(state_dict[f'{name}.bias'])
+        rows = []
+        for sample in x:
+            row = [sum(w * value for w, value in zip(neuron, sample)) + bias for neuron, bias in zip(weights, biases)]
+            if name == 'hiddenLayer1':
+                norm = [state_dict[f'norm.{parameter}'] for parameter in ('running_mean', 'running_var', 'weight', 'bias')]
+                row = [(value - mean) / math.sqrt(var + ActivationView.NORM_EPSILON) * scale + shift
+                       for value, mean, var, scale, shift in zip(row, *norm)]
+            rows.append([max(value, 0.0) for value in row] if activation == 'relu' else row)
+        x = rows
+        columns.append(x)
+    return columns
+
+
+class ActivationViewTests(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(6)
+        self.inputs = [[generator.choice((-1.0, 0.0, 1.0)) for _ in range(27)] for _ in range(5)]
+        self.state_dict = Tensors.stateDictView(normalizedStateDict())
+        self.plan = RenderPlan.of(self.state_dict)
+        self.expected = referenceForward(self.state_dict, self.inputs)
+
+    def assertColumnsMatch(self, columns: list):
+        self.assertEqual(len(columns), len(self.expected))
+        for column, expected in zip(columns, self.expected):
+            for row, expectedRow in zip(column, expected):
+                for value, expectedValue in zip(row, expectedRow):
+                    self.assertAlmostEqual(float(value), expectedValue, places=9)
+
+    def testPythonForwardPass(self):
+        self.assertEqual(sorted(self.plan.layers[0].norm), ['bias', 'running_mean', 'running_var', 'weight'])
+        numpy = Tensors.numpy()
+        try:
+            Tensors._numpy = False
+            view = ActivationView(self.inputs)
+            self.assertColumnsMatch(view.forward(self.state_dict, self.plan, version=0))
+            values, _ = view.nodeValues(view.forward(self.state_dict, self.plan, version=0))
+        finally:
+            Tensors._numpy = numpy
+        self.assertAlmostEqual(values[-1][0], math.fsum(row[0] for row in self.expected[-1]) / 5, places=9)
+
+    @unittest.skipIf(Tensors.numpy() is None, "NumPy is not installed")
+    def testVectorizedForwardPass(self):
+        view = ActivationView(self.inputs, sample=3)
+        columns = view.forward(self.state_dict, self.plan, version=0)
+        self.assertColumnsMatch(columns)
+        values, limits = view.nodeValues(columns)
+        self.assertEqual(values[-1], [float(value) for value in columns[-1][3]])
+        self.assertAlmostEqual(limits[1], max(abs(value) for row in self.expected[1] for value in row), places=9)
+
+    def testSampleNeedsInputs(self):
+        drawer = NetworkDrawer(StateDictionaries.tictactoe_state_dict(), RecordingRenderer())
+        drawer.drawNN()
+        with self.assertRaises(ValueError):
+            drawer.setActivationSample(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import random
+import tempfile
+import unittest
+
+from Sources.BatchExport import BatchExport
+from Sources.SnapshotLog import SnapshotReader, SnapshotWriter
+from Sources.StateDictionaries import StateDictionaries
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class BatchExportTests(unittest.TestCase):
+
+    def assertFrames(self, paths: list, count: int):
+        self.assertEqual(len(paths), count)
+        for path in paths:
+            with open(path, 'rb') as file:
+                self.assertEqual(file.read(8), PNG_SIGNATURE)
+
+    def testExportsFramesFromSnapshotLog(self):
+        generator = random.Random(0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'run.nnvl')
+            with SnapshotWriter(path, keyframe_interval=2) as log:
+                for step in range(4):
+                    log.append({'layer.weight': [[generator.uniform(-1, 1) for _ in range(5)] for _ in range(3)],
+                                'layer.bias': [generator.uniform(-1, 1) for _ in range(3)]}, step=step)
+            reader = SnapshotReader(path)
+            try:
+                paths = BatchExport.exportFrames((reader.read(index) for index in range(len(reader))),
+                                                 os.path.join(directory, 'frames'), width=120, height=90,
+                                                 processes=2)
+            finally:
+                reader.close()
+            self.assertFrames(paths, 4)
+
+    def testExportsFramesFromFixtures(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = BatchExport.exportFrames([StateDictionaries.tictactoe_state_dict()] * 2, directory,
+                                             width=120, height=90, processes=2)
+            self.assertFrames(paths, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import array
+import random
+import unittest
+
+from Sources.Color import ColorPalette
+from Sources.Tensors import MatrixView
+
+
+class ColorPaletteTests(unittest.TestCase):
+
+    def testBucketsForBuffersMatchBucket(self):
+        palette = ColorPalette((255, 0, 0), (0, 0, 255)).withRange(-0.37, 2.1)
+        generator = random.Random(0)
+        values = [generator.gauss(0, 2) for _ in range(600)] + [float('nan'), float('inf'), -float('inf'), 1e308]
+        for format in 'fd':
+            flat = array.array(format, values)
+            expected = [palette.bucket(value) for value in flat]
+            self.assertEqual(palette.bucketsFor(list(flat)), expected)
+            self.assertEqual(palette.bucketsFor(flat), expected)
+            self.assertEqual(palette.bucketsFor(memoryview(flat)), expected)
+            self.assertEqual(palette.bucketsFor(MatrixView(memoryview(flat)[:600], rows=20, cols=30)), expected[:600])
+
+
+if __name__ == '__main__':
+    unittest.main()
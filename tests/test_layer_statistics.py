@@ -0,0 +1,63 @@
+import math
+import unittest
+from unittest import mock
+
+from Sources.Color import ColorPalette
+from Sources.LayerStatistics import StatisticsEngine
+from Sources.StatisticsPanel import StatisticsPanel
+from Sources.Tensors import Tensors
+
+VALUES = [-2.0, -0.5, 0.0, 0.0005, 1.0, 3.0]
+
+
+class LayerStatisticsTests(unittest.TestCase):
+
+    def assertSummarizes(self, engine: StatisticsEngine):
+        state_dict = Tensors.stateDictView({'layer.weight': [VALUES[:3], VALUES[3:]], 'layer.bias': [0.25, -0.25]})
+        layers = engine.update(state_dict)
+        self.assertEqual(list(layers), ['layer.weight', 'layer.bias'])
+
+        weight = layers['layer.weight']
+        mean = math.fsum(VALUES) / 6
+        self.assertEqual(weight.count, 6)
+        self.assertAlmostEqual(weight.mean, mean, places=12)
+        self.assertAlmostEqual(weight.std, math.sqrt(math.fsum((x - mean) ** 2 for x in VALUES) / 6), places=12)
+        self.assertEqual((weight.minimum, weight.maximum), (-2.0, 3.0))
+        self.assertAlmostEqual(weight.sparsity, 2 / 6)
+        self.assertAlmostEqual(weight.l1, 6.5005, places=12)
+        self.assertAlmostEqual(weight.l2, math.sqrt(math.fsum(x * x for x in VALUES)), places=12)
+        # Four bins of width 1.5 between -3 and 3.
+        self.assertEqual((weight.limit, weight.histogram), (3.0, [1, 1, 3, 1]))
+
+        bias = layers['layer.bias']
+        self.assertEqual((bias.count, bias.mean, bias.std, bias.sparsity), (2, 0.0, 0.25, 0.0))
+        self.assertEqual((bias.limit, bias.histogram), (0.25, [1, 0, 0, 1]))
+
+        # The histogram range is kept, and only doubles once values grow past it.
+        layers = engine.update({'layer.weight': [0.5, 7.0]}, keys=['layer.weight'])
+        self.assertEqual((layers['layer.weight'].limit, layers['layer.weight'].histogram), (12.0, [0, 0, 1, 1]))
+        self.assertEqual(len(engine.history['layer.weight']), 2)
+
+    def testPythonStatistics(self):
+        numpy = Tensors.numpy()
+        try:
+            Tensors._numpy = False
+            self.assertSummarizes(StatisticsEngine(bins=4))
+        finally:
+            Tensors._numpy = numpy
+
+    @unittest.skipIf(Tensors.numpy() is None, "NumPy is not installed")
+    def testVectorizedStatistics(self):
+        self.assertSummarizes(StatisticsEngine(bins=4))
+
+    def testPanelWithoutKeys(self):
+        panel = StatisticsPanel(master=None)
+        panel.canvas = mock.Mock()
+        panel.refresh({}, [], ColorPalette((255, 0, 0), (0, 0, 255)))
+        self.assertEqual(panel.keys, [])
+        panel.refresh({}, [], ColorPalette((255, 0, 0), (0, 0, 255)))
+        panel.canvas.delete.assert_called_once_with('all')
+
+
+if __name__ == '__main__':
+    unittest.main()
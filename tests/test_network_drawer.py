@@ -0,0 +1,92 @@
+import array
+import random
+import unittest
+
+from Sources.NetworkDrawer import NetworkDrawer
+from Sources.Normalization import Normalizer
+from Sources.StateDictionaries import StateDictionaries
+from Sources.Tensors import MatrixView
+
+from support import RecordingRenderer
+
+
+def smallStateDict(scale: float, seed: int = 0) -> dict:
+    generator = random.Random(seed)
+    return {
+        'hidden.weight': [[generator.uniform(-scale, scale) for _ in range(20)] for _ in range(27)],
+        'hidden.bias': [generator.uniform(-scale, scale) for _ in range(27)],
+        'output.weight': [[generator.uniform(-scale, scale) for _ in range(27)] for _ in range(9)],
+        'output.bias': [generator.uniform(-scale, scale) for _ in range(9)],
+    }
+
+
+class NetworkDrawerTests(unittest.TestCase):
+
+    def drawer(self, state_dict: dict, **options) -> NetworkDrawer:
+        drawer = NetworkDrawer(state_dict, RecordingRenderer(), **options)
+        drawer.normalizer = Normalizer(Normalizer.ABS_MAX)
+        drawer.redraw()
+        return drawer
+
+    def assertColorsMatch(self, drawer: NetworkDrawer):
+        items = drawer.renderer.items
+        for planned in drawer.drawnPlan.layers:
+            palette = drawer.palettes[planned.weightKey]
+            for row, weights in enumerate(drawer.state_dict[planned.weightKey]):
+                for col, weight in enumerate(weights):
+                    self.assertEqual(items[drawer.lineItems[(planned.index, row, col)]]['fill'], palette.color(weight))
+
+    def testNormalizedUpdateRecolorsSmallWeights(self):
+        # Weights of about 1e-3, so every change is far below the default `update_tolerance`
+        # but moves most of them into another bucket of the ABS_MAX palette.
+        state_dict = smallStateDict(0.004, seed=1)
+        generator = random.Random(2)
+        updated = {key: [[weight + generator.choice((-1, 1)) * generator.uniform(5e-5, 1e-4) for weight in row]
+                         if isinstance(row, list) else row for row in values]
+                   for key, values in state_dict.items()}
+        # Keep the largest weights, so the palettes keep their range and only the changed lines are recolored.
+        for key in ('hidden.weight', 'output.weight'):
+            state_dict[key][0][0] = updated[key][0][0] = 0.004
+        drawer = self.drawer(state_dict)
+        before = drawer.renderer.colors('line')
+        drawer.setStateDict(updated)
+
+        self.assertNotEqual(before, drawer.renderer.colors('line'))
+        self.assertColorsMatch(drawer)
+
+    def testItemBudgetCoversCircles(self):
+        generator = random.Random(3)
+        weights = array.array('d', (generator.uniform(-1, 1) for _ in range(2048 * 1024)))
+        state_dict = {'layer.weight': MatrixView(memoryview(weights), rows=2048, cols=1024),
+                      'layer.bias': [generator.uniform(-1, 1) for _ in range(2048)]}
+        drawer = self.drawer(state_dict, item_budget=1000)
+        self.assertLessEqual(drawer.renderer.itemCount, 1000)
+        self.assertEqual(set(drawer.nodeSummaries), {0, 1})
+
+        state_dict['layer.bias'] = [-bias for bias in state_dict['layer.bias']]
+        drawer.setStateDict(state_dict)
+        self.assertLessEqual(drawer.renderer.itemCount, 1000)
+        drawer.renderer.resize(700, 500)
+        drawer.relayout()
+        self.assertLessEqual(drawer.renderer.itemCount, 1000)
+
+    def testUpdatesKeepTheZoom(self):
+        # A budget this small draws both weight matrices as top-k edges and the wide columns as strips.
+        first = StateDictionaries.synthetic_state_dict([300, 120, 10], seed=0)
+        second = StateDictionaries.synthetic_state_dict([300, 120, 10], seed=1)
+        drawer = self.drawer(first, item_budget=600)
+        drawer.zoomItems(120, 80, 1.5)
+        drawer.zoomItems(300, 200, 0.8)
+        drawer.setStateDict(second)
+
+        expected = self.drawer(second, item_budget=600)
+        expected.zoomItems(120, 80, 1.5)
+        expected.zoomItems(300, 200, 0.8)
+        self.assertEqual(set(drawer.nodeSummaries), {0, 1})
+        for kind in ('line', 'rectangle', 'circle'):
+            coords = [coords for coords, _ in drawer.renderer.colors(kind)]
+            self.assertEqual(coords, [coords for coords, _ in expected.renderer.colors(kind)])
+
+
+if __name__ == '__main__':
+    unittest.main()
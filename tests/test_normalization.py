@@ -0,0 +1,44 @@
+import random
+import unittest
+
+from Sources.Normalization import QuantileSketch
+from Sources.Tensors import Tensors
+
+CAPACITY = 200
+RANK_ERROR = 2.5 / CAPACITY
+"""float: The documented rank error of about 2/capacity, with some room for the seeded stream."""
+
+
+@unittest.skipIf(Tensors.numpy() is None, "NumPy is not installed")
+class QuantileSketchTests(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(4)
+        # Mostly narrow values with a few wide outliers, like the weights of a trained layer.
+        self.values = [generator.gauss(0, 1) * (8 if generator.random() < 0.1 else 1) for _ in range(100000)]
+        self.batches = [self.values[start:start + 1000] for start in range(0, len(self.values), 1000)]
+
+    def assertWithinRankError(self, sketch: QuantileSketch):
+        numpy = Tensors.numpy()
+        self.assertEqual(sketch.count, len(self.values))
+        self.assertEqual((sketch.minimum, sketch.maximum), (min(self.values), max(self.values)))
+        self.assertLessEqual(len(sketch), 3 * CAPACITY)
+        for q in numpy.linspace(0.01, 0.99, 99):
+            low, high = numpy.quantile(self.values, [max(0.0, q - RANK_ERROR), min(1.0, q + RANK_ERROR)])
+            self.assertTrue(low <= sketch.quantile(q) <= high, f"quantile {q:.2f} is off by more than the rank error")
+
+    def testRankError(self):
+        sketch = QuantileSketch(CAPACITY)
+        for batch in self.batches:
+            sketch.add(batch)
+        self.assertWithinRankError(sketch)
+
+    def testMerged(self):
+        sketches = [QuantileSketch(CAPACITY) for _ in range(4)]
+        for index, batch in enumerate(self.batches):
+            sketches[index % len(sketches)].add(batch)
+        self.assertWithinRankError(sketches[0].merged(*sketches[1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
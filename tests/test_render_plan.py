@@ -0,0 +1,71 @@
+import unittest
+
+from Sources.RenderPlan import RenderPlan
+from Sources.StateDictionaries import StateDictionaries
+from Sources.Tensors import Tensors
+
+
+def compile(*items) -> RenderPlan:
+    """Compiles the plan of (key, shape) pairs, without the cache."""
+    return RenderPlan(tuple(key for key, _ in items), tuple(shape for _, shape in items))
+
+
+def pairs(plan: RenderPlan) -> list:
+    return [(layer.weightKey, layer.biasKey) for layer in plan.layers]
+
+
+class RenderPlanTests(unittest.TestCase):
+
+    def testPairsBiasesOfTheSameModule(self):
+        plan = compile(('fc1.weight', (16, 27)), ('fc1.bias', (16,)), ('fc2.weight', (9, 16)), ('fc2.bias', (9,)))
+        self.assertEqual(pairs(plan), [('fc1.weight', 'fc1.bias'), ('fc2.weight', 'fc2.bias')])
+        self.assertEqual(plan.counts, [27, 16, 9])
+        self.assertEqual(plan.ignored, [])
+
+    def testMissingBiases(self):
+        plan = compile(('fc1.weight', (16, 27)), ('fc2.weight', (9, 16)), ('fc2.bias', (9,)),
+                       ('fc3.weight', (4, 9)))
+        self.assertEqual(pairs(plan), [('fc1.weight', None), ('fc2.weight', 'fc2.bias'), ('fc3.weight', None)])
+        # A vector of another module is not taken as the bias, even if its length matches.
+        plan = compile(('fc1.weight', (9, 27)), ('gate.scale', (9,)))
+        self.assertEqual(pairs(plan), [('fc1.weight', None)])
+        self.assertEqual(plan.ignored, ['gate.scale'])
+
+    def testBatchNormBuffers(self):
+        plan = compile(('0.weight', (16, 27)), ('0.bias', (16,)),
+                       ('1.weight', (16,)), ('1.bias', (16,)), ('1.running_mean', (16,)),
+                       ('1.running_var', (16,)), ('1.num_batches_tracked', ()),
+                       ('3.weight', (9, 16)), ('3.bias', (9,)))
+        self.assertEqual(pairs(plan), [('0.weight', '0.bias'), ('3.weight', '3.bias')])
+        self.assertEqual(plan.layers[0].norm, {'weight': '1.weight', 'bias': '1.bias', 'running_mean': '1.running_mean',
+                                               'running_var': '1.running_var',
+                                               'num_batches_tracked': '1.num_batches_tracked'})
+        self.assertEqual(plan.layers[1].norm, {})
+        self.assertEqual(plan.ignored, [])
+
+    def testUnprefixedKeys(self):
+        plan = compile(('w1', (16, 27)), ('b1', (16,)), ('w2', (9, 16)), ('b2', (4,)))
+        self.assertEqual(pairs(plan), [('w1', 'b1'), ('w2', None)])
+        self.assertEqual(plan.ignored, ['b2'])
+
+    def testConvolutionKernelsAreFlattened(self):
+        plan = compile(('conv.weight', (8, 3, 5, 5)), ('conv.bias', (8,)), ('fc.weight', (10, 8)))
+        self.assertEqual([(layer.outputs, layer.inputs) for layer in plan.layers], [(8, 75), (10, 8)])
+        self.assertEqual(plan.counts, [75, 8, 10])
+        self.assertEqual(pairs(plan), [('conv.weight', 'conv.bias'), ('fc.weight', None)])
+
+    def testNeedsAWeightMatrix(self):
+        with self.assertRaises(ValueError):
+            compile(('bias', (4,)))
+
+    def testSameSignatureSharesThePlan(self):
+        first = Tensors.stateDictView(StateDictionaries.default_state_dict())
+        second = Tensors.stateDictView(StateDictionaries.snake_state_dict())
+        self.assertIs(RenderPlan.of(first), RenderPlan.of(second))
+        self.assertIs(RenderPlan.of(first), RenderPlan.compile(*RenderPlan.of(first).signature))
+        self.assertIsNot(RenderPlan.of(Tensors.stateDictView(StateDictionaries.tictactoe_state_dict())),
+                         RenderPlan.of(first))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import random
+import unittest
+
+from Sources.Renderers import RasterRenderer
+from Sources.Tensors import Tensors
+
+
+class RasterRendererTests(unittest.TestCase):
+
+    @staticmethod
+    def draw(generator: random.Random, batch: int) -> bytearray:
+        renderer = RasterRenderer(120, 80)
+        renderer.LINE_BATCH = batch
+        for _ in range(400):
+            color = '#%06x' % generator.randrange(1 << 24)
+            if generator.random() < 0.9:
+                renderer.drawLine(generator.uniform(-20, 140), generator.uniform(-20, 100),
+                                  generator.uniform(-20, 140), generator.uniform(-20, 100), color,
+                                  width=generator.choice([0.4, 1, 2, 3.6]))
+            else:
+                renderer.drawCircle(generator.uniform(0, 120), generator.uniform(0, 80), generator.uniform(1, 6), color)
+        renderer.flush()
+        return renderer.pixels
+
+    @unittest.skipIf(Tensors.numpy() is None, "NumPy is not installed")
+    def testBufferedLinesMatchDrawingOneAtATime(self):
+        numpy = Tensors.numpy()
+        try:
+            Tensors._numpy = False
+            expected = self.draw(random.Random(7), RasterRenderer.LINE_BATCH)
+        finally:
+            Tensors._numpy = numpy
+        for batch in (1, 500, RasterRenderer.LINE_BATCH):
+            self.assertEqual(self.draw(random.Random(7), batch), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from Sources import SnapshotFeed
+from Sources.SnapshotFeed import SnapshotPublisher, SnapshotSubscriber
+
+SLOT = SnapshotFeed._SLOT
+
+
+def snapshot(value: float, width: int = 3) -> dict:
+    return {'layer.weight': [[value + 0.5] * width for _ in range(2)], 'layer.bias': [value, -value]}
+
+
+class TearingSlot:
+    """Stands in for the slot header struct, and publishes over a slot right after a subscriber checks it."""
+
+    size = SLOT.size
+
+    def __init__(self, publisher: SnapshotPublisher, value: float):
+        self.publisher = publisher
+        self.value = value
+        self.armed = False
+
+    def pack_into(self, *args):
+        SLOT.pack_into(*args)
+
+    def unpack_from(self, buffer, offset: int):
+        result = SLOT.unpack_from(buffer, offset)
+        if self.armed:
+            self.armed = False
+            # Two more snapshots bring a two-slot ring back to the slot being copied.
+            for _ in range(self.publisher.slots):
+                self.value += 1
+                self.publisher.publish(snapshot(self.value))
+        return result
+
+
+class SnapshotFeedTests(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'run.nnvf')
+
+    def subscriber(self) -> SnapshotSubscriber:
+        subscriber = SnapshotSubscriber(self.path)
+        self.addCleanup(subscriber.close)
+        return subscriber
+
+    def assertSnapshot(self, state_dict: dict, value: float, width: int = 3):
+        self.assertIsNotNone(state_dict)
+        self.assertEqual([list(row) for row in state_dict['layer.weight']], [[value + 0.5] * width] * 2)
+        self.assertEqual(list(state_dict['layer.bias']), [value, -value])
+
+    def testWrapsAroundTheRing(self):
+        subscriber = self.subscriber()
+        self.assertIsNone(subscriber.poll())
+        with SnapshotPublisher(self.path, slots=2) as publisher:
+            for step in range(7):
+                publisher.publish(snapshot(step), step=step * 10)
+                self.assertSnapshot(subscriber.poll(), step)
+                self.assertEqual(subscriber.step, step * 10)
+                self.assertIsNone(subscriber.poll())
+
+            for step in range(7, 12):
+                publisher.publish(snapshot(step), step=step * 10)
+            self.assertSnapshot(subscriber.poll(), 11)
+        self.assertEqual(subscriber.receivedCount, 8)
+        self.assertEqual(subscriber.droppedCount, 4)
+
+    def testSkipsSlotsBeingWritten(self):
+        subscriber = self.subscriber()
+        with SnapshotPublisher(self.path, slots=2) as publisher:
+            publisher.publish(snapshot(1))
+            # A marker that is odd means the publisher is still writing the slot.
+            offset = publisher._slotsStart + 1 * publisher._slotSize()
+            SLOT.pack_into(publisher._map, offset, 1, 1)
+            self.assertIsNone(subscriber.poll())
+
+            publisher.publish(snapshot(2))
+            tearing = TearingSlot(publisher, 2)
+            tearing.armed = True
+            with mock.patch.object(SnapshotFeed, '_SLOT', tearing):
+                self.assertIsNone(subscriber.poll())
+            self.assertSnapshot(subscriber.poll(), 4)
+        self.assertEqual(subscriber.receivedCount, 1)
+
+    def testFollowsARestartedPublisher(self):
+        subscriber = self.subscriber()
+        with SnapshotPublisher(self.path, slots=3) as publisher:
+            for step in range(5):
+                publisher.publish(snapshot(step))
+        self.assertSnapshot(subscriber.poll(), 4)
+
+        # A new run starts counting again, and may even have other shapes.
+        with SnapshotPublisher(self.path, slots=3) as publisher:
+            publisher.publish(snapshot(7, width=5))
+            self.assertSnapshot(subscriber.poll(), 7, width=5)
+            self.assertEqual(subscriber.step, 1)
+            publisher.publish(snapshot(8, width=5))
+            self.assertSnapshot(subscriber.wait(timeout=1.0), 8, width=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
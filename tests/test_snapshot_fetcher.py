@@ -0,0 +1,37 @@
+import time
+import unittest
+
+from Sources.SnapshotFetcher import SnapshotFetcher
+
+
+class SnapshotFetcherTests(unittest.TestCase):
+
+    def testKeepsFetchingAfterAnException(self):
+        calls = []
+
+        def fetch():
+            calls.append(len(calls))
+            if len(calls) <= 2:
+                raise RuntimeError("The training thread is busy.")
+            return {'layer.bias': [0.5]}
+
+        fetcher = SnapshotFetcher(fetch, interval=1, version=lambda: 1)
+        with self.assertLogs('Sources.SnapshotFetcher', level='ERROR'):
+            fetcher.start()
+            deadline = time.monotonic() + 5
+            snapshot = None
+            while snapshot is None and time.monotonic() < deadline:
+                snapshot = fetcher.take()
+                time.sleep(0.005)
+            fetcher.stop()
+            fetcher.join()
+
+        self.assertEqual(snapshot, {'layer.bias': [0.5]})
+        self.assertEqual(fetcher.errorCount, 2)
+        self.assertIsInstance(fetcher.lastError, RuntimeError)
+        # The version never changed, so once fetched, the snapshot is not fetched again.
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
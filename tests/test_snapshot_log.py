@@ -0,0 +1,94 @@
+import os
+import random
+import struct
+import tempfile
+import unittest
+
+from Sources.SnapshotLog import SnapshotReader, SnapshotWriter, _HEADER, packLayers
+from Sources.Tensors import Tensors
+
+
+def snapshots(count: int, seed: int = 0) -> list:
+    generator = random.Random(seed)
+    weights = [[generator.uniform(-1, 1) for _ in range(6)] for _ in range(4)]
+    biases = [generator.uniform(-1, 1) for _ in range(4)]
+    result = []
+    for _ in range(count):
+        # Nudge a few values at a time, like a training step, so most deltas are zeros.
+        row = generator.randrange(4)
+        weights[row] = [weight + generator.gauss(0, 0.01) for weight in weights[row]]
+        biases[row] += generator.gauss(0, 0.01)
+        result.append({'layer.weight': [list(row) for row in weights], 'layer.bias': list(biases)})
+    return result
+
+
+class SnapshotLogTests(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'run.nnvl')
+
+    def open(self) -> SnapshotReader:
+        reader = SnapshotReader(self.path)
+        self.addCleanup(reader.close)
+        return reader
+
+    def assertRoundTrips(self, reader: SnapshotReader, expected: list, dtype: str):
+        for index in [*range(len(expected)), len(expected) - 1, 0, 5]:
+            state_dict = reader.read(index)
+            for key, value in expected[index].items():
+                flat = [x for row in value for x in row] if key.endswith('weight') else value
+                # XOR deltas are exact, so every step reads back as the value rounded to `dtype`.
+                rounded = struct.unpack(f'<{len(flat)}{dtype}', struct.pack(f'<{len(flat)}{dtype}', *flat))
+                stored = state_dict[key].flat if key.endswith('weight') else state_dict[key]
+                self.assertEqual(tuple(stored), rounded)
+
+    def testEmptyLogGrows(self):
+        open(self.path, 'wb').close()
+        reader = self.open()
+        self.assertEqual(len(reader), 0)
+        self.assertIsNone(reader.keys)
+        with self.assertRaises(IndexError):
+            reader.read(-1)
+        with self.assertRaises(TimeoutError):
+            reader.wait(timeout=0.0)
+
+        with SnapshotWriter(self.path, keyframe_interval=4) as log:
+            for state_dict in snapshots(3):
+                log.append(state_dict)
+        self.assertEqual(reader.refresh(), 3)
+        self.assertEqual(reader.keys, ['layer.weight', 'layer.bias'])
+        self.assertEqual(reader.wait(timeout=0.0), 3)
+
+    def testHeaderOnlyLog(self):
+        state_dict = Tensors.stateDictView(snapshots(1)[0])
+        header = _HEADER.pack(b'NNVL', 1, b'f', 4) + packLayers(state_dict)
+        for size in (_HEADER.size - 1, _HEADER.size + 3, len(header)):
+            with open(self.path, 'wb') as file:
+                file.write(header[:size])
+            reader = self.open()
+            self.assertEqual(len(reader), 0)
+            with self.assertRaises(IndexError):
+                reader.read(-1)
+        self.assertEqual(reader.keys, ['layer.weight', 'layer.bias'])
+
+    def testNotASnapshotLog(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'PK\x03\x04' + bytes(20))
+        with self.assertRaises(ValueError):
+            SnapshotReader(self.path).close()
+
+    def testDeltasRoundTrip(self):
+        expected = snapshots(11)
+        for dtype in ('f', 'e'):
+            with SnapshotWriter(self.path, dtype=dtype, keyframe_interval=4) as log:
+                for step, state_dict in enumerate(expected):
+                    log.append(state_dict, step=step * 10)
+            reader = self.open()
+            self.assertEqual(reader.steps, [step * 10 for step in range(11)])
+            self.assertRoundTrips(reader, expected, dtype)
+
+
+if __name__ == '__main__':
+    unittest.main()
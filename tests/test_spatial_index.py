@@ -0,0 +1,87 @@
+import random
+import unittest
+
+from Sources.Layout import Layout
+from Sources.NetworkDrawer import NetworkDrawer
+from Sources.RenderPlan import RenderPlan
+from Sources.SpatialIndex import SpatialIndex
+from Sources.StateDictionaries import StateDictionaries
+from Sources.Tensors import Tensors
+
+from support import RecordingRenderer
+
+
+class SpatialIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        # Three columns of four circles at x = 66, 199, 332 and y = 60, 120, 180, 240, with radius 15.
+        self.drawer = NetworkDrawer(StateDictionaries.default_state_dict(), RecordingRenderer(400, 300))
+        self.drawer.drawNN()
+        self.index = self.drawer.spatialIndex()
+
+    def testCircleAt(self):
+        self.assertEqual(self.index.circleAt(199, 120), (1, 1))
+        self.assertEqual(self.index.circleAt(199 + 15, 120), (1, 1))
+        self.assertIsNone(self.index.circleAt(199 + 15.01, 120))
+        # Halfway between two circles of a column.
+        self.assertIsNone(self.index.circleAt(199, 90))
+        self.assertIsNone(self.index.circleAt(332, 120, drawn=lambda column, row: row != 1))
+
+    def testEdgeAt(self):
+        # Edge (row, col) of layer 0 runs from input `col` at x = 66 to neuron `row` at x = 199.
+        self.assertEqual(self.index.edgeAt(0, 100, 60, tolerance=3), (0, 0))
+        self.assertEqual(self.index.edgeAt(1, 220, 240 - 60 * (220 - 199) / 133, tolerance=3), (2, 3))
+        self.assertIsNone(self.index.edgeAt(0, 100, 67, tolerance=3))
+        self.assertIsNone(self.index.layerAt(40))
+        self.assertIsNone(self.index.layerAt(340))
+
+    def testEdgeAtBoundaries(self):
+        # The edges from input 1 into neurons 0 and 2 are mirrored around y = 120, so
+        # (100, 120) is exactly as far from both, once the edge between them is left out.
+        drawn = lambda row, col: (row, col) in {(0, 1), (2, 1)}
+        tie = self.index.edgeAt(0, 100, 120, tolerance=20, drawn=drawn)
+        self.assertIn(tie, {(0, 1), (2, 1)})
+        self.assertEqual(self.index.edgeAt(0, 100, 119.9, tolerance=20, drawn=drawn), (0, 1))
+        self.assertEqual(self.index.edgeAt(0, 100, 120.1, tolerance=20, drawn=drawn), (2, 1))
+        self.assertIsNone(self.index.edgeAt(0, 100, 120, tolerance=5, drawn=drawn))
+        # Edges (0, 1) and (1, 0) cross halfway between the columns.
+        self.assertIn(self.index.edgeAt(0, 132.5, 90, tolerance=1), {(0, 1), (1, 0)})
+        # A rectangle that only touches the edge from input 0 into neuron 0 still contains it.
+        self.assertEqual(self.index.edgesIn(0, (100, 40, 110, 60)), [(0, 0, 1)])
+        self.assertEqual(self.index.edgesIn(0, (100, 40, 110, 59.9)), [])
+
+    def testEdgesInMatchesEveryEdge(self):
+        state_dict = StateDictionaries.synthetic_state_dict([30, 20, 10])
+        layout = Layout(400, 300, RenderPlan.of(Tensors.stateDictView(state_dict)))
+        index = SpatialIndex(layout)
+        generator = random.Random(8)
+        for _ in range(50):
+            x1, y1 = generator.uniform(-20, 420), generator.uniform(-20, 320)
+            rect = (x1, y1, x1 + generator.uniform(0, 80), y1 + generator.uniform(0, 80))
+            for layer in range(2):
+                left, right = layout.columns[layer], layout.columns[layer + 1]
+                a, b = max(rect[0], left), min(rect[2], right)
+                expected = set()
+                for row, yOutput in enumerate(layout.yPositions[layer + 1]):
+                    for col, yInput in enumerate(layout.inputPositions[layer]):
+                        ya, yb = (yInput + (yOutput - yInput) * (t - left) / (right - left) for t in (a, b))
+                        if a <= b and min(ya, yb) <= rect[3] and max(ya, yb) >= rect[1]:
+                            expected.add((row, col))
+                found = {(row, col) for row, start, stop in index.edgesIn(layer, rect) for col in range(start, stop)}
+                self.assertEqual(found, expected)
+
+    def testInspect(self):
+        state_dict = self.drawer.state_dict
+        self.assertEqual(self.drawer.inspect(66, 60), {'kind': 'input', 'key': None, 'index': (0,), 'value': None,
+                                                       'layer': None})
+        hit = self.drawer.inspect(332, 180)
+        self.assertEqual((hit['kind'], hit['key'], hit['index']), ('bias', '2.bias', (2,)))
+        self.assertEqual(hit['value'], state_dict['2.bias'][2])
+        hit = self.drawer.inspect(100, 60)
+        self.assertEqual((hit['kind'], hit['key'], hit['index']), ('weight', '0.weight', (0, 0)))
+        self.assertEqual(hit['value'], state_dict['0.weight'][0][0])
+        self.assertIsNone(self.drawer.inspect(100, 280))
+
+
+if __name__ == '__main__':
+    unittest.main()
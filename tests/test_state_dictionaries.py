@@ -0,0 +1,26 @@
+import unittest
+
+from Sources.StateDictionaries import StateDictionaries
+
+
+class FixtureTests(unittest.TestCase):
+
+    def testCallersCannotChangeSharedFixtures(self):
+        state_dict = StateDictionaries.tictactoe_state_dict()
+        with self.assertRaises(TypeError):
+            state_dict['outputLayer.weight'].flat[0] = 9.0
+        with self.assertRaises(TypeError):
+            state_dict['outputLayer.bias'][0] = 9.0
+        state_dict['outputLayer.bias'] = None
+        self.assertIsNotNone(StateDictionaries.tictactoe_state_dict()['outputLayer.bias'])
+
+    def testGeneratedValuesAreCopied(self):
+        StateDictionaries.register('nested', lambda: {'layer.bias': [0.5, -0.5]})
+        self.addCleanup(StateDictionaries._fixtures.pop, 'nested')
+        self.addCleanup(StateDictionaries._loaded.pop, 'nested', None)
+        StateDictionaries.fixture('nested')['layer.bias'][0] = 9.0
+        self.assertEqual(StateDictionaries.fixture('nested'), {'layer.bias': [0.5, -0.5]})
+
+
+if __name__ == '__main__':
+    unittest.main()
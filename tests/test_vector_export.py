@@ -0,0 +1,50 @@
+import io
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+from Sources.NetworkDrawer import NetworkDrawer
+from Sources.Renderers import SvgRenderer
+from Sources.StateDictionaries import StateDictionaries
+from Sources.Tensors import Tensors
+from Sources.VectorExport import VectorExport
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+class VectorExportTests(unittest.TestCase):
+
+    def testExportsEveryEdgeAndCircle(self):
+        state_dict = StateDictionaries.tictactoe_state_dict()
+        output = io.StringIO()
+        count = VectorExport.exportSVG(state_dict, output, width=800, height=600)
+        root = ElementTree.fromstring(output.getvalue())
+        self.assertEqual((root.get('width'), root.get('height')), ('800', '600'))
+
+        shapes = [Tensors.shape(value) for value in Tensors.stateDictView(state_dict).values()]
+        edges = sum(rows * cols for rows, cols in (shape for shape in shapes if len(shape) == 2))
+        circles = shapes[0][1] + sum(shape[0] for shape in shapes if len(shape) == 1)
+        paths = root.findall(f'{SVG}path')
+        self.assertEqual(sum(path.get('d').count('M') for path in paths), edges)
+        self.assertEqual(len(root.findall(f'{SVG}circle')), circles)
+        self.assertEqual(count, edges + circles)
+        # The background is the only rectangle, and the lines are below every circle.
+        self.assertEqual(len(root.findall(f'{SVG}rect')), 1)
+        tags = [child.tag for child in root]
+        self.assertLess(max(index for index, tag in enumerate(tags) if tag == f'{SVG}path'), tags.index(f'{SVG}circle'))
+
+    def testRefusesToDrawAgain(self):
+        output = io.StringIO()
+        renderer = SvgRenderer(output, width=400, height=300)
+        drawer = NetworkDrawer(StateDictionaries.default_state_dict(), renderer)
+        drawer.drawNN()
+        for change in (lambda: drawer.setColors((0, 255, 0), (255, 0, 255)),
+                       lambda: drawer.setStateDict(StateDictionaries.snake_state_dict()),
+                       drawer.redraw):
+            with self.assertRaisesRegex(RuntimeError, 'single pass'):
+                change()
+        renderer.close()
+        ElementTree.fromstring(output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()